@@ -14,3 +14,17 @@ async def get_graph_visualization():
     if os.path.exists(file_path):
         return FileResponse(file_path)
     return "<h1>No graph available</h1>"
+
+@router.get("/stats")
+async def get_graph_stats():
+    """Published graph version, size and reasoning-cache metrics"""
+    from backend.app.services.reasoning_service import reasoning_service
+
+    snapshot = graph_service.snapshot()
+    return {
+        "version": snapshot.version,
+        "num_nodes": snapshot.graph.number_of_nodes(),
+        "num_edges": snapshot.graph.number_of_edges(),
+        "adjacency_entries": len(snapshot.adjacency),
+        "reasoning_cache": reasoning_service.context_cache.stats(),
+    }
@@ -1,16 +1,28 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, BackgroundTasks
+import asyncio
+from fastapi import APIRouter, UploadFile, File, HTTPException
 from typing import List
 import shutil
 import os
 from backend.app.core.config import settings
-from backend.app.services.rag_service import rag_service
+from backend.app.models.schemas import IngestJobStatus
+from backend.app.services.ingest_queue import ingest_queue
 
 router = APIRouter()
 
+def _save_upload(file: UploadFile, file_path: str):
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(file.file, buffer)
+
+def _job_status(job: dict) -> IngestJobStatus:
+    total = job["total_chunks"]
+    progress = job["processed_chunks"] / total if total else (1.0 if job["status"] == "completed" else 0.0)
+    return IngestJobStatus(progress=round(progress, 4), **{k: v for k, v in job.items() if k in IngestJobStatus.model_fields})
+
 @router.post("/")
-async def ingest_documents(background_tasks: BackgroundTasks, files: List[UploadFile] = File(...)):
-    """Upload PDFs and start ingestion process in background"""
+async def ingest_documents(files: List[UploadFile] = File(...)):
+    """Upload PDFs and queue them for ingestion (durable, resumable jobs)"""
     saved_files = []
+    jobs = []
     
     # Ensure data dir exists
     os.makedirs(settings.DATA_DIR, exist_ok=True)
@@ -20,14 +32,26 @@ async def ingest_documents(background_tasks: BackgroundTasks, files: List[Upload
             continue
             
         file_path = os.path.join(settings.DATA_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Copy on a worker thread: large PDFs must not block the event loop
+        await asyncio.to_thread(_save_upload, file, file_path)
         saved_files.append(file_path)
         
-        # Add to background task
-        background_tasks.add_task(rag_service.ingest_document, file_path)
+        # Add to job queue (re-uploads of known content reuse their job)
+        jobs.append(_job_status(await ingest_queue.submit(file_path)))
     
     return {
         "message": f"Received {len(saved_files)} PDF files. Processing started in background.",
-        "files": [os.path.basename(f) for f in saved_files]
+        "files": [os.path.basename(f) for f in saved_files],
+        "jobs": jobs
     }
+
+@router.get("/jobs", response_model=List[IngestJobStatus])
+async def list_jobs(limit: int = 50):
+    return [_job_status(job) for job in ingest_queue.store.list(limit)]
+
+@router.get("/jobs/{job_id}", response_model=IngestJobStatus)
+async def get_job(job_id: str):
+    job = ingest_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_status(job)
@@ -1,4 +1,6 @@
+import json
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from backend.app.models.schemas import SearchRequest, SearchResponse
 from backend.app.services.rag_service import rag_service
 
@@ -12,3 +14,17 @@ async def search(request: SearchRequest):
         return SearchResponse(results=[str(result)])
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream")
+async def search_stream(request: SearchRequest):
+    """Server-sent events: retrieval events (vector, graph, pubmed), then LLM tokens, then done."""
+    async def event_stream():
+        async for event in rag_service.stream_question(request.query):
+            payload = json.dumps(event["data"], ensure_ascii=False)
+            yield f"event: {event['event']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
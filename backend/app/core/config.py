@@ -16,16 +16,123 @@ class Settings(BaseSettings):
     
     # Model Config
     EMBEDDING_MODEL: str = "intfloat/multilingual-e5-small"
+    # Role prefixes the embedding model was trained with (e5); empty for models without them
+    EMBEDDING_QUERY_PREFIX: str = "query: "
+    EMBEDDING_PASSAGE_PREFIX: str = "passage: "
     LLM_MODEL: str = "llama-3.3-70b-versatile"
 
     # NLI Verification Config (Self-MedRAG)
     NLI_MODEL_NAME: str = "roberta-large-mnli"
     NLI_SENTENCE_THRESHOLD: float = 0.5
     NLI_PASSAGE_THRESHOLD: float = 0.7
-    
+    # Batched NLI scoring: padded tokens (pairs x longest pair) and pairs per forward pass
+    NLI_BATCH_TOKEN_BUDGET: int = 8192
+    NLI_MAX_BATCH_SIZE: int = 32
+    # Cheap passage prefilter before NLI: "none", "bm25" or "embedding" (e5 bi-encoder).
+    # Keeps the top M passages per statement plus near-ties within MARGIN (min-max normalized score)
+    NLI_PREFILTER: str = "none"
+    NLI_PREFILTER_TOP_M: int = 3
+    NLI_PREFILTER_MARGIN: float = 0.1
+    # Cache of entailment probabilities keyed by (model, premise hash, hypothesis hash):
+    # in-memory LRU entries (0 disables) plus an optional SQLite tier that survives restarts
+    NLI_CACHE_SIZE: int = 100_000
+    NLI_CACHE_DISK: bool = False
+    NLI_CACHE_PATH: str = os.path.join(DATA_DIR, "nli_cache.sqlite3")
+    # NLI inference backend: "torch", "onnx" (ONNX Runtime, CPU) or "onnx-int8" (dynamically quantized).
+    # The exported model is cached per model name under NLI_ONNX_DIR; 0 threads = all cores
+    NLI_BACKEND: str = "torch"
+    NLI_ONNX_DIR: str = os.path.join(DATA_DIR, "onnx")
+    NLI_ONNX_THREADS: int = 0
+    # Two-tier NLI cascade: a small tier-1 model (e.g. "MoritzLaurer/multilingual-MiniLMv2-L6-mnli-xnli")
+    # decides statements unless its best score is within BAND of NLI_SENTENCE_THRESHOLD,
+    # which escalates them to NLI_MODEL_NAME. Empty model name disables the cascade
+    NLI_CASCADE_MODEL_NAME: str = ""
+    NLI_CASCADE_BAND: float = 0.2
+
+    # Retrieval fan-out (PubMed / vector / graph run concurrently)
+    RETRIEVAL_MAX_WORKERS: int = 8
+    PUBMED_TIMEOUT: float = 12.0
+    VECTOR_SEARCH_TIMEOUT: float = 5.0
+    GRAPH_SEARCH_TIMEOUT: float = 5.0
+
     # Groq API Keys (Loaded dynamically)
     GROQ_API_KEYS: List[str] = []
 
+    # Groq key pool scheduling (per key; corrected at runtime from rate-limit headers)
+    GROQ_REQUESTS_PER_MINUTE: int = 30
+    GROQ_TOKENS_PER_MINUTE: int = 12000
+    GROQ_MAX_IN_FLIGHT_PER_KEY: int = 2
+    GROQ_BASE_COOLDOWN_SECONDS: float = 5.0
+    GROQ_MAX_COOLDOWN_SECONDS: float = 60.0
+    # A call waits at most this many seconds in total for a key with budget; after
+    # GROQ_MAX_RETRIES rate-limited attempts it fails
+    GROQ_ACQUIRE_TIMEOUT_SECONDS: float = 300.0
+    GROQ_MAX_RETRIES: int = 3
+    # Upper bound on generating one answer (including waiting for keys), so a question cannot hang
+    LLM_ANSWER_TIMEOUT_SECONDS: float = 90.0
+    LLM_TOKEN_ESTIMATE_OVERHEAD: int = 1500
+
+    # Content-addressed cache of deterministic LLM results (extraction)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = os.path.join(DATA_DIR, "llm_cache.sqlite3")
+    LLM_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Ingestion: number of chunk extractions kept in flight (results still commit in chunk order).
+    # 0 = the key pool's capacity (healthy keys x GROQ_MAX_IN_FLIGHT_PER_KEY), so throughput scales with keys
+    INGEST_CONCURRENCY: int = 0
+    # Extra attempts for a chunk whose extraction raises; chunks that still fail are recorded
+    # in the checkpoint, retried on resume, and the job ends as failed
+    INGEST_CHUNK_RETRIES: int = 2
+
+    # Graph storage engine: "networkx" (MultiDiGraph), "compact" (array-backed CSR store)
+    # or "sqlite" (on-disk, WAL; readers in other processes see committed checkpoints)
+    GRAPH_STORE: str = "networkx"
+    GRAPH_SQLITE_PATH: str = os.path.join(DATA_DIR, "amg_data", "graph.sqlite3")
+    # Entity -> source chunk index used to fetch the exact chunks behind question entities
+    GRAPH_PROVENANCE_PATH: str = os.path.join(DATA_DIR, "amg_data", "provenance.sqlite3")
+    GRAPH_CHUNK_TOP_K: int = 3
+
+    # Multi-hop reasoning: node expansions allowed per best-first path search
+    GRAPH_PATH_MAX_EXPANSIONS: int = 5000
+    # Longest path (hops) searched between two entities of the same question
+    GRAPH_CONNECTION_MAX_DEPTH: int = 3
+    # Graph retrieval: "paths" (multi-hop path rendering) or "ppr" (personalized PageRank from question entities)
+    GRAPH_RETRIEVAL_STRATEGY: str = "paths"
+    GRAPH_PPR_DAMPING: float = 0.5
+    GRAPH_PPR_TOL: float = 1e-6
+    GRAPH_PPR_MAX_ITER: int = 100
+    GRAPH_PPR_TOP_NODES: int = 15
+
+    # Fuzzy entity linking: question n-grams -> graph nodes by name-embedding similarity,
+    # used when the exact gazetteer match finds nothing. Backend: "auto" (faiss HNSW if installed), "faiss" or "numpy"
+    ENTITY_LINK_ENABLED: bool = True
+    ENTITY_LINK_THRESHOLD: float = 0.9
+    ENTITY_LINK_TOP_K: int = 3
+    ENTITY_LINK_MAX_NGRAM: int = 4
+    # Question spans encoded per lookup (spans bounded by function words are skipped first)
+    ENTITY_LINK_MAX_SPANS: int = 64
+    ENTITY_INDEX_BACKEND: str = "auto"
+    ENTITY_INDEX_PATH: str = os.path.join(DATA_DIR, "amg_data", "entity_embeddings.npz")
+    # Rendered reasoning contexts kept in memory (invalidated when their neighbourhood changes)
+    REASONING_CACHE_SIZE: int = 2048
+
+    # Graph persistence: mutations go to an append-only op log; it is folded
+    # into a full snapshot once this many records accumulate
+    GRAPH_OPLOG_COMPACT_OPS: int = 50000
+    GRAPH_OPLOG_FSYNC: bool = False
+    # Checkpoint metadata (resume points) is rewritten every N chunks and at the end of a document.
+    # The op log already records every checkpoint; with the SQLite store a crash redoes at most
+    # N chunks (re-adding a chunk is idempotent)
+    GRAPH_CHECKPOINT_META_EVERY: int = 50
+    # Ingestion publishes a new graph version to readers after this many chunks or seconds,
+    # whichever comes first (and at the end of a document)
+    GRAPH_PUBLISH_EVERY_CHUNKS: int = 16
+    GRAPH_PUBLISH_INTERVAL_SECONDS: float = 5.0
+
+    # Ingestion job queue (durable, resumable)
+    INGEST_WORKERS: int = 1
+    INGEST_JOBS_DB: str = os.path.join(DATA_DIR, "ingest_jobs.sqlite3")
+
     class Config:
         env_file = ".env"
         extra = "ignore"
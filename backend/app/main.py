@@ -19,11 +19,24 @@ app.add_middleware(
 )
 
 from backend.app.api.v1.endpoints import search, ingest, graph
+from backend.app.services.ingest_queue import ingest_queue
+from backend.app.services.rag_service import rag_service
 
 app.include_router(search.router, prefix="/search", tags=["search"])
 app.include_router(ingest.router, prefix="/ingest", tags=["ingest"])
 app.include_router(graph.router, prefix="/graph", tags=["graph"])
 
+@app.on_event("startup")
+async def start_ingest_workers():
+    # Resumes jobs interrupted by a previous shutdown
+    await ingest_queue.start()
+
+@app.on_event("shutdown")
+async def stop_ingest_workers():
+    await ingest_queue.stop()
+    # After ingestion stopped, so the saved entity index covers every published node
+    await rag_service.shutdown()
+
 @app.get("/")
 def root():
     return {"message": "Welcome to ViMed-GraphRAG API", "docs": "/docs"}
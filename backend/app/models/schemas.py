@@ -54,6 +54,23 @@ class GraphResponse(BaseModel):
     html_content: str
 
 
+class IngestJobStatus(BaseModel):
+    """Progress of a queued ingestion job."""
+    id: str
+    filename: str
+    status: str  # "queued", "running", "completed" or "failed"
+    total_chunks: Optional[int] = None
+    processed_chunks: int = 0
+    last_committed_chunk: int = -1
+    progress: float = 0.0
+    chunks_per_minute: float = 0.0
+    error: Optional[str] = None
+    created_at: str
+    updated_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+
 # ---------------------------------------------------------------------------
 # NLI Verification Schemas (Self-MedRAG)
 # ---------------------------------------------------------------------------
@@ -64,6 +81,7 @@ class StatementVerification(BaseModel):
     label: str  # "Supported" or "Unsupported"
     confidence_score: float
     best_passage: Optional[str] = None
+    tier: Optional[int] = None  # Deciding NLI cascade tier (1 = fast, 2 = full), None without cascade
 
 
 class VerificationRequest(BaseModel):
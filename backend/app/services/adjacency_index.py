@@ -0,0 +1,93 @@
+import bisect
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class _Adjacency(NamedTuple):
+    """Out- (or in-) edges of one node as parallel lists, sorted by confidence (descending)."""
+    neg_confidences: List[float]  # ascending, for bisect
+    nodes: List[Hashable]
+    relations: List[Any]
+    confidences: List[float]
+    evidences: List[Any]
+    keys: List[Any]
+
+
+class AdjacencyIndex:
+    """Confidence-sorted out-edge lists for one immutable graph version.
+
+    Entries are built lazily on first access. A threshold query is a bisect
+    plus a prefix slice, and "top k relations" reads the first k entries, so
+    neither scans or sorts a node's edges again. A new graph version inherits
+    every entry except those of the nodes touched since the previous version
+    (`derive`). In-edge lists (`predecessors`) are kept the same way; both
+    endpoints of a new edge count as touched.
+    """
+
+    def __init__(self, graph, entries: Optional[Dict[Hashable, _Adjacency]] = None,
+                 in_entries: Optional[Dict[Hashable, _Adjacency]] = None):
+        self.graph = graph
+        self._entries: Dict[Hashable, _Adjacency] = entries if entries is not None else {}
+        self._in_entries: Dict[Hashable, _Adjacency] = in_entries if in_entries is not None else {}
+
+    def derive(self, graph, touched: Iterable[Hashable]) -> "AdjacencyIndex":
+        """Index for the next graph version, invalidating only `touched` nodes"""
+        # dict() copies atomically; readers may be adding entries concurrently
+        entries, in_entries = dict(self._entries), dict(self._in_entries)
+        for node in touched:
+            entries.pop(node, None)
+            in_entries.pop(node, None)
+        return AdjacencyIndex(graph, entries, in_entries)
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._in_entries)
+
+    def _entry(self, node, incoming: bool = False) -> _Adjacency:
+        cache = self._in_entries if incoming else self._entries
+        entry = cache.get(node)
+        if entry is None:
+            graph = self.graph
+            if not graph.has_node(node):
+                rows = []
+            elif incoming:
+                rows = [(data.get("confidence", 0), u, data.get("relation"), data.get("evidence", ""), key)
+                        for u, _, key, data in graph.in_edges(node, keys=True, data=True)]
+            else:
+                edges = (graph.out_edges(node, keys=True, data=True) if hasattr(graph, "out_edges")
+                         else graph.edges(node, keys=True, data=True))
+                rows = [(data.get("confidence", 0), v, data.get("relation"), data.get("evidence", ""), key)
+                        for _, v, key, data in edges]
+            # Stable: equal confidences keep edge order
+            rows.sort(key=lambda row: row[0], reverse=True)
+            entry = _Adjacency(
+                [-row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows],
+                [row[0] for row in rows], [row[3] for row in rows], [row[4] for row in rows]
+            )
+            cache[node] = entry
+        return entry
+
+    @staticmethod
+    def _cut(entry: _Adjacency, threshold: float, limit: Optional[int]) -> int:
+        end = bisect.bisect_right(entry.neg_confidences, -threshold)
+        return end if limit is None else min(end, limit)
+
+    def neighbors(self, node, threshold: float = 0.0, limit: Optional[int] = None) -> List[Tuple[Hashable, Any, float]]:
+        """(neighbor, relation, confidence) with confidence >= threshold, most confident first"""
+        entry = self._entry(node)
+        end = self._cut(entry, threshold, limit)
+        return list(zip(entry.nodes[:end], entry.relations[:end], entry.confidences[:end]))
+
+    def predecessors(self, node, threshold: float = 0.0, limit: Optional[int] = None) -> List[Tuple[Hashable, Any, float]]:
+        """(predecessor, relation, confidence) over in-edges with confidence >= threshold, most confident first"""
+        entry = self._entry(node, incoming=True)
+        end = self._cut(entry, threshold, limit)
+        return list(zip(entry.nodes[:end], entry.relations[:end], entry.confidences[:end]))
+
+    def connections(self, node, threshold: float = 0.0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Same records as ReasoningService.get_connected_nodes, most confident first"""
+        entry = self._entry(node)
+        end = self._cut(entry, threshold, limit)
+        return [
+            {"node": entry.nodes[i], "relation": entry.relations[i], "confidence": entry.confidences[i],
+             "evidence": entry.evidences[i], "key": entry.keys[i]}
+            for i in range(end)
+        ]
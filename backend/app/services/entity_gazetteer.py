@@ -0,0 +1,67 @@
+import re
+from typing import Dict, Iterable, List, Optional
+
+from backend.app.services.text_processing import normalize_medical_text
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Normalize text the same way as graph node names, then split into word tokens."""
+    return _TOKEN_PATTERN.findall(normalize_medical_text(text).lower())
+
+
+class EntityGazetteer:
+    """Token trie over the normalized names of graph nodes.
+
+    Replaces the per-question scan over every node: a question is normalized
+    once and walked from each token position down the trie, so matching costs
+    O(question tokens x longest entity name) regardless of graph size. Matches
+    respect word boundaries ("Ho" no longer matches inside "Hoa").
+
+    The trie is updated incrementally by GraphService whenever a node is
+    created. A node can also be registered under an alias, the text that
+    mentions it (used for nodes named by an older normalizer).
+    """
+
+    # Key under which a trie node stores the graph node names ending there
+    _TERMINAL = None
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._root: Dict = {}
+        self._size = 0
+        self.add_many(names)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, node_name: str, alias: Optional[str] = None):
+        """Register a graph node name, matched by its own name or by `alias`."""
+        tokens = _tokenize(alias or node_name)
+        if not tokens:
+            return
+        trie_node = self._root
+        for token in tokens:
+            trie_node = trie_node.setdefault(token, {})
+        names = trie_node.setdefault(self._TERMINAL, [])
+        if node_name not in names:
+            names.append(node_name)
+            self._size += 1
+
+    def add_many(self, node_names: Iterable[str]):
+        for name in node_names:
+            self.add(name)
+
+    def match(self, text: str) -> List[str]:
+        """Return every registered node name mentioned in text (deduplicated, in order of appearance)."""
+        tokens = _tokenize(text)
+        found = {}
+        for start in range(len(tokens)):
+            trie_node = self._root
+            for token in tokens[start:]:
+                trie_node = trie_node.get(token)
+                if trie_node is None:
+                    break
+                for name in trie_node.get(self._TERMINAL, ()):
+                    found[name] = None
+        return list(found)
@@ -0,0 +1,249 @@
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.app.services.text_processing import normalize_medical_text
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+# Question spans containing one of these are not entity mentions and are not encoded
+_FUNCTION_WORDS = frozenset({
+    "có", "không", "là", "gì", "nào", "và", "hoặc", "của", "cho", "với", "ở", "trong", "khi", "nên", "được",
+    "bị", "thì", "mà", "các", "những", "một", "này", "đó", "như", "thế", "sao", "bao", "nhiêu", "kèm", "dùng",
+    "the", "of", "and", "or", "is", "are", "a", "an", "for", "with", "in", "what", "which", "how", "does", "do",
+})
+
+
+class EntityEmbeddingIndex:
+    """Nearest-neighbour index over embeddings of graph entity names.
+
+    Links question spans to graph nodes when the exact gazetteer match fails
+    (paraphrases, typos, Vietnamese typed without diacritics). Vectors are
+    L2-normalized so inner product is cosine similarity; search uses a faiss
+    HNSW index when faiss is installed and a flat numpy matrix product
+    otherwise.
+
+    New names are queued with `add_many` (cheap, called on every graph
+    publish) and encoded in batches by `flush`, normally on a background
+    thread (`flush_async`), so ingestion never waits on the encoder and
+    `link` only searches names that are already encoded.
+
+    Encoded names are saved once at least `_SAVE_EVERY` of them are unsaved
+    (counted across flushes) and by `persist`, which the service calls at
+    the end of an ingestion and at shutdown.
+
+    Question spans are encoded with `query_prefix` and entity names with
+    `passage_prefix` (the e5 role prefixes, as in the NLI prefilter). A saved
+    index is only reused with the same model and prefixes.
+    """
+
+    # Save to disk once at least this many encoded names are not saved yet
+    _SAVE_EVERY = 1000
+
+    def __init__(self, embed: Callable[[List[str]], List[List[float]]], model_name: str,
+                 path: Optional[str] = None, backend: str = "auto", batch_size: int = 256,
+                 query_prefix: str = "", passage_prefix: str = ""):
+        self._embed = embed
+        self.model_name = model_name
+        self.query_prefix = query_prefix
+        self.passage_prefix = passage_prefix
+        self.path = path
+        self.batch_size = batch_size
+        if backend == "auto":
+            backend = "faiss" if faiss is not None else "numpy"
+        if backend == "faiss" and faiss is None:
+            raise ImportError("ENTITY_INDEX_BACKEND='faiss' requires the faiss package")
+        self.backend = backend
+
+        self._names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._vectors: Optional[np.ndarray] = None  # capacity x dim, first len(_names) rows used
+        self._faiss = None
+        self._pending: Dict[str, None] = {}
+        self._unsaved = 0  # names encoded since the last save
+        self._lock = threading.Lock()        # guards names / vectors / pending
+        self._flush_lock = threading.Lock()  # one encoder pass at a time
+        self._worker: Optional[threading.Thread] = None
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    @property
+    def unsaved(self) -> int:
+        return self._unsaved
+
+    def add_many(self, names: Iterable[str]):
+        """Queue names for encoding (already indexed names are skipped)"""
+        with self._lock:
+            for name in names:
+                if name not in self._ids:
+                    self._pending[name] = None
+
+    def _encode(self, texts: Sequence[str], prefix: str) -> np.ndarray:
+        vectors = np.asarray(self._embed([prefix + text for text in texts]), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def _append(self, names: List[str], vectors: np.ndarray) -> int:
+        """Add encoded names (lock held); returns how many were new"""
+        fresh = [i for i, name in enumerate(names) if name not in self._ids]
+        if not fresh:
+            return 0
+        names, vectors = [names[i] for i in fresh], vectors[fresh]
+        size = len(self._names)
+        if self._vectors is None or size + len(names) > len(self._vectors):
+            capacity = max(1024, 2 * (size + len(names)))
+            grown = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            if self._vectors is not None:
+                grown[:size] = self._vectors[:size]
+            self._vectors = grown
+        self._vectors[size:size + len(names)] = vectors
+        if self.backend == "faiss":
+            if self._faiss is None:
+                self._faiss = faiss.IndexHNSWFlat(vectors.shape[1], 32, faiss.METRIC_INNER_PRODUCT)
+            self._faiss.add(vectors)
+        for name in names:
+            self._ids[name] = len(self._names)
+            self._names.append(name)
+        return len(names)
+
+    def flush(self) -> int:
+        """Encode every queued name in batches; returns how many were added"""
+        added = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch = list(self._pending)[:self.batch_size]
+                if not batch:
+                    break
+                vectors = self._encode(batch, self.passage_prefix)
+                with self._lock:
+                    self._unsaved += self._append(batch, vectors)
+                    for name in batch:
+                        self._pending.pop(name, None)
+                added += len(batch)
+        if self._unsaved >= self._SAVE_EVERY and self.path:
+            self.save()
+        return added
+
+    def persist(self):
+        """Encode every queued name and save whatever is not saved yet"""
+        self.flush()
+        if self._unsaved and self.path:
+            self.save()
+
+    def flush_async(self):
+        """Encode queued names on a background thread (one at a time)"""
+        with self._lock:
+            if not self._pending or self._worker is not None:
+                return
+            self._worker = threading.Thread(target=self._flush_worker, name="entity-index-flush", daemon=True)
+            self._worker.start()
+
+    def _flush_worker(self):
+        while True:
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Entity index flush failed: {e}")
+                with self._lock:
+                    self._worker = None
+                return
+            # Names queued while encoding are picked up before the worker exits
+            with self._lock:
+                if not self._pending:
+                    self._worker = None
+                    return
+
+    def save(self, path: Optional[str] = None):
+        path = path or self.path
+        with self._lock:
+            names = list(self._names)
+            vectors = self._vectors[:len(names)].copy() if self._vectors is not None else np.zeros((0, 0), np.float32)
+            unsaved = self._unsaved
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, model=np.array(self.model_name), prefixes=np.array([self.query_prefix, self.passage_prefix]),
+                 names=np.array(names, dtype=str), vectors=vectors)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._unsaved -= unsaved
+
+    def _load(self, path: str):
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                if str(data["model"]) != self.model_name:
+                    print(f"Entity index at {path} was built with another model; re-encoding")
+                    return
+                prefixes = data["prefixes"].tolist() if "prefixes" in data else ["", ""]
+                if prefixes != [self.query_prefix, self.passage_prefix]:
+                    print(f"Entity index at {path} was built with other embedding prefixes; re-encoding")
+                    return
+                names, vectors = data["names"].tolist(), data["vectors"]
+        except Exception as e:
+            print(f"Could not load entity index {path}: {e}")
+            return
+        if names:
+            with self._lock:
+                self._append(names, vectors)
+            print(f"Loaded {len(names)} entity embeddings")
+
+    @staticmethod
+    def spans(text: str, max_ngram: int, max_spans: Optional[int] = None) -> List[str]:
+        """Word n-grams (1..max_ngram) of the normalized text that could name an entity, deduplicated.
+
+        Spans that contain a function word ("có", "không", "của", ...) or start
+        with a number are skipped; at most `max_spans` are kept, in text order.
+        """
+        tokens = _TOKEN_PATTERN.findall(normalize_medical_text(text))
+        spans = {}
+        for start in range(len(tokens)):
+            if tokens[start].isdigit():
+                continue
+            for end in range(start + 1, min(start + max_ngram, len(tokens)) + 1):
+                if tokens[end - 1].lower() in _FUNCTION_WORDS:
+                    break
+                spans[" ".join(tokens[start:end])] = None
+        spans = list(spans)
+        return spans[:max_spans] if max_spans is not None else spans
+
+    def link(self, text: str, top_k: int = 5, threshold: float = 0.9, max_ngram: int = 4,
+             max_spans: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Graph nodes most similar to any span of `text`: (name, cosine) above threshold, best first.
+
+        The candidate spans (see `spans`) are encoded in one batch and searched
+        with one call; a node scores its best-matching span.
+        """
+        spans = self.spans(text, max_ngram, max_spans)
+        if not spans or not self._names:
+            return []
+        queries = self._encode(spans, self.query_prefix)
+        best: Dict[int, float] = {}
+        with self._lock:
+            size = len(self._names)
+            if self.backend == "faiss":
+                scores, ids = self._faiss.search(queries, min(top_k, size))
+                for row_scores, row_ids in zip(scores, ids):
+                    for score, i in zip(row_scores.tolist(), row_ids.tolist()):
+                        if i >= 0 and score > best.get(i, -1.0):
+                            best[i] = score
+            else:
+                node_scores = (self._vectors[:size] @ queries.T).max(axis=1)
+                top = np.argpartition(-node_scores, min(top_k, size) - 1)[:top_k]
+                best = {int(i): float(node_scores[i]) for i in top}
+            names = self._names
+            ranked = sorted(((names[i], s) for i, s in best.items() if s >= threshold), key=lambda r: r[1], reverse=True)
+        return ranked[:top_k]
@@ -2,66 +2,510 @@ import networkx as nx
 import os
 import pickle
 import json
+import logging
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterable, Iterator, Tuple
 from backend.app.core.config import settings
 from backend.app.models.schemas import Entity, Relation
-from backend.app.services.text_processing import normalize_medical_text
+from backend.app.services.text_processing import normalize_medical_text, normalize_many
+from backend.app.services.entity_gazetteer import EntityGazetteer
+from backend.app.services.graph_store import CompactGraph, SQLiteGraph
+from backend.app.services.adjacency_index import AdjacencyIndex
+from backend.app.services.ppr_index import PPRIndex
+from backend.app.services.provenance_index import ProvenanceIndex
 from pyvis.network import Network
 
+logger = logging.getLogger(__name__)
+
+
 class CheckpointManager:
-    def __init__(self, checkpoint_dir: str):
+    def __init__(self, checkpoint_dir: str, meta_every: int = 1):
         self.checkpoint_dir = checkpoint_dir
+        # The metadata file is rewritten every `meta_every` checkpoints (and at snapshots / when forced)
+        self.meta_every = max(1, meta_every)
+        self._unwritten = 0
         os.makedirs(checkpoint_dir, exist_ok=True)
         self.graph_path = os.path.join(checkpoint_dir, "graph_improved.pkl")
         self.meta_path = os.path.join(checkpoint_dir, "checkpoint_meta.json")
-    
-    def save(self, G: nx.MultiDiGraph, chunk_id: int, total_chunks: int):
-        """Save graph and metadata"""
-        with open(self.graph_path, "wb") as f:
+        # Last checkpointed chunk per ingested source (file fingerprint)
+        self.sources: Dict[str, int] = {}
+        # Chunks of a source at or before its checkpoint whose extraction failed (not in the graph)
+        self.failed: Dict[str, List[int]] = {}
+        # Sequence number of the last op-log record folded into the snapshot
+        self.snapshot_seq = 0
+        self.last_chunk_id: Optional[int] = None
+        self.total_chunks: Optional[int] = None
+
+    def save_snapshot(self, G: nx.MultiDiGraph, seq: int):
+        """Write a full snapshot covering op-log records up to `seq` (atomic replace)"""
+        tmp_path = self.graph_path + ".tmp"
+        with open(tmp_path, "wb") as f:
             pickle.dump(G, f)
-        
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.graph_path)
+        self.snapshot_seq = seq
+        self._write_meta(G)
+        print(f"Snapshot saved: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges (seq {seq})")
+
+    def save_meta(self, G: nx.MultiDiGraph, chunk_id: int, total_chunks: int, source: Optional[str] = None,
+                  failed: Optional[List[int]] = None, force: bool = False):
+        """Record a checkpoint; the metadata file is rewritten in batches (the graph itself is durable in the op log)"""
+        self.record(chunk_id, total_chunks, source, failed)
+        self._unwritten += 1
+        if force or self._unwritten >= self.meta_every:
+            self._write_meta(G)
+        logger.debug("Checkpoint %s/%s: %d nodes, %d edges", chunk_id, total_chunks,
+                     G.number_of_nodes(), G.number_of_edges())
+
+    def record(self, chunk_id: int, total_chunks: int, source: Optional[str] = None,
+               failed: Optional[List[int]] = None):
+        """`failed` (when given) replaces the source's failed chunks; retried chunks never move the checkpoint back"""
+        self.last_chunk_id = chunk_id
+        self.total_chunks = total_chunks
+        if source is not None:
+            self.sources[source] = max(chunk_id, self.sources.get(source, -1))
+            if failed:
+                self.failed[source] = sorted(failed)
+            elif failed is not None:
+                self.failed.pop(source, None)
+
+    def _write_meta(self, G: nx.MultiDiGraph):
         meta = {
-            "last_chunk_id": chunk_id, 
-            "total_chunks": total_chunks, 
+            "last_chunk_id": self.last_chunk_id,
+            "total_chunks": self.total_chunks,
             "num_nodes": G.number_of_nodes(),
-            "num_edges": G.number_of_edges(), 
+            "num_edges": G.number_of_edges(),
+            "sources": self.sources,
+            "failed_chunks": self.failed,
+            "snapshot_seq": self.snapshot_seq,
             "timestamp": datetime.now().isoformat()
         }
-        
-        with open(self.meta_path, "w", encoding="utf-8") as f:
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(meta, f, indent=2, ensure_ascii=False)
-        print(f"Checkpoint saved: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-    
+        os.replace(tmp_path, self.meta_path)
+        self._unwritten = 0
+
     def load(self) -> tuple[Optional[nx.MultiDiGraph], Optional[int]]:
         """Load graph and last chunk_id"""
-        graph, last_chunk_id = None, None
+        graph = None
         if os.path.exists(self.graph_path):
             with open(self.graph_path, "rb") as f:
                 graph = pickle.load(f)
             print(f"Loaded graph: {graph.number_of_nodes()} nodes")
-        
+
+        self.load_meta()
+        return graph, self.last_chunk_id
+
+    def load_meta(self):
+        """Load checkpoint metadata (resume points) without the graph"""
         if os.path.exists(self.meta_path):
             with open(self.meta_path, "r", encoding="utf-8") as f:
                 meta = json.load(f)
-            last_chunk_id = meta.get("last_chunk_id")
-        
-        return graph, last_chunk_id
+            self.last_chunk_id = meta.get("last_chunk_id")
+            self.total_chunks = meta.get("total_chunks")
+            self.sources = meta.get("sources", {})
+            self.failed = meta.get("failed_chunks", {})
+            # Snapshots written before the op log existed cover everything
+            self.snapshot_seq = meta.get("snapshot_seq", 0)
+
+
+class GraphOpLog:
+    """Append-only JSON-lines log of graph mutations.
+
+    Every record carries a monotonically increasing `seq`. Records are flushed
+    to the OS as they are written, so a process crash loses nothing already
+    appended; checkpoint markers are additionally fsynced. A torn last line
+    (crash mid-write) is ignored on read.
+    """
+
+    def __init__(self, path: str, fsync_every_op: bool = False):
+        self.path = path
+        self.fsync_every_op = fsync_every_op
+        self._file = open(path, "a", encoding="utf-8")
+
+    def append(self, record: Dict[str, Any], durable: bool = False):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if durable or self.fsync_every_op:
+            os.fsync(self._file.fileno())
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"[GraphOpLog] Ignoring torn record at end of {self.path}")
+                    return
+
+    def truncate(self):
+        """Drop all records (called once a snapshot covers them)"""
+        self._file.close()
+        self._file = open(self.path, "w", encoding="utf-8")
+        os.fsync(self._file.fileno())
+
+    def size(self) -> int:
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+
+
+@dataclass(frozen=True)
+class GraphSnapshot:
+    """An immutable published graph version; readers pin one per query"""
+    version: int
+    graph: Any
+    adjacency: AdjacencyIndex
+    ppr: PPRIndex
+
+
+class _LayeredMap(Mapping):
+    """Read-only union of dict layers, newest first: the node maps of a networkx snapshot.
+
+    A new version stacks one layer holding the entries touched since the previous
+    version instead of copying the whole map. A layer is folded into the one below
+    while that one is at most twice its size, so lookups visit O(log n) layers and
+    publishing costs about the size of the change, not of the graph. Keys are never
+    removed (the graph only grows).
+    """
+
+    __slots__ = ("_layers", "_len")
+
+    def __init__(self, layers: Tuple[Dict, ...], length: int):
+        self._layers = layers
+        self._len = length
+
+    @classmethod
+    def stacked(cls, previous: Optional["_LayeredMap"], updates: Dict) -> "_LayeredMap":
+        if previous is None:
+            return cls((updates,), len(updates))
+        length = len(previous) + sum(1 for key in updates if key not in previous)
+        layer, layers = updates, list(previous._layers)
+        while layers and len(layers[0]) <= 2 * len(layer):
+            merged = dict(layers.pop(0))
+            merged.update(layer)
+            layer = merged
+        return cls((layer, *layers), length)
+
+    def __getitem__(self, key):
+        for layer in self._layers:
+            if key in layer:
+                return layer[key]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return any(key in layer for layer in self._layers)
+
+    def __iter__(self):
+        # Oldest layer first, so keys keep their insertion order
+        lower: List[Dict] = []
+        for layer in reversed(self._layers):
+            for key in layer:
+                if not any(key in seen for seen in lower):
+                    yield key
+            lower.append(layer)
+
+    def __len__(self) -> int:
+        return self._len
+
+
+def _networkx_snapshot(live: nx.MultiDiGraph, previous: Optional[nx.MultiDiGraph], dirty: Iterable) -> nx.MultiDiGraph:
+    """Copy-on-write frozen copy of `live`.
+
+    Shares the per-node adjacency and attribute dicts of `previous` (which are
+    never mutated) and only copies the entries of nodes touched since then,
+    stacked as a new layer over the previous version's maps.
+    """
+    snap = nx.MultiDiGraph()
+    snap.graph.update(live.graph)
+    if previous is None:
+        dirty = live.nodes
+    node, succ, pred = {}, {}, {}
+    for n in dirty:
+        node[n] = {k: list(v) if isinstance(v, list) else v for k, v in live._node[n].items()}
+        succ[n] = {v: {k: dict(d) for k, d in keyed.items()} for v, keyed in live._succ[n].items()}
+        pred[n] = {u: {k: dict(d) for k, d in keyed.items()} for u, keyed in live._pred[n].items()}
+    snap._node = _LayeredMap.stacked(previous._node if previous is not None else None, node)
+    snap._adj = snap._succ = _LayeredMap.stacked(previous._succ if previous is not None else None, succ)
+    snap._pred = _LayeredMap.stacked(previous._pred if previous is not None else None, pred)
+    return nx.freeze(snap)
+
 
 class GraphService:
     def __init__(self):
-        self.checkpoint_manager = CheckpointManager(os.path.join(settings.DATA_DIR, "amg_data"))
-        self.graph, self.last_chunk_id = self.checkpoint_manager.load()
-        if self.graph is None:
-            self.graph = nx.MultiDiGraph()
-            print("Initialized new MultiDiGraph")
-
-    def save_checkpoint(self, chunk_id: int, total_chunks: int):
-        self.checkpoint_manager.save(self.graph, chunk_id, total_chunks)
-
-    def add_entity(self, entity: Entity, page_num: int, chunk_id: int):
-        """Add or update entity in the graph"""
-        norm_name = normalize_medical_text(entity.name)
+        checkpoint_dir = os.path.join(settings.DATA_DIR, "amg_data")
+        self.checkpoint_manager = CheckpointManager(checkpoint_dir, settings.GRAPH_CHECKPOINT_META_EVERY)
+        # Name index used to detect graph entities in questions
+        self.gazetteer = EntityGazetteer()
+        # Current normalization of a node's label -> node name, for nodes named by an older normalizer
+        self._aliases: Dict[str, str] = {}
+        # Entity -> source chunks (vector-store ids); persisted at every checkpoint
+        self.provenance = ProvenanceIndex(settings.GRAPH_PROVENANCE_PATH)
+        self.op_log: Optional[GraphOpLog] = None
+        self._seq = 0
+        self._replaying = False
+        # Readers use the published snapshot; ingestion mutates self.graph and publishes.
+        # _dirty holds the nodes touched since the last publish (insertion-ordered).
+        self.version = 0
+        self._published: Optional[GraphSnapshot] = None
+        self._dirty: Dict[str, None] = {}
+        # Writers (mutations, checkpoints, publishes) hold this; readers never take it
+        self.write_lock = threading.RLock()
+        self._batches_since_publish = 0
+        self._last_publish = time.monotonic()
+        # Called as listener(version, touched_nodes) on each publish, before the version is visible
+        self._publish_listeners: List[Callable[[int, Iterable[str]], None]] = []
+        if settings.GRAPH_STORE == "sqlite":
+            self._init_sqlite_store(checkpoint_dir)
+        else:
+            self._init_memory_store(checkpoint_dir, settings.GRAPH_STORE)
+        self.last_chunk_id = self.checkpoint_manager.last_chunk_id
+        self._backfill_provenance()
+        self.publish()
+
+    def _backfill_provenance(self):
+        """Graphs built before the provenance index: recover it when only one source was ingested.
+
+        Chunk numbers are per document, so several sources cannot be told apart. Graphs
+        older than per-source checkpoints are skipped too: their chunks were stored in the
+        vector store under generated ids, and provenance ids that never resolve would only
+        take the GRAPH_CHUNK_TOP_K slots.
+        """
+        sources = self.checkpoint_manager.sources
+        if len(self.provenance) or len(sources) != 1 or not self.graph.number_of_nodes():
+            return
+        source = next(iter(sources))
+        for name, data in self.graph.nodes(data=True):
+            for chunk in data.get("chunks") or ():
+                self.provenance.add(name, source, chunk)
+        self.provenance.commit()
+        print(f"Backfilled chunk provenance for {len(self.provenance)} entities from source {source}")
+
+    def _init_memory_store(self, checkpoint_dir: str, store: str):
+        """In-memory graph: latest snapshot + replay of the op log tail"""
+        graph, _ = self.checkpoint_manager.load()
+        if graph is None:
+            graph = CompactGraph() if store == "compact" else nx.MultiDiGraph()
+            print(f"Initialized new {type(graph).__name__}")
+        self.graph = self._convert_graph(graph, store)
+
+        self.op_log = GraphOpLog(self._op_log_path(checkpoint_dir), settings.GRAPH_OPLOG_FSYNC)
+        self._seq = self.checkpoint_manager.snapshot_seq
+        # Records carry the names they were written with, so aliases are only needed after the replay
+        self._replay_log()
+        self._index_names()
+
+    def _init_sqlite_store(self, checkpoint_dir: str):
+        """On-disk graph: nothing to deserialize, the database is the checkpoint"""
+        sqlite_graph = SQLiteGraph(settings.GRAPH_SQLITE_PATH)
+        has_memory_graph = os.path.exists(self.checkpoint_manager.graph_path) or os.path.exists(self._op_log_path(checkpoint_dir))
+        if sqlite_graph.number_of_nodes() == 0 and has_memory_graph:
+            # First start on SQLite: migrate the pickled snapshot plus its op-log tail
+            self._init_memory_store(checkpoint_dir, "networkx")
+            print("Migrating graph snapshot to SQLite")
+            sqlite_graph.import_graph(self.graph)
+            self.op_log.close()
+            self.op_log = None
+        else:
+            self.checkpoint_manager.load_meta()
+        self.graph = sqlite_graph
+        self._index_names()
+        print(f"Opened SQLite graph: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges")
+
+    def _index_names(self):
+        """Build the gazetteer and the legacy name aliases from the loaded graph.
+
+        Node names are the normalized entity names. Graphs built before the
+        word-boundary normalizer can hold names it no longer produces (the old
+        substring replacement turned "Thai kỳ" into "Tăng Huyết Ápi Kỳ"). Such a
+        node is re-normalized from its label: the current name is registered as
+        an alias, so questions find the node and new mentions of the entity
+        merge into it instead of creating a second node.
+        """
+        self.gazetteer = EntityGazetteer()
+        self._aliases = {}
+        for name, data in self.graph.nodes(data=True):
+            self.gazetteer.add(name)
+            label = data.get("label")
+            current = normalize_medical_text(label) if label else name
+            if current != name and current not in self._aliases and not self.graph.has_node(current):
+                self._aliases[current] = name
+                self.gazetteer.add(name, alias=current)
+        if self._aliases:
+            print(f"Re-normalized {len(self._aliases)} legacy node names (kept as aliases)")
+
+    @staticmethod
+    def _op_log_path(checkpoint_dir: str) -> str:
+        return os.path.join(checkpoint_dir, "graph_oplog.jsonl")
+
+    @staticmethod
+    def _convert_graph(graph, store: str):
+        """Bring a loaded snapshot into the configured store (GRAPH_STORE may have changed)"""
+        if store == "compact" and not isinstance(graph, CompactGraph):
+            print("Converting snapshot to CompactGraph")
+            return CompactGraph.from_networkx(graph)
+        if store != "compact" and isinstance(graph, CompactGraph):
+            print("Converting snapshot to MultiDiGraph")
+            return graph.to_networkx()
+        return graph
+
+    def _replay_log(self):
+        """Re-apply op-log records newer than the snapshot"""
+        replayed = 0
+        self._replaying = True
+        try:
+            for record in self.op_log.read():
+                if record["seq"] <= self._seq:
+                    continue
+                self._seq = record["seq"]
+                op = record["op"]
+                if op == "add_entity":
+                    self._add_entity(
+                        Entity(**record["entity"]), record["name"], record["page"], record["chunk"], record.get("source")
+                    )
+                elif op == "add_relation":
+                    self._add_relation(
+                        Relation(**record["relation"]), record["src"], record["tgt"], record["page"], record["chunk"],
+                        record.get("source")
+                    )
+                elif op == "checkpoint":
+                    self.checkpoint_manager.record(
+                        record["chunk"], record["total"], record.get("source"), record.get("failed")
+                    )
+                    self.last_chunk_id = record["chunk"]
+                replayed += 1
+        finally:
+            self._replaying = False
+        if replayed:
+            print(f"Replayed {replayed} op-log records: {self.graph.number_of_nodes()} nodes, {self.graph.number_of_edges()} edges")
+
+    def _log(self, record: Dict[str, Any], durable: bool = False):
+        if self._replaying or self.op_log is None:
+            return
+        self._seq += 1
+        record["seq"] = self._seq
+        self.op_log.append(record, durable)
+
+    def save_checkpoint(self, chunk_id: int, total_chunks: int, source: Optional[str] = None,
+                        failed: Optional[List[int]] = None, force: bool = False):
+        """Mark everything logged so far as a checkpoint; compacts the log when it has grown enough
+
+        `failed` lists the source's chunks up to `chunk_id` whose extraction failed: they are
+        not part of the checkpoint and `pending_chunks` returns them again. The metadata file
+        is only rewritten every GRAPH_CHECKPOINT_META_EVERY checkpoints unless `force`.
+        """
+        with self.write_lock:
+            self.provenance.commit()
+            if self.op_log is None:
+                # SQLite store: committing the write transaction is the checkpoint
+                self.graph.commit()
+                self.last_chunk_id = chunk_id
+                self.checkpoint_manager.save_meta(self.graph, chunk_id, total_chunks, source, failed, force)
+                return
+            self._log({
+                "op": "checkpoint", "chunk": chunk_id, "total": total_chunks, "source": source, "failed": failed
+            }, durable=True)
+            self.last_chunk_id = chunk_id
+            self.checkpoint_manager.save_meta(self.graph, chunk_id, total_chunks, source, failed, force)
+            if self._seq - self.checkpoint_manager.snapshot_seq >= settings.GRAPH_OPLOG_COMPACT_OPS:
+                self.compact()
+
+    def compact(self):
+        """Fold the op log into a fresh snapshot"""
+        if self.op_log is None:
+            return
+        self.checkpoint_manager.save_snapshot(self.graph, self._seq)
+        self.op_log.truncate()
+
+    def publish(self) -> GraphSnapshot:
+        """Make all mutations so far visible to readers as a new graph version.
+
+        Called by ingestion at batch boundaries (see `maybe_publish`). With the
+        SQLite store a version shows the last committed checkpoint.
+        """
+        with self.write_lock:
+            self._batches_since_publish = 0
+            self._last_publish = time.monotonic()
+            previous = self._published
+            if previous is not None and not self._dirty:
+                return previous
+            make_snapshot = getattr(self.graph, "snapshot", None)
+            if make_snapshot is not None:
+                frozen = make_snapshot()
+            else:
+                frozen = _networkx_snapshot(self.graph, previous.graph if previous else None, self._dirty)
+            # Sorted adjacency carries over except for the nodes touched in this batch
+            adjacency = previous.adjacency.derive(frozen, self._dirty) if previous else AdjacencyIndex(frozen)
+            ppr = previous.ppr.derive(frozen, self._dirty) if previous else PPRIndex(frozen, self.provenance)
+            self.version += 1
+            published = GraphSnapshot(self.version, frozen, adjacency, ppr)
+            touched, self._dirty = self._dirty, {}
+            # Invalidate derived caches before readers can pin the new version, so none of
+            # them is served an entry of the previous version that the version made stale
+            for listener in self._publish_listeners:
+                listener(self.version, touched)
+            self._published = published
+            return published
+
+    def maybe_publish(self) -> Optional[GraphSnapshot]:
+        """Called after every ingested batch: publish once GRAPH_PUBLISH_EVERY_CHUNKS batches
+        or GRAPH_PUBLISH_INTERVAL_SECONDS have passed since the last version"""
+        with self.write_lock:
+            self._batches_since_publish += 1
+            if (self._batches_since_publish < settings.GRAPH_PUBLISH_EVERY_CHUNKS
+                    and time.monotonic() - self._last_publish < settings.GRAPH_PUBLISH_INTERVAL_SECONDS):
+                return None
+            return self.publish()
+
+    def add_publish_listener(self, listener: Callable[[int, Iterable[str]], None]):
+        """Register a callback for published versions (e.g. to invalidate derived caches)"""
+        self._publish_listeners.append(listener)
+
+    def snapshot(self) -> GraphSnapshot:
+        """Latest published graph version (immutable; safe to use while ingestion runs)"""
+        return self._published
+
+    def checkpointed_chunk(self, source: str) -> Optional[int]:
+        """Last chunk of `source` that is durable in the saved graph (None if never checkpointed)"""
+        return self.checkpoint_manager.sources.get(source)
+
+    def failed_chunks(self, source: str) -> List[int]:
+        """Chunks of `source` before its checkpoint whose extraction failed"""
+        return list(self.checkpoint_manager.failed.get(source, ()))
+
+    def pending_chunks(self, source: str, total_chunks: int) -> List[int]:
+        """Chunks of `source` still to extract: failed ones first, then everything after the checkpoint"""
+        checkpointed = self.checkpointed_chunk(source)
+        start = 0 if checkpointed is None else checkpointed + 1
+        return self.failed_chunks(source) + list(range(start, total_chunks))
+
+    def add_entities(self, entities: List[Entity], page_num: int, chunk_id: int, source: Optional[str] = None):
+        """Add a chunk's entities, normalizing all names in one batch"""
+        for entity, norm_name in zip(entities, normalize_many(e.name for e in entities)):
+            self._add_entity(entity, norm_name, page_num, chunk_id, source)
+
+    def add_entity(self, entity: Entity, page_num: int, chunk_id: int, source: Optional[str] = None):
+        """Add or update entity in the graph (`source` records chunk provenance)"""
+        self._add_entity(entity, normalize_medical_text(entity.name), page_num, chunk_id, source)
+
+    def _add_entity(self, entity: Entity, norm_name: str, page_num: int, chunk_id: int, source: Optional[str] = None):
+        norm_name = self._aliases.get(norm_name, norm_name)
+        self._log({
+            "op": "add_entity", "name": norm_name, "entity": entity.model_dump(), "page": page_num, "chunk": chunk_id,
+            "source": source
+        })
+        self._dirty[norm_name] = None
+        if source is not None:
+            self.provenance.add(norm_name, source, chunk_id)
         confidence = min(1.0, entity.relevance_score / 10.0)
         
         if not self.graph.has_node(norm_name):
@@ -75,6 +519,7 @@ class GraphService:
                 pages=[page_num], 
                 chunks=[chunk_id]
             )
+            self.gazetteer.add(norm_name)
         else:
             # Upgrade from UNKNOWN if possible
             node = self.graph.nodes[norm_name]
@@ -91,12 +536,20 @@ class GraphService:
                     node['description'] = entity.description
             
             # Track pages/chunks
-            if page_num not in node['pages']:
-                node['pages'].append(page_num)
-            if chunk_id not in node['chunks']:
-                node['chunks'].append(chunk_id)
+            add_provenance = getattr(self.graph, "add_provenance", None)
+            if add_provenance is not None:
+                add_provenance(norm_name, page_num, chunk_id)
+            else:
+                if page_num not in node['pages']:
+                    node['pages'].append(page_num)
+                if chunk_id not in node['chunks']:
+                    node['chunks'].append(chunk_id)
 
     def edge_exists(self, src, tgt, rel_type, chunk_id):
+        # Stores with an index on (src, tgt, relation, chunk) answer in one probe
+        has_relation = getattr(self.graph, "has_relation", None)
+        if has_relation is not None:
+            return has_relation(src, tgt, rel_type, chunk_id)
         if not self.graph.has_edge(src, tgt): return False
         edge_data = self.graph.get_edge_data(src, tgt)
         for key, data in edge_data.items():
@@ -104,17 +557,38 @@ class GraphService:
                 return True
         return False
 
-    def add_relation(self, relation: Relation, page_num: int, chunk_id: int):
+    def add_relations(self, relations: List[Relation], page_num: int, chunk_id: int, source: Optional[str] = None):
+        """Add a chunk's relations, normalizing all endpoints in one batch"""
+        names = normalize_many(name for r in relations for name in (r.source_name, r.target_name))
+        for i, relation in enumerate(relations):
+            self._add_relation(relation, names[2 * i], names[2 * i + 1], page_num, chunk_id, source)
+
+    def add_relation(self, relation: Relation, page_num: int, chunk_id: int, source: Optional[str] = None):
         """Add relation to the graph with deduplication"""
-        src = normalize_medical_text(relation.source_name)
-        tgt = normalize_medical_text(relation.target_name)
+        src, tgt = normalize_many([relation.source_name, relation.target_name])
+        self._add_relation(relation, src, tgt, page_num, chunk_id, source)
+
+    def _add_relation(self, relation: Relation, src: str, tgt: str, page_num: int, chunk_id: int,
+                      source: Optional[str] = None):
+        src, tgt = self._aliases.get(src, src), self._aliases.get(tgt, tgt)
+        self._log({
+            "op": "add_relation", "src": src, "tgt": tgt, "relation": relation.model_dump(),
+            "page": page_num, "chunk": chunk_id, "source": source
+        })
+        self._dirty[src] = None
+        self._dirty[tgt] = None
+        if source is not None:
+            self.provenance.add(src, source, chunk_id)
+            self.provenance.add(tgt, source, chunk_id)
         rel_type = relation.relation.upper()
         
         # Ensure nodes exist (create as UNKNOWN if missing)
         if not self.graph.has_node(src):
             self.graph.add_node(src, label=relation.source_name, type="UNKNOWN", confidence=0.5, pages=[page_num], chunks=[chunk_id], description="")
+            self.gazetteer.add(src)
         if not self.graph.has_node(tgt):
             self.graph.add_node(tgt, label=relation.target_name, type="UNKNOWN", confidence=0.5, pages=[page_num], chunks=[chunk_id], description="")
+            self.gazetteer.add(tgt)
             
         # Add edge if not duplicate for this chunk
         if not self.edge_exists(src, tgt, rel_type, chunk_id):
@@ -129,6 +603,7 @@ class GraphService:
 
     def visualize_graph(self, output_filename: str = "current_graph.html") -> str:
         """Generate HTML visualization"""
+        graph = self.snapshot().graph
         net = Network(height="750px", width="100%", bgcolor="#222222", font_color="white", select_menu=True, filter_menu=True)
         net.force_atlas_2based()
         
@@ -140,10 +615,10 @@ class GraphService:
         }
         
         # Add nodes
-        for node, data in self.graph.nodes(data=True):
+        for node, data in graph.nodes(data=True):
             node_type = data.get("type", "UNKNOWN")
             color = color_map.get(node_type, "#999999")
-            degree = self.graph.degree(node)
+            degree = graph.degree(node)
             size = 15 + (degree * 2)
             title_html = f"<b>{node}</b><br>Type: {node_type}<br>Connections: {degree}"
             if data.get("description"):
@@ -153,7 +628,7 @@ class GraphService:
         
         # Add edges (simplify MultiDiGraph for viz by taking best edge or all)
         # Visualizing all edges might be cluttered, but let's do it for now
-        for u, v, data in self.graph.edges(data=True):
+        for u, v, data in graph.edges(data=True):
             rel_type = data.get("relation", "RELATED")
             confidence = data.get("confidence", 0.5)
             net.add_edge(u, v, title=f"{rel_type} (conf: {confidence:.2f})", label=rel_type, width=confidence*3, color="#aaaaaa")
@@ -0,0 +1,919 @@
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import array
+import bisect
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import weakref
+
+import networkx as nx
+import numpy as np
+
+# Sentinels for "attribute not set" in numeric columns
+_NO_INT = np.iinfo(np.int32).min
+_NO_FLOAT = np.float32(np.nan)
+# Evidence length markers: attribute absent / explicitly None
+_NO_EVIDENCE = -2
+_NONE_EVIDENCE = -1
+_ABSENT = object()
+
+# Pending (not yet CSR-indexed) edges are folded into the CSR arrays once
+# they exceed this many, or this fraction of the indexed edges
+_REBUILD_MIN_PENDING = 4096
+_REBUILD_PENDING_RATIO = 0.25
+
+
+def _to_float(value: float) -> float:
+    # float32 -> float without exposing representation noise (0.7 -> 0.699999988)
+    return round(value, 6)
+
+
+class _Column:
+    """Growable typed numpy array"""
+
+    __slots__ = ("data", "size")
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def append(self, value):
+        if self.size == len(self.data):
+            grown = np.empty(max(1024, 2 * len(self.data)), dtype=self.data.dtype)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+        self.data[self.size] = value
+        self.size += 1
+
+    def view(self) -> np.ndarray:
+        return self.data[:self.size]
+
+    def copy(self) -> "_Column":
+        column = _Column.__new__(_Column)
+        column.data = self.view().copy()
+        column.size = self.size
+        return column
+
+    def shared(self) -> "_Column":
+        """Fixed-size view over the same buffer (safe for append-only columns)"""
+        column = _Column.__new__(_Column)
+        column.data = self.data
+        column.size = self.size
+        return column
+
+    def nbytes(self) -> int:
+        return self.data.nbytes
+
+    def __getstate__(self):
+        return self.view().copy()
+
+    def __setstate__(self, state):
+        self.data = state
+        self.size = len(state)
+
+
+class _Interner:
+    """Bidirectional value <-> dense int id map"""
+
+    def __init__(self):
+        self.ids: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def intern(self, value) -> int:
+        idx = self.ids.get(value)
+        if idx is None:
+            idx = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return idx
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def copy(self) -> "_Interner":
+        interner = _Interner()
+        interner.ids = dict(self.ids)
+        interner.values = list(self.values)
+        return interner
+
+
+class _NodeAttrs(MutableMapping):
+    """Write-through attribute mapping of one CompactGraph node"""
+
+    __slots__ = ("_graph", "_idx")
+
+    def __init__(self, graph: "CompactGraph", idx: int):
+        self._graph = graph
+        self._idx = idx
+
+    def __getitem__(self, key):
+        return self._graph._get_node_attr(self._idx, key)
+
+    def __setitem__(self, key, value):
+        self._graph._set_node_attr(self._idx, key, value)
+
+    def __delitem__(self, key):
+        self._graph._set_node_attr(self._idx, key, None)
+
+    def __iter__(self):
+        return iter(self._graph._node_keys(self._idx))
+
+    def __len__(self):
+        return len(self._graph._node_keys(self._idx))
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class _NodeView:
+    """networkx-style `G.nodes`: callable, iterable and subscriptable"""
+
+    def __init__(self, graph: "CompactGraph"):
+        self._graph = graph
+
+    def __call__(self, data: bool = False):
+        if not data:
+            return iter(self._graph._names.values)
+        return ((name, _NodeAttrs(self._graph, i)) for i, name in enumerate(self._graph._names.values))
+
+    def __iter__(self):
+        return iter(self._graph._names.values)
+
+    def __len__(self):
+        return len(self._graph._names)
+
+    def __contains__(self, name):
+        return name in self._graph._names.ids
+
+    def __getitem__(self, name) -> _NodeAttrs:
+        return _NodeAttrs(self._graph, self._graph._names.ids[name])
+
+
+class CompactGraph:
+    """Array-backed directed multigraph with the networkx API subset the services use.
+
+    Node names, node types and relation labels are interned to int32 ids.
+    Edges live in parallel columns (src, dst, relation, float32 confidence,
+    int32 page/chunk) with evidence text stored out-of-line in a single UTF-8
+    buffer. Adjacency is a forward and a reverse CSR index over the edge
+    columns; edges added since the last rebuild sit in a small pending buffer
+    that is folded in once it grows past a fraction of the index.
+
+    Edge keys are global edge ids. Edge attribute dicts are materialized on
+    access, so mutating them does not write back; node attribute mappings
+    (`G.nodes[name]`) do write through.
+
+    `snapshot()` returns a frozen copy for concurrent readers. Edge columns
+    are append-only and page/chunk arrays are replaced rather than mutated
+    (`add_provenance`), so the snapshot shares them and only copies the node
+    columns and dictionaries.
+    """
+
+    _frozen = False
+
+    def __init__(self):
+        self._names = _Interner()
+        self._types = _Interner()
+        self._relations = _Interner()
+
+        # Node columns
+        self._labels: List[Optional[str]] = []
+        self._descriptions: List[Optional[str]] = []
+        self._node_type = _Column(np.int32)
+        self._node_conf = _Column(np.float32)
+        self._node_relevance = _Column(np.int32)
+        self._node_pages: List[array.array] = []
+        self._node_chunks: List[array.array] = []
+        self._node_extra: Dict[int, Dict[str, Any]] = {}
+
+        # Edge columns
+        self._src = _Column(np.int32)
+        self._dst = _Column(np.int32)
+        self._rel = _Column(np.int32)
+        self._edge_conf = _Column(np.float32)
+        self._page = _Column(np.int32)
+        self._chunk = _Column(np.int32)
+        self._evidence = bytearray()
+        self._ev_offset = _Column(np.int64)
+        self._ev_length = _Column(np.int32)
+        self._edge_extra: Dict[int, Dict[str, Any]] = {}
+
+        # CSR over the first `_indexed` edges, sorted by (src, dst) / (dst, src)
+        self._indexed = 0
+        self._out_ptr = np.zeros(1, dtype=np.int64)
+        self._out_eids = np.zeros(0, dtype=np.int32)
+        self._out_dst = np.zeros(0, dtype=np.int32)
+        self._in_ptr = np.zeros(1, dtype=np.int64)
+        self._in_eids = np.zeros(0, dtype=np.int32)
+        self._pending_out: Dict[int, List[int]] = {}
+        self._pending_in: Dict[int, List[int]] = {}
+
+        self.nodes = _NodeView(self)
+
+    @classmethod
+    def from_networkx(cls, G: nx.MultiDiGraph) -> "CompactGraph":
+        graph = cls()
+        for name, data in G.nodes(data=True):
+            graph.add_node(name, **data)
+        for u, v, data in G.edges(data=True):
+            graph.add_edge(u, v, **data)
+        return graph
+
+    def snapshot(self) -> "CompactGraph":
+        """Frozen point-in-time copy; the writer keeps mutating self"""
+        snap = CompactGraph.__new__(CompactGraph)
+        snap.__dict__.update(self.__dict__)
+        snap._names = self._names.copy()
+        snap._types = self._types.copy()
+        snap._relations = self._relations.copy()
+        snap._labels = list(self._labels)
+        snap._descriptions = list(self._descriptions)
+        snap._node_type = self._node_type.copy()
+        snap._node_conf = self._node_conf.copy()
+        snap._node_relevance = self._node_relevance.copy()
+        snap._node_pages = list(self._node_pages)
+        snap._node_chunks = list(self._node_chunks)
+        snap._node_extra = {idx: dict(extra) for idx, extra in self._node_extra.items()}
+        for name in ("_src", "_dst", "_rel", "_edge_conf", "_page", "_chunk", "_ev_offset", "_ev_length"):
+            setattr(snap, name, getattr(self, name).shared())
+        snap._edge_extra = dict(self._edge_extra)
+        snap._pending_out = {idx: list(eids) for idx, eids in self._pending_out.items()}
+        snap._pending_in = {idx: list(eids) for idx, eids in self._pending_in.items()}
+        snap.nodes = _NodeView(snap)
+        snap._frozen = True
+        return snap
+
+    def _check_writable(self):
+        if self._frozen:
+            raise nx.NetworkXError("Frozen graph can't be modified")
+
+    def to_networkx(self) -> nx.MultiDiGraph:
+        G = nx.MultiDiGraph()
+        for name, data in self.nodes(data=True):
+            attrs = dict(data)
+            for key in ("pages", "chunks"):
+                if key in attrs:
+                    attrs[key] = list(attrs[key])
+            G.add_node(name, **attrs)
+        for u, v, data in self.edges(data=True):
+            G.add_edge(u, v, **data)
+        return G
+
+    # ---- nodes -------------------------------------------------------------
+
+    def _node_keys(self, idx: int) -> List[str]:
+        keys = []
+        if self._labels[idx] is not None:
+            keys.append("label")
+        if self._node_type.data.item(idx) != _NO_INT:
+            keys.append("type")
+        if self._descriptions[idx] is not None:
+            keys.append("description")
+        if not np.isnan(self._node_conf.data.item(idx)):
+            keys.append("confidence")
+        if self._node_relevance.data.item(idx) != _NO_INT:
+            keys.append("relevance_score")
+        if self._node_pages[idx] is not None:
+            keys.append("pages")
+        if self._node_chunks[idx] is not None:
+            keys.append("chunks")
+        keys.extend(self._node_extra.get(idx, ()))
+        return keys
+
+    def _get_node_attr(self, idx: int, key: str):
+        if key == "label":
+            value = self._labels[idx]
+        elif key == "type":
+            type_id = self._node_type.data.item(idx)
+            value = None if type_id == _NO_INT else self._types.values[type_id]
+        elif key == "description":
+            value = self._descriptions[idx]
+        elif key == "confidence":
+            conf = self._node_conf.data.item(idx)
+            value = None if np.isnan(conf) else _to_float(conf)
+        elif key == "relevance_score":
+            score = self._node_relevance.data.item(idx)
+            value = None if score == _NO_INT else score
+        elif key == "pages":
+            value = self._node_pages[idx]
+        elif key == "chunks":
+            value = self._node_chunks[idx]
+        else:
+            value = self._node_extra.get(idx, {}).get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def _set_node_attr(self, idx: int, key: str, value):
+        self._check_writable()
+        if key == "label":
+            self._labels[idx] = value
+        elif key == "type":
+            self._node_type.data[idx] = _NO_INT if value is None else self._types.intern(value)
+        elif key == "description":
+            self._descriptions[idx] = value
+        elif key == "confidence":
+            self._node_conf.data[idx] = _NO_FLOAT if value is None else value
+        elif key == "relevance_score":
+            self._node_relevance.data[idx] = _NO_INT if value is None else value
+        elif key in ("pages", "chunks"):
+            column = self._node_pages if key == "pages" else self._node_chunks
+            column[idx] = None if value is None else array.array("i", value)
+        elif value is None:
+            self._node_extra.get(idx, {}).pop(key, None)
+        else:
+            self._node_extra.setdefault(idx, {})[key] = value
+
+    def _intern_node(self, name) -> int:
+        idx = self._names.ids.get(name)
+        if idx is not None:
+            return idx
+        idx = self._names.intern(name)
+        self._labels.append(None)
+        self._descriptions.append(None)
+        self._node_type.append(_NO_INT)
+        self._node_conf.append(_NO_FLOAT)
+        self._node_relevance.append(_NO_INT)
+        self._node_pages.append(None)
+        self._node_chunks.append(None)
+        return idx
+
+    def add_node(self, name, **attrs):
+        self._check_writable()
+        idx = self._intern_node(name)
+        for key, value in attrs.items():
+            self._set_node_attr(idx, key, value)
+
+    def add_provenance(self, name, page: Optional[int], chunk: Optional[int]):
+        """Record that node `name` was seen on (page, chunk)"""
+        self._check_writable()
+        idx = self._names.ids[name]
+        for column, value in ((self._node_pages, page), (self._node_chunks, chunk)):
+            if value is None:
+                continue
+            current = column[idx]
+            # Replace instead of appending in place: snapshots share these arrays
+            if current is None:
+                column[idx] = array.array("i", [value])
+            elif value not in current:
+                column[idx] = current + array.array("i", [value])
+
+    def has_node(self, name) -> bool:
+        return name in self._names.ids
+
+    def __contains__(self, name) -> bool:
+        return name in self._names.ids
+
+    def __iter__(self):
+        return iter(self._names.values)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def number_of_nodes(self) -> int:
+        return len(self._names)
+
+    # ---- edges -------------------------------------------------------------
+
+    def add_edge(self, u, v, **attrs) -> int:
+        self._check_writable()
+        src, dst = self._intern_node(u), self._intern_node(v)
+        eid = self._src.size
+        self._src.append(src)
+        self._dst.append(dst)
+        relation = attrs.pop("relation", None)
+        self._rel.append(_NO_INT if relation is None else self._relations.intern(relation))
+        conf = attrs.pop("confidence", None)
+        self._edge_conf.append(_NO_FLOAT if conf is None else conf)
+        page = attrs.pop("page", None)
+        self._page.append(_NO_INT if page is None else page)
+        chunk = attrs.pop("chunk", None)
+        self._chunk.append(_NO_INT if chunk is None else chunk)
+        evidence = attrs.pop("evidence", _ABSENT)
+        if evidence is _ABSENT or evidence is None:
+            self._ev_offset.append(0)
+            self._ev_length.append(_NO_EVIDENCE if evidence is _ABSENT else _NONE_EVIDENCE)
+        else:
+            encoded = evidence.encode("utf-8")
+            self._ev_offset.append(len(self._evidence))
+            self._ev_length.append(len(encoded))
+            self._evidence.extend(encoded)
+        if attrs:
+            self._edge_extra[eid] = attrs
+
+        self._pending_out.setdefault(src, []).append(eid)
+        self._pending_in.setdefault(dst, []).append(eid)
+        pending = eid + 1 - self._indexed
+        if pending >= max(_REBUILD_MIN_PENDING, _REBUILD_PENDING_RATIO * self._indexed):
+            self._rebuild_index()
+        return eid
+
+    def _rebuild_index(self):
+        """Fold all edges into the forward and reverse CSR arrays"""
+        n, m = len(self._names), self._src.size
+        src, dst = self._src.view(), self._dst.view()
+
+        out_order = np.lexsort((dst, src)).astype(np.int32)
+        self._out_eids = out_order
+        self._out_dst = dst[out_order]
+        self._out_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=self._out_ptr[1:])
+
+        in_order = np.lexsort((src, dst)).astype(np.int32)
+        self._in_eids = in_order
+        self._in_ptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dst, minlength=n), out=self._in_ptr[1:])
+
+        self._indexed = m
+        self._pending_out = {}
+        self._pending_in = {}
+
+    def _out_eids_of(self, idx: int) -> List[int]:
+        eids: List[int] = []
+        if idx + 1 < len(self._out_ptr):
+            eids.extend(self._out_eids[self._out_ptr.item(idx):self._out_ptr.item(idx + 1)].tolist())
+        eids.extend(self._pending_out.get(idx, ()))
+        return eids
+
+    def _in_eids_of(self, idx: int) -> List[int]:
+        eids: List[int] = []
+        if idx + 1 < len(self._in_ptr):
+            eids.extend(self._in_eids[self._in_ptr.item(idx):self._in_ptr.item(idx + 1)].tolist())
+        eids.extend(self._pending_in.get(idx, ()))
+        return eids
+
+    def _eids_between(self, src: int, dst: int) -> List[int]:
+        eids: List[int] = []
+        if src + 1 < len(self._out_ptr):
+            start, end = int(self._out_ptr[src]), int(self._out_ptr[src + 1])
+            # Targets are sorted within a source's CSR slice
+            lo = bisect.bisect_left(self._out_dst, dst, start, end)
+            hi = bisect.bisect_right(self._out_dst, dst, lo, end)
+            if hi > lo:
+                eids.extend(self._out_eids[lo:hi].tolist())
+        dst_col = self._dst.data
+        eids.extend(e for e in self._pending_out.get(src, ()) if dst_col.item(e) == dst)
+        return eids
+
+    def _edge_data(self, eid: int) -> Dict[str, Any]:
+        # .item() returns Python scalars; much cheaper than numpy scalar indexing
+        data: Dict[str, Any] = {}
+        rel = self._rel.data.item(eid)
+        if rel != _NO_INT:
+            data["relation"] = self._relations.values[rel]
+        conf = self._edge_conf.data.item(eid)
+        if conf == conf:
+            data["confidence"] = _to_float(conf)
+        length = self._ev_length.data.item(eid)
+        if length >= 0:
+            offset = self._ev_offset.data.item(eid)
+            data["evidence"] = self._evidence[offset:offset + length].decode("utf-8")
+        elif length == _NONE_EVIDENCE:
+            data["evidence"] = None
+        page = self._page.data.item(eid)
+        if page != _NO_INT:
+            data["page"] = page
+        chunk = self._chunk.data.item(eid)
+        if chunk != _NO_INT:
+            data["chunk"] = chunk
+        if eid in self._edge_extra:
+            data.update(self._edge_extra[eid])
+        return data
+
+    def _edge_tuple(self, eid: int, keys: bool, data: bool) -> Tuple:
+        names = self._names.values
+        item = (names[self._src.data.item(eid)], names[self._dst.data.item(eid)])
+        if keys:
+            item += (eid,)
+        if data:
+            item += (self._edge_data(eid),)
+        return item
+
+    def has_edge(self, u, v) -> bool:
+        src, dst = self._names.ids.get(u), self._names.ids.get(v)
+        if src is None or dst is None:
+            return False
+        return bool(self._eids_between(src, dst))
+
+    def get_edge_data(self, u, v, default=None) -> Optional[Dict[int, Dict[str, Any]]]:
+        src, dst = self._names.ids.get(u), self._names.ids.get(v)
+        if src is None or dst is None:
+            return default
+        eids = self._eids_between(src, dst)
+        if not eids:
+            return default
+        return {eid: self._edge_data(eid) for eid in eids}
+
+    def has_relation(self, u, v, relation: str, chunk: int) -> bool:
+        """True if an edge u -> v with this relation label and chunk exists"""
+        src, dst = self._names.ids.get(u), self._names.ids.get(v)
+        rel = self._relations.ids.get(relation)
+        if src is None or dst is None or rel is None:
+            return False
+        rel_col, chunk_col = self._rel.data, self._chunk.data
+        return any(rel_col.item(e) == rel and chunk_col.item(e) == chunk for e in self._eids_between(src, dst))
+
+    def out_edges(self, nbunch=None, keys: bool = False, data: bool = False) -> Iterator[Tuple]:
+        if nbunch is None:
+            return self.edges(keys=keys, data=data)
+        idx = self._names.ids.get(nbunch)
+        eids = [] if idx is None else self._out_eids_of(idx)
+        return (self._edge_tuple(e, keys, data) for e in eids)
+
+    def in_edges(self, nbunch=None, keys: bool = False, data: bool = False) -> Iterator[Tuple]:
+        if nbunch is None:
+            return self.edges(keys=keys, data=data)
+        idx = self._names.ids.get(nbunch)
+        eids = [] if idx is None else self._in_eids_of(idx)
+        return (self._edge_tuple(e, keys, data) for e in eids)
+
+    def edges(self, nbunch=None, keys: bool = False, data: bool = False) -> Iterator[Tuple]:
+        if nbunch is not None:
+            return self.out_edges(nbunch, keys=keys, data=data)
+        return (self._edge_tuple(e, keys, data) for e in range(self._src.size))
+
+    def successors(self, name) -> Iterator:
+        idx = self._names.ids[name]
+        seen = dict.fromkeys(self._dst.data.item(e) for e in self._out_eids_of(idx))
+        return (self._names.values[i] for i in seen)
+
+    neighbors = successors
+
+    def predecessors(self, name) -> Iterator:
+        idx = self._names.ids[name]
+        seen = dict.fromkeys(self._src.data.item(e) for e in self._in_eids_of(idx))
+        return (self._names.values[i] for i in seen)
+
+    def out_degree(self, name) -> int:
+        return len(self._out_eids_of(self._names.ids[name]))
+
+    def in_degree(self, name) -> int:
+        return len(self._in_eids_of(self._names.ids[name]))
+
+    def degree(self, name) -> int:
+        return self.out_degree(name) + self.in_degree(name)
+
+    def number_of_edges(self) -> int:
+        return self._src.size
+
+    def nbytes(self) -> int:
+        """Approximate size of the array storage (excludes interned strings)"""
+        columns = (
+            self._node_type, self._node_conf, self._node_relevance, self._src, self._dst, self._rel,
+            self._edge_conf, self._page, self._chunk, self._ev_offset, self._ev_length,
+        )
+        index = (self._out_ptr, self._out_eids, self._out_dst, self._in_ptr, self._in_eids)
+        return sum(c.nbytes() for c in columns) + sum(a.nbytes for a in index) + len(self._evidence)
+
+
+class _SQLiteNodeAttrs(MutableMapping):
+    """Write-through attribute mapping of one SQLiteGraph node"""
+
+    __slots__ = ("_graph", "_name")
+
+    def __init__(self, graph: "SQLiteGraph", name: str):
+        self._graph = graph
+        self._name = name
+
+    def _attrs(self) -> Dict[str, Any]:
+        attrs = self._graph._node_attrs(self._name)
+        if attrs is None:
+            raise KeyError(self._name)
+        return attrs
+
+    def __getitem__(self, key):
+        return self._attrs()[key]
+
+    def get(self, key, default=None):
+        return self._attrs().get(key, default)
+
+    def __setitem__(self, key, value):
+        self._graph.add_node(self._name, **{key: value})
+
+    def __delitem__(self, key):
+        self._graph.add_node(self._name, **{key: None})
+
+    def __iter__(self):
+        return iter(self._attrs())
+
+    def __len__(self):
+        return len(self._attrs())
+
+    def __repr__(self):
+        return repr(self._attrs())
+
+
+class _SQLiteNodeView:
+    """networkx-style `G.nodes` over the nodes table"""
+
+    def __init__(self, graph: "SQLiteGraph"):
+        self._graph = graph
+
+    def __call__(self, data: bool = False):
+        if not data:
+            return iter(self)
+        return ((name, _SQLiteNodeAttrs(self._graph, name)) for name in self)
+
+    def __iter__(self):
+        return (row[0] for row in self._graph._query("SELECT name FROM nodes ORDER BY id"))
+
+    def __len__(self):
+        return self._graph.number_of_nodes()
+
+    def __contains__(self, name):
+        return self._graph.has_node(name)
+
+    def __getitem__(self, name) -> _SQLiteNodeAttrs:
+        if not self._graph.has_node(name):
+            raise KeyError(name)
+        return _SQLiteNodeAttrs(self._graph, name)
+
+
+def _close_connection(conn: sqlite3.Connection, lock: threading.RLock):
+    """End any open (read) transaction and close the connection"""
+    with lock:
+        if conn.in_transaction:
+            conn.rollback()
+        conn.close()
+
+
+class SQLiteGraph:
+    """Directed multigraph persisted in SQLite (WAL), with the same API subset as CompactGraph.
+
+    Nodes, edges and node provenance (page, chunk) live in their own tables.
+    The duplicate check `has_relation` is a single probe on the
+    (src, tgt, relation, chunk) index, and startup only opens the database.
+    Writes accumulate in one transaction that `commit()` makes durable and
+    visible to readers in other processes; WAL lets those readers query while
+    this process keeps writing. `snapshot()` opens a read-only connection
+    pinned to the last committed state.
+    """
+
+    _EDGE_COLUMNS = ("relation", "confidence", "evidence", "page", "chunk")
+    _NODE_COLUMNS = ("label", "type", "description", "confidence", "relevance_score")
+
+    def __init__(self, db_path: str, readonly: bool = False):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        uri = f"file:{db_path}?mode=ro" if readonly else f"file:{db_path}"
+        self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self._lock = threading.RLock()
+        # Not close(): the finalizer must not reference self
+        self._finalizer = weakref.finalize(self, _close_connection, self._conn, self._lock)
+        if readonly:
+            return
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS nodes (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE,
+                    label TEXT,
+                    type TEXT,
+                    description TEXT,
+                    confidence REAL,
+                    relevance_score INTEGER,
+                    extra TEXT
+                );
+                CREATE TABLE IF NOT EXISTS edges (
+                    id INTEGER PRIMARY KEY,
+                    src INTEGER NOT NULL REFERENCES nodes (id),
+                    tgt INTEGER NOT NULL REFERENCES nodes (id),
+                    relation TEXT,
+                    confidence REAL,
+                    evidence TEXT,
+                    page INTEGER,
+                    chunk INTEGER,
+                    extra TEXT
+                );
+                CREATE TABLE IF NOT EXISTS provenance (
+                    node_id INTEGER NOT NULL REFERENCES nodes (id),
+                    page INTEGER,
+                    chunk INTEGER,
+                    UNIQUE (node_id, page, chunk)
+                );
+                CREATE INDEX IF NOT EXISTS idx_edges_src_tgt_rel_chunk ON edges (src, tgt, relation, chunk);
+                CREATE INDEX IF NOT EXISTS idx_edges_src ON edges (src);
+                CREATE INDEX IF NOT EXISTS idx_edges_tgt ON edges (tgt);
+            """)
+            self._conn.commit()
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _node_id(self, name) -> Optional[int]:
+        rows = self._query("SELECT id FROM nodes WHERE name = ?", (name,))
+        return rows[0][0] if rows else None
+
+    @property
+    def nodes(self) -> _SQLiteNodeView:
+        # Built per access: a view stored on self would form a reference cycle that
+        # keeps unreferenced snapshots (and their read transactions) alive until gc
+        return _SQLiteNodeView(self)
+
+    def commit(self):
+        with self._lock:
+            self._conn.commit()
+
+    def snapshot(self) -> "SQLiteGraph":
+        """Read-only view of the last committed state (held open in a WAL read transaction).
+
+        The connection is closed when the snapshot is garbage collected, i.e.
+        once the published version is superseded and no reader pins it.
+        """
+        snap = SQLiteGraph(self.db_path, readonly=True)
+        with snap._lock:
+            snap._conn.execute("BEGIN")
+            # The first read fixes the snapshot the transaction sees
+            snap._conn.execute("SELECT COUNT(*) FROM nodes").fetchone()
+        return snap
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def close(self):
+        self._finalizer()
+
+    def import_graph(self, G):
+        """Bulk-copy a networkx/CompactGraph graph into this store (one transaction)"""
+        for name, data in G.nodes(data=True):
+            self.add_node(name, **data)
+        for u, v, data in G.edges(data=True):
+            self.add_edge(u, v, **data)
+        self.commit()
+
+    # ---- nodes -------------------------------------------------------------
+
+    def _node_attrs(self, name) -> Optional[Dict[str, Any]]:
+        rows = self._query(
+            f"SELECT id, {', '.join(self._NODE_COLUMNS)}, extra FROM nodes WHERE name = ?", (name,)
+        )
+        if not rows:
+            return None
+        node_id, *values, extra = rows[0]
+        attrs = {k: v for k, v in zip(self._NODE_COLUMNS, values) if v is not None}
+        if extra:
+            attrs.update(json.loads(extra))
+        provenance = self._query("SELECT page, chunk FROM provenance WHERE node_id = ? ORDER BY rowid", (node_id,))
+        if provenance:
+            attrs["pages"] = list(dict.fromkeys(p for p, _ in provenance if p is not None))
+            attrs["chunks"] = list(dict.fromkeys(c for _, c in provenance if c is not None))
+        return attrs
+
+    def add_node(self, name, **attrs):
+        pages = attrs.pop("pages", None)
+        chunks = attrs.pop("chunks", None)
+        columns = {k: attrs.pop(k) for k in self._NODE_COLUMNS if k in attrs}
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO nodes (name) VALUES (?)", (name,))
+            if columns:
+                self._conn.execute(
+                    f"UPDATE nodes SET {', '.join(f'{k} = ?' for k in columns)} WHERE name = ?",
+                    (*columns.values(), name)
+                )
+            if attrs:
+                row = self._conn.execute("SELECT extra FROM nodes WHERE name = ?", (name,)).fetchone()
+                extra = json.loads(row[0]) if row[0] else {}
+                extra.update(attrs)
+                extra = {k: v for k, v in extra.items() if v is not None}
+                self._conn.execute("UPDATE nodes SET extra = ? WHERE name = ?", (json.dumps(extra) if extra else None, name))
+            if pages or chunks:
+                for page, chunk in itertools.zip_longest(pages or (), chunks or ()):
+                    self.add_provenance(name, page, chunk)
+
+    def add_provenance(self, name, page: Optional[int], chunk: Optional[int]):
+        """Record that node `name` was seen on (page, chunk)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO provenance (node_id, page, chunk) "
+                "SELECT id, ?, ? FROM nodes WHERE name = ?",
+                (page, chunk, name)
+            )
+
+    def has_node(self, name) -> bool:
+        return self._node_id(name) is not None
+
+    def __contains__(self, name) -> bool:
+        return self.has_node(name)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def __len__(self) -> int:
+        return self.number_of_nodes()
+
+    def number_of_nodes(self) -> int:
+        return self._query("SELECT COUNT(*) FROM nodes")[0][0]
+
+    # ---- edges -------------------------------------------------------------
+
+    def add_edge(self, u, v, **attrs) -> int:
+        columns = {k: attrs.pop(k, None) for k in self._EDGE_COLUMNS}
+        with self._lock:
+            self._conn.execute("INSERT OR IGNORE INTO nodes (name) VALUES (?)", (u,))
+            self._conn.execute("INSERT OR IGNORE INTO nodes (name) VALUES (?)", (v,))
+            cursor = self._conn.execute(
+                f"INSERT INTO edges (src, tgt, {', '.join(columns)}, extra) "
+                f"SELECT s.id, t.id, {', '.join('?' * len(columns))}, ? "
+                f"FROM nodes s, nodes t WHERE s.name = ? AND t.name = ?",
+                (*columns.values(), json.dumps(attrs) if attrs else None, u, v)
+            )
+            return cursor.lastrowid
+
+    _EDGE_SELECT = (
+        "SELECT e.id, s.name, t.name, e.relation, e.confidence, e.evidence, e.page, e.chunk, e.extra "
+        "FROM edges e JOIN nodes s ON s.id = e.src JOIN nodes t ON t.id = e.tgt"
+    )
+
+    @classmethod
+    def _edge_tuple(cls, row: Tuple, keys: bool, data: bool) -> Tuple:
+        eid, u, v, *values, extra = row
+        item = (u, v)
+        if keys:
+            item += (eid,)
+        if data:
+            attrs = {k: val for k, val in zip(cls._EDGE_COLUMNS, values) if val is not None or k == "evidence"}
+            if extra:
+                attrs.update(json.loads(extra))
+            item += (attrs,)
+        return item
+
+    def has_edge(self, u, v) -> bool:
+        return bool(self._query(
+            "SELECT 1 FROM edges WHERE src = (SELECT id FROM nodes WHERE name = ?) "
+            "AND tgt = (SELECT id FROM nodes WHERE name = ?) LIMIT 1",
+            (u, v)
+        ))
+
+    def has_relation(self, u, v, relation: str, chunk: int) -> bool:
+        """True if an edge u -> v with this relation label and chunk exists (one index probe)"""
+        return bool(self._query(
+            "SELECT 1 FROM edges WHERE src = (SELECT id FROM nodes WHERE name = ?) "
+            "AND tgt = (SELECT id FROM nodes WHERE name = ?) AND relation = ? AND chunk = ? LIMIT 1",
+            (u, v, relation, chunk)
+        ))
+
+    def get_edge_data(self, u, v, default=None) -> Optional[Dict[int, Dict[str, Any]]]:
+        rows = self._query(
+            f"{self._EDGE_SELECT} WHERE s.name = ? AND t.name = ? ORDER BY e.id", (u, v)
+        )
+        if not rows:
+            return default
+        return {row[0]: self._edge_tuple(row, False, True)[2] for row in rows}
+
+    def out_edges(self, nbunch=None, keys: bool = False, data: bool = False) -> Iterator[Tuple]:
+        if nbunch is None:
+            return self.edges(keys=keys, data=data)
+        rows = self._query(f"{self._EDGE_SELECT} WHERE s.name = ? ORDER BY e.id", (nbunch,))
+        return (self._edge_tuple(row, keys, data) for row in rows)
+
+    def in_edges(self, nbunch=None, keys: bool = False, data: bool = False) -> Iterator[Tuple]:
+        if nbunch is None:
+            return self.edges(keys=keys, data=data)
+        rows = self._query(f"{self._EDGE_SELECT} WHERE t.name = ? ORDER BY e.id", (nbunch,))
+        return (self._edge_tuple(row, keys, data) for row in rows)
+
+    def edges(self, nbunch=None, keys: bool = False, data: bool = False) -> Iterator[Tuple]:
+        if nbunch is not None:
+            return self.out_edges(nbunch, keys=keys, data=data)
+        rows = self._query(f"{self._EDGE_SELECT} ORDER BY e.id")
+        return (self._edge_tuple(row, keys, data) for row in rows)
+
+    def successors(self, name) -> Iterator:
+        rows = self._query(
+            "SELECT t.name FROM edges e JOIN nodes t ON t.id = e.tgt "
+            "WHERE e.src = (SELECT id FROM nodes WHERE name = ?) GROUP BY t.id ORDER BY MIN(e.id)",
+            (name,)
+        )
+        return (row[0] for row in rows)
+
+    neighbors = successors
+
+    def predecessors(self, name) -> Iterator:
+        rows = self._query(
+            "SELECT s.name FROM edges e JOIN nodes s ON s.id = e.src "
+            "WHERE e.tgt = (SELECT id FROM nodes WHERE name = ?) GROUP BY s.id ORDER BY MIN(e.id)",
+            (name,)
+        )
+        return (row[0] for row in rows)
+
+    def out_degree(self, name) -> int:
+        return self._query(
+            "SELECT COUNT(*) FROM edges WHERE src = (SELECT id FROM nodes WHERE name = ?)", (name,)
+        )[0][0]
+
+    def in_degree(self, name) -> int:
+        return self._query(
+            "SELECT COUNT(*) FROM edges WHERE tgt = (SELECT id FROM nodes WHERE name = ?)", (name,)
+        )[0][0]
+
+    def degree(self, name) -> int:
+        return self.out_degree(name) + self.in_degree(name)
+
+    def number_of_edges(self) -> int:
+        return self._query("SELECT COUNT(*) FROM edges")[0][0]
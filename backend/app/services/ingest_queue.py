@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import inspect
+import os
+import sqlite3
+import threading
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from backend.app.core.config import settings
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+_JOB_FIELDS = (
+    "id", "filename", "file_path", "fingerprint", "status", "total_chunks", "processed_chunks",
+    "last_committed_chunk", "vectors_added", "chunks_per_minute", "error",
+    "created_at", "updated_at", "started_at", "finished_at",
+)
+
+
+def file_fingerprint(file_path: str) -> str:
+    """SHA-256 of the file content; identifies a document across uploads and restarts."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def extract_in_order(indices: Sequence[int], extract: Callable[[int], Awaitable[Any]],
+                           commit: Callable[[int, Any, Optional[Exception]], Optional[Awaitable[None]]],
+                           concurrency: int, retries: int = 0) -> List[int]:
+    """Run `extract(i)` for every chunk index with up to `concurrency` calls in flight,
+    committing results strictly in `indices` order.
+
+    A chunk whose extraction raises is retried up to `retries` times. `commit(i, result,
+    error)` is called exactly once per chunk, in order; `error` is the last exception
+    when every attempt failed (the caller must not checkpoint it as done). `commit` may be
+    a coroutine function; it is awaited before the next chunk is committed. Returns the
+    indices that failed.
+    """
+    in_flight = deque()
+    queued = iter(indices)
+    failed = []
+    for i in indices:
+        while len(in_flight) < max(1, concurrency):
+            j = next(queued, None)
+            if j is None:
+                break
+            in_flight.append(asyncio.ensure_future(extract(j)))
+
+        task = in_flight.popleft()
+        result, error = None, None
+        for attempt in range(retries + 1):
+            try:
+                result, error = await task, None
+                break
+            except asyncio.CancelledError:
+                for pending in in_flight:
+                    pending.cancel()
+                raise
+            except Exception as e:
+                error = e
+                print(f"Extraction of chunk {i} failed (attempt {attempt + 1}/{retries + 1}): {e}")
+                if attempt < retries:
+                    task = asyncio.ensure_future(extract(i))
+        if error is not None:
+            failed.append(i)
+        try:
+            committed = commit(i, result, error)
+            if inspect.isawaitable(committed):
+                await committed
+        except BaseException:
+            for pending in in_flight:
+                pending.cancel()
+            raise
+    return failed
+
+
+class IngestJobStore:
+    """SQLite table of ingestion jobs (one row per uploaded file)."""
+
+    def __init__(self, db_path: str):
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS ingest_jobs (
+                    id TEXT PRIMARY KEY,
+                    filename TEXT NOT NULL,
+                    file_path TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    total_chunks INTEGER,
+                    processed_chunks INTEGER NOT NULL DEFAULT 0,
+                    last_committed_chunk INTEGER NOT NULL DEFAULT -1,
+                    vectors_added INTEGER NOT NULL DEFAULT 0,
+                    chunks_per_minute REAL NOT NULL DEFAULT 0,
+                    error TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    started_at TEXT,
+                    finished_at TEXT
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_jobs_fingerprint ON ingest_jobs (fingerprint)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_ingest_jobs_status ON ingest_jobs (status, created_at)")
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        return dict(row) if row else None
+
+    def create(self, file_path: str, fingerprint: str) -> Dict[str, Any]:
+        now = datetime.now().isoformat()
+        job = {
+            "id": uuid.uuid4().hex, "filename": os.path.basename(file_path), "file_path": file_path,
+            "fingerprint": fingerprint, "status": QUEUED, "created_at": now, "updated_at": now,
+        }
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO ingest_jobs ({', '.join(job)}) VALUES ({', '.join('?' * len(job))})",
+                tuple(job.values())
+            )
+        return self.get(job["id"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._row(self._conn.execute("SELECT * FROM ingest_jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def find_by_fingerprint(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._row(self._conn.execute(
+                "SELECT * FROM ingest_jobs WHERE fingerprint = ? ORDER BY created_at DESC LIMIT 1", (fingerprint,)
+            ).fetchone())
+
+    def list(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM ingest_jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [dict(r) for r in rows]
+
+    def update(self, job_id: str, **fields):
+        fields = {k: v for k, v in fields.items() if k in _JOB_FIELDS}
+        fields["updated_at"] = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE ingest_jobs SET {', '.join(f'{k} = ?' for k in fields)} WHERE id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Atomically move the oldest queued job to running and return it."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM ingest_jobs WHERE status = ? ORDER BY created_at LIMIT 1", (QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE ingest_jobs SET status = ?, started_at = ?, updated_at = ?, error = NULL WHERE id = ?",
+                (RUNNING, now, now, row["id"])
+            )
+        return self.get(row["id"])
+
+    def requeue_interrupted(self) -> int:
+        """Jobs left running by a previous process go back to the queue."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE ingest_jobs SET status = ?, updated_at = ? WHERE status = ?",
+                (QUEUED, datetime.now().isoformat(), RUNNING)
+            )
+            return cursor.rowcount
+
+
+class IngestionQueue:
+    """Durable ingestion queue processed by a pool of asyncio workers.
+
+    Jobs survive restarts: on startup, interrupted jobs are re-queued and
+    `RAGService.ingest_document` resumes each one after the last chunk that
+    is durable in the graph checkpoint. Files are identified by content
+    fingerprint, so re-uploading a document that was already ingested (or is
+    in progress) does not pay for its extraction again.
+    """
+
+    def __init__(self, store: IngestJobStore, workers: int):
+        self.store = store
+        self.workers = max(1, workers)
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def submit(self, file_path: str) -> Dict[str, Any]:
+        """Queue a file for ingestion, reusing the existing job for the same content.
+
+        The file is hashed on a worker thread, so large uploads do not block the event loop.
+        """
+        fingerprint = await asyncio.to_thread(file_fingerprint, file_path)
+        job = self.store.find_by_fingerprint(fingerprint)
+        if job is None:
+            job = self.store.create(file_path, fingerprint)
+        elif job["status"] == FAILED:
+            self.store.update(job["id"], status=QUEUED, file_path=file_path, error=None)
+            job = self.store.get(job["id"])
+        else:
+            print(f"[IngestQueue] {os.path.basename(file_path)} already {job['status']} as job {job['id']}")
+        if self._wakeup:
+            self._wakeup.set()
+        return job
+
+    async def start(self):
+        requeued = self.store.requeue_interrupted()
+        if requeued:
+            print(f"[IngestQueue] Re-queued {requeued} interrupted job(s)")
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(n)) for n in range(self.workers)]
+        self._wakeup.set()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = self.store.claim_next()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=5.0)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            print(f"[IngestQueue] Worker {worker_id} running job {job['id']} ({job['filename']})")
+            await self._run(job)
+            # Let other workers pick up jobs queued meanwhile
+            self._wakeup.set()
+
+    async def _run(self, job: Dict[str, Any]):
+        from backend.app.services.rag_service import rag_service
+
+        def progress(counters: Dict[str, Any]):
+            self.store.update(job["id"], vectors_added=1, **counters)
+
+        try:
+            await rag_service.ingest_document(
+                job["file_path"],
+                source_id=job["fingerprint"],
+                add_vectors=not job["vectors_added"],
+                progress=progress
+            )
+            self.store.update(job["id"], status=COMPLETED, finished_at=datetime.now().isoformat())
+        except asyncio.CancelledError:
+            # Shutdown: leave the job running so it is re-queued on next start
+            raise
+        except Exception as e:
+            print(f"[IngestQueue] Job {job['id']} failed: {e}")
+            self.store.update(job["id"], status=FAILED, error=str(e), finished_at=datetime.now().isoformat())
+
+
+ingest_queue = IngestionQueue(IngestJobStore(settings.INGEST_JOBS_DB), workers=settings.INGEST_WORKERS)
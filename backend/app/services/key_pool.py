@@ -0,0 +1,271 @@
+import re
+import time
+import asyncio
+import threading
+from typing import List, Optional, Callable, Any, Dict, Mapping, Tuple
+
+# Longest a waiter sleeps before re-checking the pool (keys may be released earlier)
+_MAX_POLL_SECONDS = 1.0
+# Re-check interval when keys have budget but are at their in-flight limit
+_BUSY_POLL_SECONDS = 0.05
+_RESET_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_RESET_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def _parse_number(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset/retry headers ("7.66s", "2m59.56s", "12") into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _RESET_PATTERN.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _RESET_UNITS[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Continuously refilling budget of `capacity` units per `period` seconds."""
+    def __init__(self, capacity: float, period: float = 60.0, now: Optional[float] = None):
+        self.capacity = float(capacity)
+        self.period = period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.capacity / self.period)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (oversized requests wait for a full bucket)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) * self.period / self.capacity
+
+    def consume(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= amount
+
+    def refund(self, amount: float):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def learn(self, capacity: Optional[float] = None, remaining: Optional[float] = None,
+              reset: Optional[float] = None, now: Optional[float] = None):
+        """Adopt the limit / remaining budget reported by the provider.
+
+        `reset` is the provider's time until the bucket is full again; with a
+        partially used bucket it gives the refill period, so limits that are
+        not per minute (Groq reports requests per day) refill at their real rate.
+        """
+        if capacity and capacity > 0:
+            self.capacity = float(capacity)
+        if remaining is None:
+            return
+        if now is not None:
+            self.updated = now
+        self.tokens = min(self.capacity, float(remaining))
+        if reset and reset > 0 and self.tokens < self.capacity:
+            self.period = reset * self.capacity / (self.capacity - self.tokens)
+
+
+class KeyState:
+    """Rate-limit budget, health and cooldown of a single API key."""
+    def __init__(self, index: int, api_key: str, requests_per_minute: int, tokens_per_minute: int,
+                 now: Optional[float] = None):
+        self.index = index
+        self.api_key = api_key
+        self.requests = TokenBucket(requests_per_minute, now=now)
+        self.tokens = TokenBucket(tokens_per_minute, now=now)
+        self.cooldown_until = 0.0
+        self.consecutive_failures = 0
+        self.in_flight = 0
+        self.disabled = False
+        self.llm = None
+        # Counters
+        self.total_requests = 0
+        self.rate_limited = 0
+
+    @property
+    def label(self) -> str:
+        return f"#{self.index + 1}"
+
+    def wait_time(self, est_tokens: float, now: float) -> float:
+        if now < self.cooldown_until:
+            return self.cooldown_until - now
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(est_tokens, now))
+
+
+class APIKeyPool:
+    """Schedules LLM calls over all configured API keys.
+
+    Every key has its own requests/min and tokens/min buckets (seeded from
+    settings, corrected from rate-limit headers), an in-flight limit, and a
+    cooldown after a 429. Calls are dispatched to whichever healthy key has
+    budget, so independent calls run concurrently across keys. Waiting is
+    done with `time.sleep` in `acquire` (worker threads) or `asyncio.sleep`
+    in `aacquire` (event loop), never both. A caller gives up (TimeoutError)
+    once no key can be acquired before its deadline, by default
+    `acquire_timeout` seconds after its first attempt.
+
+    `clock` / `sleep` / `async_sleep` are injectable for tests.
+    """
+
+    def __init__(self, api_keys: List[str], requests_per_minute: int, tokens_per_minute: int,
+                 max_in_flight_per_key: int = 1, base_cooldown: float = 5.0, max_cooldown: float = 60.0,
+                 acquire_timeout: float = 300.0, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep, async_sleep: Callable[[float], Any] = asyncio.sleep):
+        self.clock = clock
+        self._sleep = sleep
+        self._async_sleep = async_sleep
+        now = clock()
+        self.keys = [KeyState(i, key, requests_per_minute, tokens_per_minute, now) for i, key in enumerate(api_keys)]
+        self.max_in_flight_per_key = max_in_flight_per_key
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.acquire_timeout = acquire_timeout
+        self._lock = threading.Lock()
+
+    @property
+    def api_keys(self) -> List[str]:
+        return [k.api_key for k in self.keys]
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of calls that can be in flight at once."""
+        return max(1, sum(1 for k in self.keys if not k.disabled) * self.max_in_flight_per_key)
+
+    def _try_acquire(self, est_tokens: float) -> Tuple[Optional[KeyState], float]:
+        """Reserve budget on the best ready key, or return how long to wait."""
+        with self._lock:
+            active = [k for k in self.keys if not k.disabled]
+            if not active:
+                raise ValueError("No usable API keys (all disabled)")
+
+            now = self.clock()
+            best, min_wait = None, float("inf")
+            for key in active:
+                wait = key.wait_time(est_tokens, now)
+                if key.in_flight >= self.max_in_flight_per_key:
+                    wait = max(wait, _BUSY_POLL_SECONDS)
+                if wait > 0:
+                    min_wait = min(min_wait, wait)
+                    continue
+                # Prefer the least loaded key, then the one with the most token budget left
+                if best is None or (key.in_flight, -key.tokens.tokens) < (best.in_flight, -best.tokens.tokens):
+                    best = key
+
+            if best is None:
+                return None, min_wait
+
+            best.requests.consume(1, now)
+            best.tokens.consume(est_tokens, now)
+            best.in_flight += 1
+            best.total_requests += 1
+            return best, 0.0
+
+    def deadline(self) -> float:
+        """Clock time after which a caller starting now stops waiting for keys."""
+        return self.clock() + self.acquire_timeout
+
+    def _next_sleep(self, wait: float, deadline: Optional[float]) -> float:
+        if deadline is None:
+            return min(wait, _MAX_POLL_SECONDS)
+        remaining = deadline - self.clock()
+        if remaining <= 0 or wait > remaining:
+            raise TimeoutError(f"No API key available within the deadline (next in {wait:.1f}s)")
+        return min(wait, _MAX_POLL_SECONDS)
+
+    def acquire(self, est_tokens: float, deadline: Optional[float] = None) -> KeyState:
+        """Block the calling (worker) thread until a key has budget (or the deadline passes)."""
+        while True:
+            key, wait = self._try_acquire(est_tokens)
+            if key:
+                return key
+            self._sleep(self._next_sleep(wait, deadline))
+
+    async def aacquire(self, est_tokens: float, deadline: Optional[float] = None) -> KeyState:
+        """Wait without blocking the event loop until a key has budget (or the deadline passes)."""
+        while True:
+            key, wait = self._try_acquire(est_tokens)
+            if key:
+                return key
+            await self._async_sleep(self._next_sleep(wait, deadline))
+
+    def release(self, key: KeyState, est_tokens: float, used_tokens: Optional[int] = None):
+        """Return a key after a successful call, settling the token estimate if usage is known."""
+        with self._lock:
+            key.in_flight -= 1
+            key.consecutive_failures = 0
+            if used_tokens is not None:
+                key.tokens.refund(est_tokens - used_tokens)
+
+    def _learn_limits(self, key: KeyState, headers: Mapping[str, str], now: float):
+        """Update both buckets of a key from x-ratelimit-* headers (lock held)."""
+        for kind, bucket in (("requests", key.requests), ("tokens", key.tokens)):
+            bucket.learn(
+                capacity=_parse_number(headers.get(f"x-ratelimit-limit-{kind}")),
+                remaining=_parse_number(headers.get(f"x-ratelimit-remaining-{kind}")),
+                reset=_parse_reset(headers.get(f"x-ratelimit-reset-{kind}")),
+                now=now,
+            )
+
+    def observe_headers(self, key: KeyState, headers: Mapping[str, str]):
+        """Learn a key's limits from the headers of any provider response (successful or not)."""
+        with self._lock:
+            self._learn_limits(key, headers, self.clock())
+
+    def report_rate_limit(self, key: KeyState, error: Exception) -> float:
+        """Put a key in cooldown after a 429 and learn its limits from the response headers."""
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        with self._lock:
+            now = self.clock()
+            key.in_flight -= 1
+            key.consecutive_failures += 1
+            key.rate_limited += 1
+
+            self._learn_limits(key, headers, now)
+            retry_after = _parse_reset(headers.get("retry-after"))
+            if retry_after is None:
+                retry_after = min(self.max_cooldown, self.base_cooldown * 2 ** (key.consecutive_failures - 1))
+            key.cooldown_until = now + retry_after
+            return retry_after
+
+    def report_failure(self, key: KeyState, error: Exception):
+        """Release a key after a non rate-limit error; disable it if the key itself is rejected."""
+        error_msg = str(error).lower()
+        with self._lock:
+            key.in_flight -= 1
+            if "401" in error_msg or "invalid api key" in error_msg or "invalid_api_key" in error_msg:
+                key.disabled = True
+                print(f"API Key {key.label} rejected by provider, disabled.")
+
+    def status(self) -> List[Dict[str, Any]]:
+        now = self.clock()
+        with self._lock:
+            return [
+                {
+                    "key": k.label,
+                    "disabled": k.disabled,
+                    "cooldown_seconds": round(max(0.0, k.cooldown_until - now), 2),
+                    "in_flight": k.in_flight,
+                    "requests_per_minute": k.requests.capacity,
+                    "tokens_per_minute": k.tokens.capacity,
+                    # Refill periods learned from the reset headers (Groq's request limit is per day)
+                    "requests_period_seconds": round(k.requests.period, 1),
+                    "tokens_period_seconds": round(k.tokens.period, 1),
+                    "total_requests": k.total_requests,
+                    "rate_limited": k.rate_limited,
+                }
+                for k in self.keys
+            ]
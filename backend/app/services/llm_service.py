@@ -1,97 +1,175 @@
-import time
-from typing import List, Optional, Callable, Any, Dict
+import asyncio
+from typing import Optional, Callable, Any, Dict, AsyncIterator, Tuple
+import httpx
 from langchain_groq import ChatGroq
 from backend.app.core.config import settings
+from backend.app.services.key_pool import APIKeyPool, KeyState
+from backend.app.services.llm_cache import LLMResponseCache
 
-class APIKeyManager:
-    """Manages rotation of API keys to handle rate limits."""
-    def __init__(self, api_keys: List[str]):
-        self.api_keys = api_keys
-        self.current_index = 0
-        self.failed_keys = set()
-    
-    def get_current_key(self) -> str:
-        if not self.api_keys:
-             raise ValueError("No API keys allowed")
-        return self.api_keys[self.current_index]
-    
-    def rotate_key(self) -> bool:
-        """Rotates to the next available key. Returns True if successful, False if all keys exhausted."""
-        self.failed_keys.add(self.current_index)
-        for i in range(len(self.api_keys)):
-            next_index = (self.current_index + 1 + i) % len(self.api_keys)
-            if next_index not in self.failed_keys:
-                self.current_index = next_index
-                print(f"Switched to API Key #{next_index + 1}")
-                return True
-        return False
-    
-    def reset_failed(self):
-        """Resets the failed keys set (e.g., after a waiting period)."""
-        self.failed_keys.clear()
 
 class LLMService:
     def __init__(self):
-        self.api_manager = APIKeyManager(settings.GROQ_API_KEYS)
-        self.llm = self._init_llm()
-
-    def _init_llm(self):
-        """Initializes the ChatGroq model with the current key."""
-        if not self.api_manager.api_keys:
-             print("Warning: No Groq API keys found. LLM disabled.")
-             return None
-             
+        self.key_pool = APIKeyPool(
+            settings.GROQ_API_KEYS,
+            requests_per_minute=settings.GROQ_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.GROQ_TOKENS_PER_MINUTE,
+            max_in_flight_per_key=settings.GROQ_MAX_IN_FLIGHT_PER_KEY,
+            base_cooldown=settings.GROQ_BASE_COOLDOWN_SECONDS,
+            max_cooldown=settings.GROQ_MAX_COOLDOWN_SECONDS,
+            acquire_timeout=settings.GROQ_ACQUIRE_TIMEOUT_SECONDS,
+        )
+        self.cache = (
+            LLMResponseCache(settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_BYTES)
+            if settings.LLM_CACHE_ENABLED else None
+        )
+        if not self.key_pool.keys:
+            print("Warning: No Groq API keys found. LLM disabled.")
+
+    def _init_llm(self, key: KeyState):
+        """Initializes a ChatGroq model bound to one key of the pool.
+
+        The HTTP clients report the rate-limit headers of every response to the pool.
+        """
+        def observe(response: httpx.Response):
+            self.key_pool.observe_headers(key, response.headers)
+
+        async def aobserve(response: httpx.Response):
+            observe(response)
+
         return ChatGroq(
             temperature=0.0,
             model_name=settings.LLM_MODEL,
-            api_key=self.api_manager.get_current_key()
+            api_key=key.api_key,
+            http_client=httpx.Client(event_hooks={"response": [observe]}),
+            http_async_client=httpx.AsyncClient(event_hooks={"response": [aobserve]}),
+            # Retries and backoff are handled by the key pool
+            max_retries=0
         )
 
-    def get_llm(self):
-        """Returns the current LLM instance. Re-initializes if needed."""
-        if self.llm is None:
-             self.llm = self._init_llm()
-        return self.llm
+    def _llm_for(self, key: KeyState):
+        if key.llm is None:
+            key.llm = self._init_llm(key)
+        return key.llm
+
+    @staticmethod
+    def _estimate_tokens(input_data: Dict[str, Any]) -> int:
+        """Rough token cost of a call: ~3 characters per token plus prompt template and completion."""
+        return sum(len(str(v)) for v in input_data.values()) // 3 + settings.LLM_TOKEN_ESTIMATE_OVERHEAD
+
+    @staticmethod
+    def _used_tokens(result: Any) -> Optional[int]:
+        usage = getattr(result, "usage_metadata", None)
+        return usage.get("total_tokens") if usage else None
+
+    @staticmethod
+    def _is_rate_limit_error(error: Exception) -> bool:
+        error_msg = str(error).lower()
+        # Check for Groq-specific rate limit errors (often 429)
+        return "429" in error_msg or "rate limit" in error_msg or "too many requests" in error_msg
+
+    def _on_rate_limit(self, key: KeyState, error: Exception):
+        cooldown = self.key_pool.report_rate_limit(key, error)
+        print(f"Rate limit hit with key {key.label}. Cooling down for {cooldown:.1f}s, dispatching to other keys.")
+
+    def _cache_lookup(self, cache_namespace: Optional[str], input_data: Dict[str, Any]) -> Tuple[Optional[str], bool, Any]:
+        """Returns (cache key, hit, cached result); the key is None when caching is off for this call."""
+        if cache_namespace is None or self.cache is None:
+            return None, False, None
+        key = self.cache.make_key(cache_namespace, settings.LLM_MODEL, input_data)
+        hit, value = self.cache.get(key)
+        return key, hit, value
 
-    def execute_chain(self, chain_factory: Callable[[Any], Any], input_data: Dict[str, Any], max_retries: int = 3):
+    async def aexecute_chain(self, chain_factory: Callable[[Any], Any], input_data: Dict[str, Any], max_retries: Optional[int] = None,
+                             cache_namespace: Optional[str] = None):
         """
-        Executes a chain with key rotation logic.
-        
+        Executes a chain on the next available key of the pool using the runnable's native `ainvoke`.
+
+        Waiting for key budget and cooldowns uses asyncio.sleep, so many calls can be
+        in flight on a single event loop without a thread per request.
+
         Args:
             chain_factory: A function that takes an LLM instance and returns a Chain/Runnable.
             input_data: Input dictionary for the chain.
-            max_retries: Number of retries on RateLimitError.
+            max_retries: Rate-limited attempts before giving up, each on the next ready key
+                (GROQ_MAX_RETRIES by default). Waiting for keys is bounded by the pool's deadline
+                (GROQ_ACQUIRE_TIMEOUT_SECONDS for the whole call), which raises TimeoutError.
+            cache_namespace: Opt-in result caching. Pass the prompt template text (anything that
+                changes the output when it changes); results are cached by
+                hash(cache_namespace, model name, input_data). Only use for deterministic chains.
+        """
+        cache_key, hit, cached = self._cache_lookup(cache_namespace, input_data)
+        if hit:
+            return cached
+        if not self.key_pool.keys:
+            raise ValueError("LLM not initialized")
+        est_tokens = self._estimate_tokens(input_data)
+
+        deadline = self.key_pool.deadline()
+        last_error = None
+        for _ in range(max_retries or settings.GROQ_MAX_RETRIES):
+            key = await self.key_pool.aacquire(est_tokens, deadline)
+            try:
+                result = await chain_factory(self._llm_for(key)).ainvoke(input_data)
+            except asyncio.CancelledError:
+                self.key_pool.release(key, est_tokens)
+                raise
+            except Exception as e:
+                if self._is_rate_limit_error(e):
+                    self._on_rate_limit(key, e)
+                    last_error = e
+                    continue
+                self.key_pool.report_failure(key, e)
+                raise e
+            self.key_pool.release(key, est_tokens, self._used_tokens(result))
+            if cache_key:
+                self.cache.put(cache_key, result)
+            return result
+
+        raise Exception(f"Max retries exceeded for LLM execution: {last_error}") from last_error
+
+    async def astream_chain(self, chain_factory: Callable[[Any], Any], input_data: Dict[str, Any], max_retries: Optional[int] = None) -> AsyncIterator[str]:
+        """
+        Streams a chain's text output with the same key scheduling as aexecute_chain.
+
+        If a rate limit hits mid-stream, the chain is restarted on another key and the
+        prefix that was already yielded is skipped (generation runs at temperature 0),
+        so the caller sees one continuous stream.
         """
-        for attempt in range(max_retries):
+        if not self.key_pool.keys:
+            raise ValueError("LLM not initialized")
+        est_tokens = self._estimate_tokens(input_data)
+
+        emitted = 0
+        deadline = self.key_pool.deadline()
+        last_error = None
+        for _ in range(max_retries or settings.GROQ_MAX_RETRIES):
+            key = await self.key_pool.aacquire(est_tokens, deadline)
             try:
-                # Always get the latest LLM instance
-                current_llm = self.get_llm()
-                if not current_llm:
-                    raise ValueError("LLM not initialized")
-                
-                # Create the chain using the current LLM
-                chain = chain_factory(current_llm)
-                return chain.invoke(input_data)
-                
+                chain = chain_factory(self._llm_for(key))
+                produced = 0
+                async for chunk in chain.astream(input_data):
+                    text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+                    if not text:
+                        continue
+                    start, produced = produced, produced + len(text)
+                    if produced <= emitted:
+                        continue
+                    yield text[max(0, emitted - start):]
+                    emitted = produced
+            except (GeneratorExit, asyncio.CancelledError):
+                # Consumer stopped reading (e.g. client disconnected)
+                self.key_pool.release(key, est_tokens)
+                raise
             except Exception as e:
-                error_msg = str(e).lower()
-                # Check for Groq-specific rate limit errors (often 429)
-                if "429" in error_msg or "rate limit" in error_msg or "too many requests" in error_msg:
-                    print(f"Rate limit hit with key #{self.api_manager.current_index + 1}. Attempting rotation...")
-                    
-                    if self.api_manager.rotate_key():
-                        # Re-init LLM with new key
-                        self.llm = self._init_llm()
-                        time.sleep(1) # Brief pause
-                    else:
-                        print("All keys exhausted. Waiting 60s before retry...")
-                        time.sleep(60)
-                        self.api_manager.reset_failed()
-                        self.llm = self._init_llm()
-                else:
-                    # Not a rate limit error, raise it
-                    raise e
-                    
-        raise Exception("Max retries exceeded for LLM execution")
+                if self._is_rate_limit_error(e):
+                    self._on_rate_limit(key, e)
+                    last_error = e
+                    continue
+                self.key_pool.report_failure(key, e)
+                raise e
+            self.key_pool.release(key, est_tokens)
+            return
+
+        raise Exception(f"Max retries exceeded for LLM execution: {last_error}") from last_error
 
 llm_service = LLMService()
@@ -0,0 +1,33 @@
+from typing import List, Sequence
+
+
+def plan_micro_batches(lengths: Sequence[int], token_budget: int, max_batch_size: int) -> List[List[int]]:
+    """Group pair indices into length-sorted micro-batches.
+
+    Pairs are sorted by token length so that each micro-batch pads to
+    a similar length.  A batch is closed when adding the next pair
+    would exceed ``max_batch_size`` or make the padded size (rows x
+    longest row) exceed ``token_budget``.  A single pair longer than
+    the budget still forms its own batch.
+
+    Args:
+        lengths: Token length of every pair.
+        token_budget: Maximum padded tokens per batch.
+        max_batch_size: Maximum pairs per batch.
+
+    Returns:
+        Lists of indices into ``lengths``, shortest pairs first.
+    """
+    order = sorted(range(len(lengths)), key=lengths.__getitem__)
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for index in order:
+        # Sorted ascending: this pair sets the padded length of the batch
+        padded = (len(current) + 1) * lengths[index]
+        if current and (len(current) >= max_batch_size or padded > token_budget):
+            batches.append(current)
+            current = []
+        current.append(index)
+    if current:
+        batches.append(current)
+    return batches
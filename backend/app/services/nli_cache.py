@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class NLIScoreCache:
+    """Entailment probabilities keyed by (model, hash(premise), hash(hypothesis)).
+
+    Retrieved passages recur across questions and self-reflection retries
+    re-verify nearly identical statements, so most pairs have been scored
+    before. A bounded in-memory LRU is checked first, then an optional
+    SQLite tier that survives restarts (disk hits are promoted to memory).
+
+    The model name is part of every key, and the disk tier drops rows of
+    other models when it is opened, so scores of a previous NLI_MODEL_NAME
+    are never served.
+    """
+
+    def __init__(self, model_name: str, max_entries: int, db_path: Optional[str] = None):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[Tuple[str, str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if db_path:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._lock:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS nli_cache (
+                        model TEXT NOT NULL,
+                        premise TEXT NOT NULL,
+                        hypothesis TEXT NOT NULL,
+                        score REAL NOT NULL,
+                        PRIMARY KEY (model, premise, hypothesis)
+                    ) WITHOUT ROWID
+                """)
+                dropped = self._conn.execute("DELETE FROM nli_cache WHERE model != ?", (model_name,)).rowcount
+                self._conn.commit()
+            if dropped:
+                print(f"NLI cache: dropped {dropped} scores of previous models")
+
+    def keys(self, pairs: Sequence[Tuple[str, str]]) -> List[Tuple[str, str, str]]:
+        """Cache keys of (premise, hypothesis) pairs; each distinct text is hashed once"""
+        digests: Dict[str, str] = {}
+
+        def digest(text: str) -> str:
+            value = digests.get(text)
+            if value is None:
+                value = digests[text] = _digest(text)
+            return value
+
+        return [(self.model_name, digest(premise), digest(hypothesis)) for premise, hypothesis in pairs]
+
+    def get_many(self, keys: Sequence[Tuple[str, str, str]]) -> List[Optional[float]]:
+        """Cached scores aligned with `keys` (None for misses)"""
+        found: List[Optional[float]] = [None] * len(keys)
+        with self._lock:
+            missing = []
+            for i, key in enumerate(keys):
+                score = self._memory.get(key)
+                if score is None:
+                    missing.append(i)
+                else:
+                    self._memory.move_to_end(key)
+                    found[i] = score
+            self.hits += len(keys) - len(missing)
+
+            if missing and self._conn is not None:
+                still_missing = []
+                for i in missing:
+                    row = self._conn.execute(
+                        "SELECT score FROM nli_cache WHERE model = ? AND premise = ? AND hypothesis = ?", keys[i]
+                    ).fetchone()
+                    if row is None:
+                        still_missing.append(i)
+                    else:
+                        found[i] = row[0]
+                        self._remember(keys[i], row[0])
+                self.disk_hits += len(missing) - len(still_missing)
+                missing = still_missing
+            self.misses += len(missing)
+        return found
+
+    def put_many(self, keys: Sequence[Tuple[str, str, str]], scores: Sequence[float]):
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._remember(key, float(score))
+            if self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO nli_cache (model, premise, hypothesis, score) VALUES (?, ?, ?, ?)",
+                    [(*key, float(score)) for key, score in zip(keys, scores)]
+                )
+                self._conn.commit()
+
+    def _remember(self, key: Tuple[str, str, str], score: float):
+        """Insert into the memory tier and evict least recently used (lock held)"""
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = score
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM nli_cache")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._memory)
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "model": self.model_name,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
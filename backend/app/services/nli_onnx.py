@@ -0,0 +1,81 @@
+import os
+from typing import Callable, Dict, List
+
+import numpy as np
+import torch
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Positional-input wrapper exporting only the classification logits"""
+
+    def __init__(self, model: torch.nn.Module, input_names: List[str]):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs))).logits
+
+
+def export_onnx(model: torch.nn.Module, tokenizer, path: str, opset: int = 14):
+    """Export a sequence-classification model to ONNX with dynamic batch/sequence axes (atomic)"""
+    input_names = list(tokenizer.model_input_names)
+    sample = tokenizer("premise", "hypothesis", return_tensors="pt")
+    args = tuple(sample[name] for name in input_names)
+    axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    axes["logits"] = {0: "batch"}
+    tmp_path = path + ".tmp"
+    with torch.no_grad():
+        torch.onnx.export(
+            _LogitsOnly(model.eval(), input_names), args, tmp_path,
+            input_names=input_names, output_names=["logits"], dynamic_axes=axes, opset_version=opset,
+        )
+    os.replace(tmp_path, path)
+
+
+class OnnxNLIRunner:
+    """ONNX Runtime CPU inference for the NLI cross-encoder.
+
+    The model is exported once to `cache_dir` (and, with `quantize`, turned
+    into a dynamically int8-quantized copy: int8 weights, activations
+    quantized on the fly), then later starts load the cached file without
+    touching the PyTorch weights. Intra-op threads default to all cores;
+    inter-op parallelism is off since one micro-batch runs at a time.
+
+    Called with the padded tokenizer features of a micro-batch, returns the
+    logits as a torch tensor, like the PyTorch model's forward pass.
+    """
+
+    def __init__(self, load_model: Callable[[], torch.nn.Module], tokenizer, cache_dir: str,
+                 quantize: bool = False, threads: int = 0):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("NLI_BACKEND='onnx'/'onnx-int8' requires the onnxruntime package") from e
+
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, "model.onnx")
+        if not os.path.exists(path):
+            print(f"Exporting NLI model to ONNX: {path}")
+            export_onnx(load_model(), tokenizer, path)
+        if quantize:
+            fp32_path, path = path, os.path.join(cache_dir, "model.int8.onnx")
+            if not os.path.exists(path):
+                from onnxruntime.quantization import QuantType, quantize_dynamic
+                print(f"Quantizing NLI model to int8: {path}")
+                tmp_path = path + ".tmp"
+                quantize_dynamic(fp32_path, tmp_path, weight_type=QuantType.QInt8)
+                os.replace(tmp_path, path)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = threads or os.cpu_count() or 1
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.path = path
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def __call__(self, features: Dict[str, torch.Tensor]) -> torch.Tensor:
+        feeds = {name: features[name].cpu().numpy().astype(np.int64) for name in self.input_names}
+        return torch.from_numpy(self.session.run(["logits"], feeds)[0])
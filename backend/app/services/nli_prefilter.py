@@ -0,0 +1,66 @@
+import math
+import re
+from collections import Counter
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# e5 models are trained with these role prefixes for asymmetric retrieval (EMBEDDING_*_PREFIX)
+_QUERY_PREFIX = "query: "
+_PASSAGE_PREFIX = "passage: "
+
+
+def _tokenize(text: str) -> List[str]:
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+def bm25_scores(queries: Sequence[str], passages: Sequence[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """Okapi BM25 of every query against every passage (statistics from `passages` only): S x P"""
+    docs = [Counter(_tokenize(p)) for p in passages]
+    lengths = np.array([sum(d.values()) for d in docs], dtype=np.float64)
+    avg_length = lengths.mean() if len(docs) and lengths.mean() > 0 else 1.0
+    df = Counter(term for d in docs for term in d)
+    n = len(docs)
+    norm = k1 * (1.0 - b + b * lengths / avg_length)
+
+    scores = np.zeros((len(queries), n))
+    for qi, query in enumerate(queries):
+        for term in set(_tokenize(query)):
+            if term not in df:
+                continue
+            idf = math.log(1.0 + (n - df[term] + 0.5) / (df[term] + 0.5))
+            tf = np.array([d.get(term, 0) for d in docs], dtype=np.float64)
+            scores[qi] += idf * tf * (k1 + 1.0) / (tf + norm)
+    return scores
+
+
+def embedding_scores(queries: Sequence[str], passages: Sequence[str],
+                     embed: Callable[[List[str]], List[List[float]]],
+                     query_prefix: str = _QUERY_PREFIX, passage_prefix: str = _PASSAGE_PREFIX) -> np.ndarray:
+    """Cosine similarity of bi-encoder embeddings (one batch for all texts): S x P"""
+    texts = [query_prefix + q for q in queries] + [passage_prefix + p for p in passages]
+    vectors = np.asarray(embed(texts), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    return vectors[:len(queries)] @ vectors[len(queries):].T
+
+
+def select_passages(scores: np.ndarray, top_m: int, margin: float) -> List[List[int]]:
+    """Per query, the passage indices worth cross-encoding (in passage order).
+
+    Keeps the top `top_m` passages plus every passage whose score, min-max
+    normalized per query, is within `margin` of the m-th best: a recall
+    safety net for near-ties the cheap scorer cannot separate. margin=0
+    keeps exactly top_m (plus exact ties); margin=1 keeps everything.
+    """
+    n_queries, n_passages = scores.shape
+    if n_passages <= top_m:
+        return [list(range(n_passages)) for _ in range(n_queries)]
+    selected = []
+    for row in scores:
+        low, high = row.min(), row.max()
+        normalized = (row - low) / (high - low) if high > low else np.ones_like(row)
+        cutoff = np.sort(normalized)[::-1][top_m - 1] - margin
+        selected.append(np.flatnonzero(normalized >= cutoff).tolist())
+    return selected
@@ -0,0 +1,172 @@
+import os
+from typing import Optional, Sequence, Tuple
+
+import torch
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+
+from backend.app.services.nli_batching import plan_micro_batches
+from backend.app.services.nli_cache import NLIScoreCache
+from backend.app.services.nli_onnx import OnnxNLIRunner
+
+# Maximum tokenized length of a (premise, hypothesis) pair.
+_MAX_LENGTH = 512
+
+
+def entailment_index(config) -> int:
+    """Index of the 'entailment' logit, read from the model's label2id.
+
+    NLI checkpoints disagree on label order (roberta-large-mnli puts
+    entailment last, many distilled multilingual models put it first),
+    so the index is never hard-coded.
+    """
+    labels = {label.lower(): index for label, index in config.label2id.items()}
+    if "entailment" not in labels:
+        raise ValueError(f"NLI model has no 'entailment' label: {sorted(config.label2id)}")
+    return int(labels["entailment"])
+
+
+class NLIScorer:
+    """Entailment probabilities of (premise, hypothesis) pairs from one NLI model.
+
+    Owns the tokenizer, the inference backend (PyTorch, or an ONNX Runtime
+    session) and the optional score cache of a single model, so the critic
+    can hold one scorer per cascade tier.
+
+    Attributes:
+        model_name: Hugging Face model id.
+        backend: Inference backend ("torch", "onnx" or "onnx-int8").
+        device: The torch device used for inference (cuda or cpu).
+        entailment_index: Position of the 'entailment' logit.
+        batch_token_budget: Maximum padded tokens (rows x longest row)
+            per forward pass.
+        max_batch_size: Maximum pairs per forward pass.
+        score_cache: Entailment probabilities of previously scored
+            pairs, or None when caching is disabled.
+        onnx_runner: ONNX Runtime session replacing the PyTorch model,
+            or None with the torch backend.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        backend: str = "torch",
+        batch_token_budget: int = 8192,
+        max_batch_size: int = 32,
+        score_cache: Optional[NLIScoreCache] = None,
+        onnx_dir: str = "",
+        onnx_threads: int = 0,
+    ) -> None:
+        """Load the tokenizer and the model for the selected backend.
+
+        With the torch backend the model is placed on a CUDA device when
+        available, otherwise it falls back to CPU.  The ONNX backends run
+        on CPU from a cached export under ``onnx_dir`` and only load the
+        PyTorch weights when the export does not exist yet.
+        """
+        if backend not in ("torch", "onnx", "onnx-int8"):
+            raise ValueError(f"Unknown NLI_BACKEND: {backend}")
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_token_budget = batch_token_budget
+        self.max_batch_size = max_batch_size
+        self.score_cache = score_cache
+        self.entailment_index = entailment_index(AutoConfig.from_pretrained(model_name))
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        self.model = None
+        self.onnx_runner: Optional[OnnxNLIRunner] = None
+        if backend == "torch":
+            self.device = torch.device(
+                "cuda" if torch.cuda.is_available() else "cpu"
+            )
+            self.model = AutoModelForSequenceClassification.from_pretrained(
+                model_name
+            )
+            self.model.to(self.device)
+            self.model.eval()
+        else:
+            self.device = torch.device("cpu")
+            self.onnx_runner = OnnxNLIRunner(
+                lambda: AutoModelForSequenceClassification.from_pretrained(model_name),
+                self.tokenizer,
+                os.path.join(onnx_dir, model_name.replace("/", "__")),
+                quantize=backend == "onnx-int8",
+                threads=onnx_threads,
+            )
+
+    def score_pairs(self, pairs: Sequence[Tuple[str, str]]) -> torch.Tensor:
+        """Compute entailment probabilities for many (premise, hypothesis) pairs.
+
+        Pairs found in the score cache are not run through the model,
+        and duplicate pairs are scored once.  The remaining pairs are
+        scored with ``run_model`` and added to the cache.
+
+        Args:
+            pairs: (premise, hypothesis) tuples.
+
+        Returns:
+            A 1-D float tensor of entailment probabilities aligned with
+            ``pairs``.
+        """
+        if self.score_cache is None:
+            return self.run_model(pairs)
+
+        keys = self.score_cache.keys(pairs)
+        cached = self.score_cache.get_many(keys)
+        missing = list(dict.fromkeys(key for key, score in zip(keys, cached) if score is None))
+        if missing:
+            first = {key: i for i, key in reversed(list(enumerate(keys)))}
+            computed = self.run_model([pairs[first[key]] for key in missing]).tolist()
+            self.score_cache.put_many(missing, computed)
+            fresh = dict(zip(missing, computed))
+            cached = [fresh[key] if score is None else score for key, score in zip(keys, cached)]
+        return torch.tensor(cached, dtype=torch.float32)
+
+    def run_model(self, pairs: Sequence[Tuple[str, str]]) -> torch.Tensor:
+        """Run the NLI model over (premise, hypothesis) pairs in micro-batches.
+
+        Steps:
+            1. Tokenize every pair once, truncated to the model max length
+               and without padding.
+            2. Plan length-sorted micro-batches within the token budget.
+            3. Pad each micro-batch, run a forward pass (PyTorch with
+               gradients disabled, or the ONNX Runtime session) and apply
+               softmax to the logits.
+            4. Scatter the 'entailment' probabilities back to pair order.
+
+        Args:
+            pairs: (premise, hypothesis) tuples.
+
+        Returns:
+            A 1-D float tensor of entailment probabilities aligned with
+            ``pairs``.
+        """
+        scores = torch.zeros(len(pairs))
+        if not pairs:
+            return scores
+
+        encodings = self.tokenizer(
+            [premise for premise, _ in pairs],
+            [hypothesis for _, hypothesis in pairs],
+            truncation=True,
+            max_length=_MAX_LENGTH,
+        )
+        lengths = [len(ids) for ids in encodings["input_ids"]]
+
+        for batch in plan_micro_batches(
+            lengths, self.batch_token_budget, self.max_batch_size
+        ):
+            features = self.tokenizer.pad(
+                {key: [values[i] for i in batch] for key, values in encodings.items()},
+                return_tensors="pt",
+            )
+            if self.onnx_runner is not None:
+                logits = self.onnx_runner(features)
+            else:
+                features = {k: v.to(self.device) for k, v in features.items()}
+                with torch.no_grad():
+                    logits = self.model(**features).logits
+
+            probabilities = torch.softmax(logits, dim=-1)
+            scores[torch.tensor(batch)] = probabilities[:, self.entailment_index].float().cpu()
+
+        return scores
@@ -0,0 +1,154 @@
+import heapq
+import itertools
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Set, Tuple
+
+# neighbors(node) -> iterable of (neighbor, relation, confidence)
+NeighborFn = Callable[[Hashable], Iterable[Tuple[Hashable, str, float]]]
+
+
+def top_k_paths(
+    start: Hashable,
+    neighbors: NeighborFn,
+    k: int = 5,
+    max_depth: int = 2,
+    confidence_threshold: float = 0.5,
+    max_expansions: int = 5000,
+) -> List[Dict]:
+    """The k most confident simple paths out of `start`, best first.
+
+    Path confidence is the product of edge confidences, so extending a path
+    never increases it. Searching best-first on that product (Dijkstra on
+    -log confidence) therefore pops paths in exactly the order a full
+    enumeration sorted by confidence would produce, and the search can stop
+    after k pops instead of enumerating every path up to `max_depth`.
+
+    Same pruning as the DFS it replaces: edges and partial paths below
+    `confidence_threshold` are dropped, and paths never revisit a node.
+    `max_expansions` bounds the number of nodes whose neighbours are
+    expanded; once it is spent the best paths already discovered are
+    returned. Ties are broken by discovery order.
+
+    Returns records shaped like ReasoningService.explore_path:
+    {"path": [(u, v, relation), ...], "confidence": float, "final_node": v}.
+    """
+    return multi_source_top_paths(
+        [start], neighbors, k=k, max_depth=max_depth,
+        confidence_threshold=confidence_threshold, max_expansions=max_expansions
+    ).get(start, [])
+
+
+def multi_source_top_paths(
+    seeds: Sequence[Hashable],
+    neighbors: NeighborFn,
+    k: int = 5,
+    max_depth: int = 2,
+    confidence_threshold: float = 0.5,
+    max_expansions: int = 5000,
+    accessed: Optional[Dict[Hashable, Set[Hashable]]] = None,
+) -> Dict[Hashable, List[Dict]]:
+    """`top_k_paths` for several seeds in one traversal.
+
+    All seeds share one priority queue and one neighbour memo, so a node in
+    the overlap of several neighbourhoods is expanded once. Per seed, paths
+    pop in the same order as an independent `top_k_paths` search (the
+    expansion budget also applies per seed), and a seed stops once it has k
+    paths. When `accessed` is given, accessed[seed] collects every node that
+    seed's search reached: the expanded ones and those left unexpanded at the
+    depth limit, by the expansion budget or because k paths were found.
+    """
+    seeds = list(dict.fromkeys(seeds))
+    results: Dict[Hashable, List[Dict]] = {seed: [] for seed in seeds}
+    if k <= 0 or max_depth <= 0:
+        return results
+
+    counter = itertools.count()
+    neighbor_cache: Dict[Hashable, List[Tuple[Hashable, str, float]]] = {}
+    expansions = dict.fromkeys(seeds, 0)
+    # Heap entries: (-confidence, tiebreak, confidence, seed, node, nodes_on_path, steps)
+    heap = [(-1.0, next(counter), 1.0, seed, seed, (seed,), ()) for seed in seeds]
+    heapq.heapify(heap)
+    remaining = len(seeds)
+
+    while heap and remaining:
+        _, _, confidence, seed, node, on_path, steps = heapq.heappop(heap)
+        found = results[seed]
+        if len(found) == k:
+            continue
+        if accessed is not None:
+            accessed.setdefault(seed, set()).add(node)
+        if steps:
+            found.append({"path": list(steps), "confidence": confidence, "final_node": node})
+            if len(found) == k:
+                remaining -= 1
+                continue
+        if len(steps) == max_depth or expansions[seed] >= max_expansions:
+            continue
+        expansions[seed] += 1
+
+        edges = neighbor_cache.get(node)
+        if edges is None:
+            edges = neighbor_cache[node] = list(neighbors(node))
+        for neighbor, relation, edge_confidence in edges:
+            if edge_confidence < confidence_threshold or neighbor in on_path:
+                continue
+            new_confidence = confidence * edge_confidence
+            if new_confidence < confidence_threshold:
+                continue
+            heapq.heappush(heap, (
+                -new_confidence, next(counter), new_confidence, seed, neighbor,
+                on_path + (neighbor,), steps + ((node, neighbor, relation),)
+            ))
+
+    return results
+
+
+def connecting_paths(
+    source: Hashable,
+    target: Hashable,
+    neighbors: NeighborFn,
+    predecessors: NeighborFn,
+    k: int = 3,
+    max_depth: int = 3,
+    confidence_threshold: float = 0.3,
+    frontier_size: int = 200,
+    max_expansions: int = 2000,
+) -> List[Dict]:
+    """The k most confident simple paths source -> target, by bounded bidirectional search.
+
+    Expands the best `frontier_size` partial paths forward from `source` to
+    ceil(max_depth / 2) hops and backward from `target` (over `predecessors`,
+    i.e. in-edges) to floor(max_depth / 2) hops, then joins them on shared
+    nodes. Each side costs what a half-depth search costs instead of a full
+    `max_depth` search from source. Returns `top_k_paths` records ending at
+    `target`.
+    """
+    if source == target or max_depth <= 0:
+        return []
+    forward_depth, backward_depth = (max_depth + 1) // 2, max_depth // 2
+
+    def partials(start, step_fn, depth) -> Dict[Hashable, List[Tuple[float, Tuple, Tuple]]]:
+        """meet node -> [(confidence, steps, nodes)] including the empty path at start"""
+        by_node = {start: [(1.0, (), (start,))]}
+        for p in top_k_paths(start, step_fn, k=frontier_size, max_depth=depth,
+                             confidence_threshold=confidence_threshold, max_expansions=max_expansions):
+            nodes = (start,) + tuple(step[1] for step in p["path"])
+            by_node.setdefault(p["final_node"], []).append((p["confidence"], tuple(p["path"]), nodes))
+        return by_node
+
+    forward = partials(source, neighbors, forward_depth)
+    backward = partials(target, predecessors, backward_depth) if backward_depth else {target: [(1.0, (), (target,))]}
+
+    joined: Dict[Tuple, float] = {}
+    for meet in forward.keys() & backward.keys():
+        for f_conf, f_steps, f_nodes in forward[meet]:
+            for b_conf, b_steps, b_nodes in backward[meet]:
+                confidence = f_conf * b_conf
+                if confidence < confidence_threshold or not set(f_nodes).isdisjoint(b_nodes[:-1]):
+                    continue
+                # Backward steps are (node, predecessor, relation): flip and reverse them
+                steps = f_steps + tuple((u, v, rel) for v, u, rel in reversed(b_steps))
+                if steps and len(steps) <= max_depth:
+                    joined[steps] = confidence
+
+    best = sorted(joined.items(), key=lambda item: item[1], reverse=True)[:k]
+    return [{"path": list(steps), "confidence": confidence, "final_node": target} for steps, confidence in best]
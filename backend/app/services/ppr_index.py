@@ -0,0 +1,200 @@
+import threading
+from typing import Dict, FrozenSet, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from backend.app.services.provenance_index import ProvenanceIndex
+
+
+class _Matrices(NamedTuple):
+    weights: sparse.csr_matrix      # symmetric node x node confidence weights
+    incidence: sparse.csr_matrix    # node x provenance chunk id (1 if the node was extracted from the chunk)
+    transition: sparse.csr_matrix   # column-stochastic W D^-1 (zero columns for dangling nodes)
+    dangling: np.ndarray            # bool mask of nodes without edges
+
+
+def _resize(matrix: sparse.csr_matrix, rows: int, cols: int) -> sparse.csr_matrix:
+    """Grow a CSR matrix with empty rows/columns without copying its data"""
+    indptr = np.concatenate([matrix.indptr, np.full(rows - matrix.shape[0], matrix.indptr[-1], dtype=matrix.indptr.dtype)])
+    return sparse.csr_matrix((matrix.data, matrix.indices, indptr), shape=(rows, cols))
+
+
+class PPRIndex:
+    """Personalized PageRank over one immutable graph version.
+
+    The graph is treated as undirected with edge weight = sum of relation
+    confidences (as in HippoRAG), so a disease seed reaches the drugs that
+    TREAT it. Node ids are stable across versions (new nodes are appended),
+    which lets a version's weight matrix be derived from the last version
+    that built one: rows of the nodes touched since then are cleared and
+    recomputed, everything else is reused. A changed edge always touches
+    both endpoints, so untouched rows are still exact. Matrices are built
+    lazily on the first query of a version.
+
+    Passages are ranked through the ProvenanceIndex: chunk columns are its
+    dense chunk ids, so chunks with the same number in different documents
+    stay apart, and ranked chunks come back as vector-store document ids.
+    A version only sees the chunks that existed when it was created. Without
+    a provenance index no chunks are ranked.
+    """
+
+    # Above this fraction of stale nodes a full rebuild is cheaper than patching
+    _FULL_REBUILD_FRACTION = 0.3
+
+    def __init__(self, graph, provenance: Optional[ProvenanceIndex] = None, index: Optional[Dict[Hashable, int]] = None,
+                 names: Optional[List[Hashable]] = None, base: Optional[_Matrices] = None,
+                 stale: FrozenSet[Hashable] = frozenset()):
+        self.graph = graph
+        self.provenance = provenance
+        self._n_chunks = provenance.chunk_count() if provenance is not None else 0
+        if index is None:
+            names = list(graph.nodes())
+            index = {name: i for i, name in enumerate(names)}
+        self._index = index
+        self._names = names
+        self._base = base
+        self._stale = stale
+        self._matrices: Optional[_Matrices] = None
+        self._lock = threading.Lock()
+
+    def derive(self, graph, touched: Iterable[Hashable]) -> "PPRIndex":
+        """Index for the next graph version; only `touched` nodes are recomputed"""
+        touched = frozenset(touched)
+        index, names = self._index, self._names
+        new = [node for node in touched if node not in index]
+        if new:
+            index, names = dict(index), names + new
+            for node in new:
+                index[node] = len(index)
+        built = self._matrices
+        if built is not None:
+            return PPRIndex(graph, self.provenance, index, names, built, touched)
+        return PPRIndex(graph, self.provenance, index, names, self._base, self._stale | touched)
+
+    def matrices(self) -> _Matrices:
+        if self._matrices is None:
+            with self._lock:
+                if self._matrices is None:
+                    self._matrices = self._build()
+                    self._base, self._stale = None, frozenset()
+        return self._matrices
+
+    def _edges_of(self, nodes: Iterable[Hashable], full: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(row, col, confidence) entries of the symmetric weight matrix for `nodes`"""
+        graph, index = self.graph, self._index
+        rows, cols, confs = [], [], []
+        if full:
+            for u, v, data in graph.edges(data=True):
+                if u != v:
+                    i, j, c = index[u], index[v], data.get("confidence", 0)
+                    rows += (i, j)
+                    cols += (j, i)
+                    confs += (c, c)
+        else:
+            for node in nodes:
+                if not graph.has_node(node):
+                    continue
+                i = index[node]
+                for _, v, data in graph.out_edges(node, data=True):
+                    if v != node:
+                        rows.append(i)
+                        cols.append(index[v])
+                        confs.append(data.get("confidence", 0))
+                for u, _, data in graph.in_edges(node, data=True):
+                    if u != node:
+                        rows.append(i)
+                        cols.append(index[u])
+                        confs.append(data.get("confidence", 0))
+        return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64), np.asarray(confs, dtype=np.float64)
+
+    def _chunks_of(self, nodes: Iterable[Hashable]) -> Tuple[np.ndarray, np.ndarray]:
+        """(row, provenance chunk id) entries of the incidence matrix for `nodes`"""
+        graph, index, provenance = self.graph, self._index, self.provenance
+        rows, cols = [], []
+        if provenance is None:
+            return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+        for node in nodes:
+            if graph.has_node(node):
+                chunks = provenance.chunk_ids_of(node, self._n_chunks)
+                rows += [index[node]] * len(chunks)
+                cols += chunks
+        return np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)
+
+    def _build(self) -> _Matrices:
+        n = len(self._names)
+        base = self._base
+        full = base is None or len(self._stale) > self._FULL_REBUILD_FRACTION * n
+        nodes = self._names if full else self._stale
+
+        rows, cols, confs = self._edges_of(nodes, full)
+        chunk_rows, chunk_cols = self._chunks_of(nodes)
+        n_chunks = self._n_chunks
+        patch_w = sparse.csr_matrix((confs, (rows, cols)), shape=(n, n))
+
+        if full:
+            weights = patch_w
+            incidence = sparse.csr_matrix(
+                (np.ones(len(chunk_rows)), (chunk_rows, chunk_cols)), shape=(n, n_chunks)
+            )
+        else:
+            keep = np.ones(n)
+            keep[[self._index[node] for node in self._stale]] = 0.0
+            clear = sparse.diags(keep)
+            weights = clear @ _resize(base.weights, n, n) + patch_w
+            patch_c = sparse.csr_matrix((np.ones(len(chunk_rows)), (chunk_rows, chunk_cols)), shape=(n, n_chunks))
+            incidence = clear @ _resize(base.incidence, n, n_chunks) + patch_c
+            weights.eliminate_zeros()
+            incidence.eliminate_zeros()
+        # Duplicate chunk entries (shouldn't happen) count once
+        incidence.data[:] = 1.0
+
+        degree = np.asarray(weights.sum(axis=1)).ravel()
+        dangling = degree <= 0
+        inverse = np.divide(1.0, degree, out=np.zeros(n), where=~dangling)
+        # W symmetric => P^T = W D^-1: scale columns instead of transposing
+        transition = weights.multiply(inverse[np.newaxis, :]).tocsr()
+        return _Matrices(weights.tocsr(), incidence.tocsr(), transition, dangling)
+
+    def rank(self, seeds: Dict[Hashable, float], damping: float = 0.5, tol: float = 1e-6, max_iter: int = 100,
+             limit: Optional[int] = None) -> Tuple[List[Tuple[Hashable, float]], List[Tuple[str, float]]]:
+        """Personalized PageRank from `seeds` (node -> weight).
+
+        Power iteration p <- d (P^T p + dangling mass * s) + (1 - d) s until
+        the L1 change drops below `tol`. Returns (node, score) and
+        (chunk document id, score) lists sorted by score; a chunk scores the
+        sum of its nodes' probabilities. Nodes with zero probability are omitted, and
+        `limit` keeps only the top entries of each list.
+        """
+        seeds = {node: w for node, w in seeds.items() if node in self._index and self.graph.has_node(node) and w > 0}
+        if not seeds:
+            return [], []
+        m = self.matrices()
+        n = len(self._names)
+        s = np.zeros(n)
+        for node, weight in seeds.items():
+            s[self._index[node]] += weight
+        s /= s.sum()
+
+        p = s.copy()
+        for _ in range(max_iter):
+            nxt = damping * (m.transition @ p + p[m.dangling].sum() * s) + (1.0 - damping) * s
+            delta = np.abs(nxt - p).sum()
+            p = nxt
+            if delta < tol:
+                break
+
+        nodes = [(self._names[i], float(p[i])) for i in self._top(p, limit)]
+        chunk_scores = m.incidence.T @ p
+        top = self._top(chunk_scores, limit)
+        chunks = list(zip(self.provenance.doc_ids(top.tolist()), chunk_scores[top].tolist())) if len(top) else []
+        return nodes, chunks
+
+    @staticmethod
+    def _top(scores: np.ndarray, limit: Optional[int]) -> np.ndarray:
+        """Indices of the positive scores, highest first (ties by index)"""
+        candidates = np.flatnonzero(scores > 0)
+        if limit is not None and limit < len(candidates):
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            candidates.sort()
+        return candidates[np.argsort(-scores[candidates], kind="stable")]
@@ -0,0 +1,145 @@
+import array
+import bisect
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+class ProvenanceIndex:
+    """Which source chunks every graph entity was extracted from.
+
+    Node attributes only keep per-document chunk numbers (they collide across
+    documents), so this index keys chunks by their vector-store document id,
+    "<source_id>:<chunk>", the id RAGService gives each chunk in Chroma.
+    Chunks get dense integer ids in ingestion order; every entity keeps a
+    sorted array of them, so membership is a bisect and ranking the chunks
+    of a set of entities is one vectorized merge.
+
+    Links are written to SQLite on `commit` (at every graph checkpoint) and
+    loaded back at startup.
+    """
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._doc_ids: List[str] = []
+        self._chunk_ids: Dict[str, int] = {}
+        self._entity_chunks: Dict[str, array.array] = {}
+        self._new_chunks: List[Tuple[int, str]] = []
+        self._new_links: List[Tuple[str, int]] = []
+        self._lock = threading.Lock()
+        self._conn = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            with self._lock:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, doc_id TEXT NOT NULL UNIQUE)")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS entity_chunks (
+                        entity TEXT NOT NULL,
+                        chunk INTEGER NOT NULL,
+                        PRIMARY KEY (entity, chunk)
+                    ) WITHOUT ROWID
+                """)
+                self._conn.commit()
+                self._load()
+
+    def _load(self):
+        for chunk_id, doc_id in self._conn.execute("SELECT id, doc_id FROM chunks ORDER BY id"):
+            self._chunk_ids[doc_id] = chunk_id
+            while len(self._doc_ids) <= chunk_id:
+                self._doc_ids.append("")
+            self._doc_ids[chunk_id] = doc_id
+        for entity, chunk_id in self._conn.execute("SELECT entity, chunk FROM entity_chunks ORDER BY entity, chunk"):
+            chunks = self._entity_chunks.get(entity)
+            if chunks is None:
+                chunks = self._entity_chunks[entity] = array.array("q")
+            chunks.append(chunk_id)
+
+    def __len__(self) -> int:
+        return len(self._entity_chunks)
+
+    @staticmethod
+    def doc_id(source_id: str, chunk: int) -> str:
+        """Vector-store id of a chunk (see RAGService._add_to_vectorstore)"""
+        return f"{source_id}:{chunk}"
+
+    def add(self, entity: str, source_id: str, chunk: int):
+        """Record that `entity` was extracted from chunk `chunk` of `source_id`"""
+        doc_id = self.doc_id(source_id, chunk)
+        with self._lock:
+            chunk_id = self._chunk_ids.get(doc_id)
+            if chunk_id is None:
+                chunk_id = self._chunk_ids[doc_id] = len(self._doc_ids)
+                self._doc_ids.append(doc_id)
+                self._new_chunks.append((chunk_id, doc_id))
+            chunks = self._entity_chunks.get(entity)
+            if chunks is None:
+                chunks = self._entity_chunks[entity] = array.array("q")
+            # Ingestion appends in increasing chunk order; re-ingested chunks need an insert
+            if not chunks or chunks[-1] < chunk_id:
+                chunks.append(chunk_id)
+            else:
+                i = bisect.bisect_left(chunks, chunk_id)
+                if i < len(chunks) and chunks[i] == chunk_id:
+                    return
+                chunks.insert(i, chunk_id)
+            self._new_links.append((entity, chunk_id))
+
+    def has_chunk(self, entity: str, source_id: str, chunk: int) -> bool:
+        with self._lock:
+            chunk_id = self._chunk_ids.get(self.doc_id(source_id, chunk))
+            chunks = self._entity_chunks.get(entity)
+            if chunk_id is None or not chunks:
+                return False
+            i = bisect.bisect_left(chunks, chunk_id)
+            return i < len(chunks) and chunks[i] == chunk_id
+
+    def chunks_of(self, entity: str) -> List[str]:
+        """Document ids of the chunks `entity` was extracted from, in ingestion order"""
+        with self._lock:
+            return [self._doc_ids[c] for c in self._entity_chunks.get(entity, ())]
+
+    def chunk_count(self) -> int:
+        """Number of chunks seen so far; chunk ids are 0 .. chunk_count() - 1 in ingestion order"""
+        with self._lock:
+            return len(self._doc_ids)
+
+    def chunk_ids_of(self, entity: str, limit: Optional[int] = None) -> List[int]:
+        """Dense ids of the chunks `entity` was extracted from (only ids below `limit`, if given)"""
+        with self._lock:
+            chunks = self._entity_chunks.get(entity, ())
+            if limit is not None:
+                chunks = chunks[:bisect.bisect_left(chunks, limit)]
+            return list(chunks)
+
+    def doc_ids(self, chunk_ids: Iterable[int]) -> List[str]:
+        """Document ids of dense chunk ids"""
+        with self._lock:
+            return [self._doc_ids[c] for c in chunk_ids]
+
+    def rank_chunks(self, entities: Iterable[str], limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(document id, number of `entities` it mentions), most covered first (ties: earliest chunk)"""
+        with self._lock:
+            arrays = [np.array(self._entity_chunks[e], dtype=np.int64) for e in dict.fromkeys(entities)
+                      if e in self._entity_chunks]
+            if not arrays:
+                return []
+            chunk_ids, coverage = np.unique(np.concatenate(arrays), return_counts=True)
+            order = np.argsort(-coverage, kind="stable")
+            if limit is not None:
+                order = order[:limit]
+            return [(self._doc_ids[chunk_ids[i]], int(coverage[i])) for i in order]
+
+    def commit(self):
+        """Persist links added since the last commit"""
+        with self._lock:
+            chunks, links = self._new_chunks, self._new_links
+            self._new_chunks, self._new_links = [], []
+            if self._conn is None or not (chunks or links):
+                return
+            self._conn.executemany("INSERT OR IGNORE INTO chunks (id, doc_id) VALUES (?, ?)", chunks)
+            self._conn.executemany("INSERT OR IGNORE INTO entity_chunks (entity, chunk) VALUES (?, ?)", links)
+            self._conn.commit()
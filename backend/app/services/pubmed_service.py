@@ -1,6 +1,6 @@
 import requests
 from xml.etree import ElementTree as ET
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from decouple import config
 
 class PubMedService:
@@ -12,6 +12,11 @@ class PubMedService:
         
     def search(self, query: str, max_results: int = 3) -> List[str]:
         """Search PubMed and return article abstracts"""
+        _, abstracts = self.search_articles(query, max_results)
+        return abstracts
+
+    def search_articles(self, query: str, max_results: int = 3) -> Tuple[List[str], List[str]]:
+        """Search PubMed and return (PMIDs, article abstracts)"""
         # Search for PMIDs
         search_url = f"{self.base_url}/esearch.fcgi"
         search_params = {
@@ -29,7 +34,7 @@ class PubMedService:
             pmids = [id_elem.text for id_elem in root.findall(".//Id")]
             
             if not pmids:
-                return []
+                return [], []
             
             # Fetch abstracts
             fetch_url = f"{self.base_url}/efetch.fcgi"
@@ -55,10 +60,10 @@ class PubMedService:
                 if abstract_lines:
                     abstracts.append(" ".join(abstract_lines))
                     
-            return abstracts
+            return pmids, abstracts
             
         except Exception as e:
             print(f"PubMed search error: {e}")
-            return []
+            return [], []
 
 pubmed_service = PubMedService()
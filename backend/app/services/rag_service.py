@@ -1,6 +1,11 @@
 import os
-from typing import List, Dict, Any
+import time
+import asyncio
+from functools import partial
+from typing import List, Dict, Any, AsyncIterator, Callable, Optional, Tuple
+from langchain_core.documents import Document
 from langchain_core.output_parsers import PydanticOutputParser
+from langchain_core.prompts import PromptTemplate
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import TokenTextSplitter
 from langchain_community.vectorstores import Chroma
@@ -8,11 +13,27 @@ from langchain_huggingface import HuggingFaceEmbeddings
 
 from backend.app.services.pubmed_service import pubmed_service
 from backend.app.services.graph_service import graph_service
+from backend.app.services.entity_index import EntityEmbeddingIndex
 from backend.app.services.llm_service import llm_service
+from backend.app.services.ingest_queue import extract_in_order, file_fingerprint
+from backend.app.services.retrieval_planner import retrieval_planner, RetrievalBranch
 from backend.app.services.text_processing import normalize_medical_text, validate_entity
-from backend.app.models.schemas import ExtractionResponse, SearchResponse, SearchResult
+from backend.app.models.schemas import ExtractionResponse, Entity, Relation, SearchResponse, SearchResult
 from backend.app.core.config import settings
 
+ANSWER_PROMPT = PromptTemplate(
+    template="""Answer the following medical question using the provided context.
+    Identify conflicting information if any. Prioritize Internal Document Knowledge.
+    
+    Question: {question}
+    
+    Context:
+    {context}
+    
+    Answer (in Vietnamese):""",
+    input_variables=["question", "context"]
+)
+
 class RAGService:
     def __init__(self):
         self.llm_service = llm_service
@@ -27,127 +48,326 @@ class RAGService:
             collection_name="vimed_rag"
         )
         print("Vector Store initialized.")
+
+        # Name-embedding index over graph nodes for fuzzy entity linking; kept current on every publish
+        self.entity_index = None
+        if settings.ENTITY_LINK_ENABLED:
+            self.entity_index = EntityEmbeddingIndex(
+                self.embeddings.embed_documents, settings.EMBEDDING_MODEL, settings.ENTITY_INDEX_PATH,
+                backend=settings.ENTITY_INDEX_BACKEND, query_prefix=settings.EMBEDDING_QUERY_PREFIX,
+                passage_prefix=settings.EMBEDDING_PASSAGE_PREFIX
+            )
+            self.entity_index.add_many(graph_service.snapshot().graph.nodes())
+            self.entity_index.flush_async()
+            graph_service.add_publish_listener(self._on_graph_publish)
     
-    async def ingest_document(self, file_path: str):
-        """Ingest a document: Load -> Chunk -> Extract -> Update Graph & Vector Store"""
-        print(f"Ingesting: {file_path}")
-        
-        # 1. Load and Chunk
+    def _on_graph_publish(self, version: int, touched):
+        self.entity_index.add_many(touched)
+        self.entity_index.flush_async()
+
+    async def shutdown(self):
+        """Saves the entity name embeddings encoded since the last save"""
+        if self.entity_index is not None:
+            await asyncio.to_thread(self.entity_index.persist)
+
+    @staticmethod
+    def _load_chunks(file_path: str) -> List[Document]:
         loader = PyPDFLoader(file_path)
         documents = loader.load()
         # Filter first few pages if needed (as per notebook)
         # documents = documents[16:] 
         
         text_splitter = TokenTextSplitter(chunk_size=512, chunk_overlap=50)
-        chunks = text_splitter.split_documents(documents)
-        print(f"Total chunks: {len(chunks)}")
+        return text_splitter.split_documents(documents)
+
+    def _add_to_vectorstore(self, chunks: List[Document], source_id: str):
+        # Deterministic ids make re-adding a resumed document an upsert, not a duplicate
+        for i, chunk in enumerate(chunks):
+            chunk.metadata["chunk_id"] = i
+            chunk.metadata["source_id"] = source_id
+        self.vectorstore.add_documents(chunks, ids=[f"{source_id}:{i}" for i in range(len(chunks))])
+        self.vectorstore.persist()
+
+    @staticmethod
+    def _to_graph_records(result: ExtractionResponse) -> Tuple[List[Entity], List[Relation]]:
+        """Map the LLM extraction schema onto the records GraphService stores."""
+        entities = [
+            Entity(name=e.name, type=e.type, description=e.description, relevance_score=e.relevance_score or 5)
+            for e in result.entities
+        ]
+        relations = [
+            Relation(source_name=r.source, target_name=r.target, relation=r.type,
+                     confidence_score=r.confidence_score or 5, evidence=r.evidence)
+            for r in result.relations
+        ]
+        return entities, relations
+
+    async def ingest_document(self, file_path: str, source_id: Optional[str] = None, add_vectors: bool = True,
+                              progress: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """Ingest a document: Load -> Chunk -> Extract -> Update Graph & Vector Store
+        
+        Resumable: extraction restarts after the last chunk of `source_id` (the file
+        fingerprint) that is durable in the graph checkpoint, and chunks whose extraction
+        failed in an earlier run are retried. Chunks that still fail after
+        INGEST_CHUNK_RETRIES are not checkpointed as done and the call raises once the
+        others are committed. `progress` is called after every chunk with counters for
+        the ingestion job API.
+        """
+        print(f"Ingesting: {file_path}")
+        source_id = source_id or file_fingerprint(file_path)
+        
+        # 1. Load and Chunk (blocking I/O and tokenization run off the event loop)
+        chunks = await asyncio.to_thread(self._load_chunks, file_path)
+        total = len(chunks)
+        print(f"Total chunks: {total}")
         
         # 2. Add to Vector Store
-        print("Adding chunks to Vector Store...")
-        self.vectorstore.add_documents(chunks)
-        self.vectorstore.persist()
+        if add_vectors:
+            print("Adding chunks to Vector Store...")
+            await asyncio.to_thread(self._add_to_vectorstore, chunks, source_id)
+        
+        # Failed chunks of an earlier run are retried first, then everything after the checkpoint
+        pending = graph_service.pending_chunks(source_id, total)
+        if not pending:
+            print(f"Already ingested: {file_path}")
+            return {"status": "success", "chunks_processed": 0, "total_chunks": total}
+        failed = set(graph_service.failed_chunks(source_id))
+        start_chunk = total - len(pending)
+        if start_chunk or failed:
+            print(f"Resuming: {len(pending)}/{total} chunks pending ({len(failed)} failed earlier)")
+        
+        def report(processed: int, committed: int, rate: float):
+            if progress:
+                progress({"total_chunks": total, "processed_chunks": processed,
+                          "last_committed_chunk": committed, "chunks_per_minute": rate})
+        report(start_chunk, start_chunk - 1, 0.0)
         
         # 3. Extract and Update Graph
         parser = PydanticOutputParser(pydantic_object=ExtractionResponse)
         
-        def extraction_chain_factory(llm):
-            return PromptTemplate(
-                template="""Bạn là chuyên gia trích xuất Knowledge Graph y tế.
-                
-                Trích xuất các thực thể (Entity) và quan hệ (Relation) từ văn bản sau.
-                
-                RULES:
-                - Entity types: DISEASE, DRUG, SYMPTOM, TEST, ANATOMY, TREATMENT, PROCEDURE, RISK_FACTOR, LAB_VALUE
-                - Relation types: CAUSES, TREATS, PREVENTS, DIAGNOSES, SYMPTOM_OF, COMPLICATION_OF, SIDE_EFFECT_OF, INCREASES_RISK, INTERACTS_WITH, WORSENS, INDICATES, RELATED_TO
-                - Confidence: 1-10
-                
-                TEXT: {text}
-                
-                {format_instructions}
-                """,
-                input_variables=["text"],
-                partial_variables={"format_instructions": parser.get_format_instructions()}
-            ) | llm | parser
-
-        for i, chunk in enumerate(chunks):
-            # Skip if already processed (check graph service)
-            # For now, we process all. In production, we should check last_chunk_id.
+        extraction_prompt = PromptTemplate(
+            template="""Bạn là chuyên gia trích xuất Knowledge Graph y tế.
             
-            try:
-                result = self.llm_service.execute_chain(extraction_chain_factory, {"text": chunk.page_content})
-                
-                if result:
-                    page_num = chunk.metadata.get('page', 0)
-                    
-                    # Add Entities
-                    for entity in result.entities:
-                        # Validation logic here if needed
-                        graph_service.add_entity(entity, page_num, i)
-                        
-                    # Add Relations
-                    for relation in result.relations:
-                        # Validation logic here if needed
-                        graph_service.add_relation(relation, page_num, i)
-                        
-                    print(f"Chunk {i+1}/{len(chunks)}: +{len(result.entities)} entities, +{len(result.relations)} relations")
-                    
-                    # Checkpoint periodically
-                    if (i + 1) % 20 == 0:
-                        graph_service.save_checkpoint(i, len(chunks))
+            Trích xuất các thực thể (Entity) và quan hệ (Relation) từ văn bản sau.
             
-            except Exception as e:
-                print(f"Error processing chunk {i}: {e}")
+            RULES:
+            - Entity types: DISEASE, DRUG, SYMPTOM, TEST, ANATOMY, TREATMENT, PROCEDURE, RISK_FACTOR, LAB_VALUE
+            - Relation types: CAUSES, TREATS, PREVENTS, DIAGNOSES, SYMPTOM_OF, COMPLICATION_OF, SIDE_EFFECT_OF, INCREASES_RISK, INTERACTS_WITH, WORSENS, INDICATES, RELATED_TO
+            - Confidence: 1-10
+            
+            TEXT: {text}
+            
+            {format_instructions}
+            """,
+            input_variables=["text"],
+            partial_variables={"format_instructions": parser.get_format_instructions()}
+        )
+        # Results are cached by hash(prompt template + output schema, model, chunk text)
+        extraction_cache_namespace = extraction_prompt.template + parser.get_format_instructions()
         
-        # Final Save
-        graph_service.save_checkpoint(len(chunks), len(chunks))
-        return {"status": "success", "chunks_processed": len(chunks)}
+        def extraction_chain_factory(llm):
+            return extraction_prompt | llm | parser
 
-    async def process_question(self, question: str) -> Dict[str, Any]:
-        """Answer question using RAG (Vector + Graph + PubMed)"""
-        print(f"Processing question: {question}")
+        # Keep one extraction in flight per call the key pool can serve at once (or INGEST_CONCURRENCY),
+        # but commit results strictly in chunk order so chunk_id/page provenance and checkpoints stay deterministic
+        concurrency = max(1, settings.INGEST_CONCURRENCY or self.llm_service.key_pool.capacity)
+        print(f"Extracting with concurrency {concurrency}")
+        started = time.monotonic()
+        processed = start_chunk
+        last_committed = start_chunk - 1
+        rate = 0.0
         
-        # 1. Search PubMed
-        pubmed_docs = pubmed_service.search(question, max_results=2)
-        pubmed_context = "\n\n".join(pubmed_docs) if pubmed_docs else "No external context found."
+        def chunks_per_minute(done: int) -> float:
+            return done / max(time.monotonic() - started, 1e-6) * 60
         
-        # 2. Vector Search (Semantic Search)
-        print("Searching Vector Store...")
-        vector_docs = self.vectorstore.similarity_search(question, k=3)
-        vector_context = "\n\n".join([doc.page_content for doc in vector_docs]) if vector_docs else "No vector context found."
+        def extract(i: int):
+            return self.llm_service.aexecute_chain(
+                extraction_chain_factory,
+                {"text": chunks[i].page_content},
+                cache_namespace=extraction_cache_namespace
+            )
         
-        # 3. Search Local Graph with Reasoning
-        from backend.app.services.reasoning_service import reasoning_service
+        def commit_chunk(i: int, result, error: Optional[Exception]):
+            nonlocal processed, last_committed, rate
+            # Runs on a worker thread; the graph write lock serializes it with other ingestion jobs
+            with graph_service.write_lock:
+                if error is None:
+                    if result:
+                        page_num = chunks[i].metadata.get('page', 0)
+                        entities, relations = self._to_graph_records(result)
+                        
+                        # Add Entities and Relations (names normalized per chunk in one batch)
+                        graph_service.add_entities(entities, page_num, i, source_id)
+                        graph_service.add_relations(relations, page_num, i, source_id)
+                        
+                        print(f"Chunk {i+1}/{total}: +{len(entities)} entities, +{len(relations)} relations "
+                              f"({chunks_per_minute(processed + 1 - start_chunk):.1f} chunks/min)")
+                    failed.discard(i)
+                    last_committed = max(last_committed, i)
+                else:
+                    # Recorded as failed, not committed: retried when the job is resumed or resubmitted
+                    failed.add(i)
+                
+                # Checkpoints only append a marker to the graph op log, so mark every chunk;
+                # readers get a new graph version every few chunks (GRAPH_PUBLISH_*)
+                graph_service.save_checkpoint(i, total, source_id, sorted(failed))
+                graph_service.maybe_publish()
+            processed += 1
+            rate = chunks_per_minute(processed - start_chunk)
+            report(processed, last_committed, rate)
         
-        graph_context = ""
+        async def commit(i: int, result, error: Optional[Exception]):
+            # Checkpoint fsync and snapshot derivation stay off the event loop, so queries keep flowing
+            await asyncio.to_thread(commit_chunk, i, result, error)
+        
+        await extract_in_order(pending, extract, commit, concurrency, retries=max(0, settings.INGEST_CHUNK_RETRIES))
+        
+        elapsed = time.monotonic() - started
+        print(f"Extraction finished: {len(pending)} chunks in {elapsed:.0f}s ({rate:.1f} chunks/min)")
+        if self.llm_service.cache:
+            print(f"LLM cache: {self.llm_service.cache.stats()}")
+        
+        # Final Save
+        def finish():
+            with graph_service.write_lock:
+                graph_service.save_checkpoint(total, total, source_id, sorted(failed), force=True)
+                graph_service.publish()
+        await asyncio.to_thread(finish)
+        if self.entity_index is not None:
+            await asyncio.to_thread(self.entity_index.persist)
+        if failed:
+            raise RuntimeError(
+                f"Extraction failed for {len(failed)} chunk(s) {sorted(failed)[:20]} after "
+                f"{settings.INGEST_CHUNK_RETRIES} retries; they are retried when the job is resubmitted"
+            )
+        report(total, total - 1, rate)
+        return {"status": "success", "chunks_processed": len(pending), "total_chunks": total}
+
+    def _search_pubmed(self, question: str) -> Dict[str, List[str]]:
+        """PubMed branch (blocking HTTP)."""
+        pmids, abstracts = pubmed_service.search_articles(question, max_results=2)
+        return {"ids": pmids, "abstracts": abstracts}
+
+    def _search_vector(self, question: str) -> List[Document]:
+        """Vector branch (semantic search)."""
+        print("Searching Vector Store...")
+        return self.vectorstore.similarity_search(question, k=3)
+
+    def _find_graph_entities(self, question: str, graph) -> List[str]:
+        """Detect graph nodes mentioned in the question."""
         norm_question = normalize_medical_text(question)
         
-        # Identify extraction targets (simple keyword match for now, could use LLM to extract entities first)
-        found_entities = []
-        # Try to find strict matches first (multi-word)
-        for node in graph_service.graph.nodes():
-            if normalize_medical_text(node) in norm_question:
-                found_entities.append(node)
+        # Match every node name mentioned in the question in one pass (gazetteer trie)
+        # (the gazetteer may already know nodes newer than the pinned snapshot)
+        found_entities = [name for name in graph_service.gazetteer.match(question) if graph.has_node(name)]
                 
+        # No exact mention: link question n-grams to nodes by name-embedding similarity
+        if not found_entities and self.entity_index is not None:
+            linked = self.entity_index.link(
+                question, top_k=settings.ENTITY_LINK_TOP_K, threshold=settings.ENTITY_LINK_THRESHOLD,
+                max_ngram=settings.ENTITY_LINK_MAX_NGRAM, max_spans=settings.ENTITY_LINK_MAX_SPANS
+            )
+            found_entities = [name for name, _ in linked if graph.has_node(name)]
+            if found_entities:
+                print(f"Linked graph entities by embedding: {linked}")
+
         # If no strict matches, try individual words
         if not found_entities:
             for word in norm_question.split(): 
                 word_title = word.title()
-                if graph_service.graph.has_node(word_title):
+                if graph.has_node(word_title):
                     found_entities.append(word_title)
         
         # Deduplicate
-        found_entities = list(set(found_entities))
+        return list(set(found_entities))
+
+    def _fetch_entity_chunks(self, entities: List[str],
+                             ppr_chunks: Optional[List[Tuple[str, float]]] = None) -> List[Document]:
+        """Source chunks of the given entities, fetched by id (no embedding search), most covered first.
+
+        With `ppr_chunks` ((document id, PageRank score), best first) the top
+        PageRank-ranked chunks are fetched instead. A few extra candidates are
+        requested so that ids missing from the vector store do not take the top-k slots.
+        """
+        top_k = settings.GRAPH_CHUNK_TOP_K
+        if ppr_chunks is not None:
+            ranked = ppr_chunks[:2 * top_k]
+            score_key = "ppr_score"
+        else:
+            ranked = graph_service.provenance.rank_chunks(entities, 2 * top_k)
+            score_key = "entity_coverage"
+        if not ranked:
+            return []
+        found = self.vectorstore.get(ids=[doc_id for doc_id, _ in ranked], include=["documents", "metadatas"])
+        by_id = {
+            doc_id: Document(page_content=text, metadata=dict(metadata or {}))
+            for doc_id, text, metadata in zip(found["ids"], found["documents"], found["metadatas"])
+        }
+        docs = []
+        for doc_id, score in ranked:
+            doc = by_id.get(doc_id)
+            if doc is not None:
+                doc.metadata[score_key] = score
+                docs.append(doc)
+        return docs[:top_k]
+
+    def _search_graph(self, question: str) -> Dict[str, Any]:
+        """Graph branch: entity detection + multi-hop reasoning + the entities' source chunks."""
+        from backend.app.services.reasoning_service import reasoning_service
         
+        # Pin one graph version for the whole query; ingestion publishes newer ones meanwhile
+        snapshot = graph_service.snapshot()
+        found_entities = self._find_graph_entities(question, snapshot.graph)
+        graph_context = ""
+        chunks = []
         if found_entities:
-            print(f"Found graph entities: {found_entities}")
-            for entity in found_entities:
-                # Use deep reasoning for found entities
-                reasoning = reasoning_service.reason_about_entity(entity, context_depth=2)
-                graph_context += f"{reasoning}\n"
-        else:
-            graph_context = "No directly related entities found in Graph."
+            print(f"Found graph entities (graph v{snapshot.version}): {found_entities}")
+            if settings.GRAPH_RETRIEVAL_STRATEGY == "ppr":
+                # The same PageRank run ranks the passages
+                graph_context, ppr_chunks = reasoning_service.reason_with_ppr(found_entities, snapshot=snapshot)
+                chunks = self._fetch_entity_chunks(found_entities, ppr_chunks)
+            else:
+                # Deep reasoning for all found entities in one traversal, plus the paths linking them
+                graph_context = reasoning_service.reason_about_entities(found_entities, context_depth=2, snapshot=snapshot)
+                chunks = self._fetch_entity_chunks(found_entities)
+        return {"entities": found_entities, "context": graph_context, "chunks": chunks, "version": snapshot.version}
+
+    def _retrieval_branches(self, question: str) -> List[RetrievalBranch]:
+        return [
+            RetrievalBranch("pubmed", partial(self._search_pubmed, question), settings.PUBMED_TIMEOUT,
+                            {"ids": [], "abstracts": []}),
+            RetrievalBranch("vector", partial(self._search_vector, question), settings.VECTOR_SEARCH_TIMEOUT, []),
+            RetrievalBranch("graph", partial(self._search_graph, question), settings.GRAPH_SEARCH_TIMEOUT,
+                            {"entities": [], "context": "", "chunks": [], "version": None}),
+        ]
+
+    async def _retrieve(self, question: str) -> Dict[str, Any]:
+        """Run PubMed, vector and graph retrieval concurrently with per-branch timeouts."""
+        return await retrieval_planner.run(self._retrieval_branches(question))
+
+    @staticmethod
+    def _merge_chunks(similar: List[Document], graph_chunks: List[Document]) -> List[Document]:
+        """Similarity hits followed by the graph-selected chunks they don't already contain."""
+        def key(doc: Document):
+            meta = doc.metadata
+            if meta.get("source_id") is not None and meta.get("chunk_id") is not None:
+                return meta["source_id"], meta["chunk_id"]
+            return doc.page_content
+
+        seen = {key(doc) for doc in similar}
+        return list(similar) + [doc for doc in graph_chunks if key(doc) not in seen]
+
+    @classmethod
+    def _build_context(cls, retrieved: Dict[str, Any]) -> str:
+        pubmed_docs = retrieved["pubmed"]["abstracts"]
+        pubmed_context = "\n\n".join(pubmed_docs) if pubmed_docs else "No external context found."
         
-        full_context = f"""
+        vector_docs = cls._merge_chunks(retrieved["vector"], retrieved["graph"].get("chunks", []))
+        vector_context = "\n\n".join([doc.page_content for doc in vector_docs]) if vector_docs else "No vector context found."
+        
+        graph_context = retrieved["graph"]["context"] or "No directly related entities found in Graph."
+        
+        return f"""
         Internal Document Knowledge (Vector Search):
         {vector_context}
         
@@ -157,27 +377,41 @@ class RAGService:
         External PubMed Knowledge:
         {pubmed_context}
         """
+
+    @staticmethod
+    def _retrieval_event(name: str, result: Any) -> Dict[str, Any]:
+        """Summarize a finished retrieval branch for the streaming endpoint."""
+        if name == "vector":
+            data = [
+                {"content": doc.page_content[:300], "page": doc.metadata.get("page"), "source": doc.metadata.get("source")}
+                for doc in result
+            ]
+        elif name == "graph":
+            data = result["entities"]
+        else:
+            data = result["ids"]
+        return {"event": name, "data": data}
+
+    async def process_question(self, question: str) -> Dict[str, Any]:
+        """Answer question using RAG (Vector + Graph + PubMed)"""
+        print(f"Processing question: {question}")
         
-        # 4. Generate Answer
-        answer_prompt = PromptTemplate(
-            template="""Answer the following medical question using the provided context.
-            Identify conflicting information if any. Prioritize Internal Document Knowledge.
-            
-            Question: {question}
-            
-            Context:
-            {context}
-            
-            Answer (in Vietnamese):""",
-            input_variables=["question", "context"]
-        )
+        # 1-3. PubMed, Vector Search and Graph Reasoning (concurrent)
+        retrieved = await self._retrieve(question)
+        full_context = self._build_context(retrieved)
         
+        # 4. Generate Answer
         try:
-            res = self.llm_service.execute_chain(
-                lambda llm: answer_prompt | llm,
-                {"question": question, "context": full_context}
+            res = await asyncio.wait_for(
+                self.llm_service.aexecute_chain(
+                    lambda llm: ANSWER_PROMPT | llm,
+                    {"question": question, "context": full_context}
+                ),
+                settings.LLM_ANSWER_TIMEOUT_SECONDS
             )
             answer = res.content if hasattr(res, 'content') else str(res)
+        except asyncio.TimeoutError:
+            answer = f"Error generating answer: no answer within {settings.LLM_ANSWER_TIMEOUT_SECONDS:.0f}s"
         except Exception as e:
             answer = f"Error generating answer: {e}"
 
@@ -187,5 +421,39 @@ class RAGService:
             "graph_visual_url": "/api/v1/graph/visualize"
         }
 
+    async def stream_question(self, question: str) -> AsyncIterator[Dict[str, Any]]:
+        """Answer question as a stream of events.
+        
+        Yields one event per retrieval branch as soon as it finishes ("vector", "graph",
+        "pubmed"), then "token" events as the LLM generates, then a final "done" event.
+        """
+        print(f"Streaming question: {question}")
+        
+        retrieved = {}
+        async for name, result in retrieval_planner.iter_completed(self._retrieval_branches(question)):
+            retrieved[name] = result
+            yield self._retrieval_event(name, result)
+        full_context = self._build_context(retrieved)
+        
+        tokens = self.llm_service.astream_chain(
+            lambda llm: ANSWER_PROMPT | llm,
+            {"question": question, "context": full_context}
+        )
+        # The deadline only bounds waiting on the LLM, not the time the client takes to read
+        deadline = time.monotonic() + settings.LLM_ANSWER_TIMEOUT_SECONDS
+        try:
+            while True:
+                try:
+                    token = await asyncio.wait_for(anext(tokens), max(deadline - time.monotonic(), 0))
+                except StopAsyncIteration:
+                    break
+                yield {"event": "token", "data": token}
+        except asyncio.TimeoutError:
+            yield {"event": "error", "data": f"Error generating answer: no answer within {settings.LLM_ANSWER_TIMEOUT_SECONDS:.0f}s"}
+        except Exception as e:
+            yield {"event": "error", "data": f"Error generating answer: {e}"}
+
+        yield {"event": "done", "data": {"graph_visual_url": "/api/v1/graph/visualize"}}
+
 
 rag_service = RAGService()
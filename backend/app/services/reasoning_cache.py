@@ -0,0 +1,115 @@
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, FrozenSet, Hashable, Iterable, NamedTuple, Optional, Set, Tuple
+
+
+class _Entry(NamedTuple):
+    version: int
+    nodes: FrozenSet[Hashable]
+    context: str
+
+
+class ReasoningContextCache:
+    """Bounded LRU of rendered reasoning contexts with node-level invalidation.
+
+    An entry remembers the graph version it was computed on and the nodes
+    whose data it read (the entity and every node its path search reached,
+    expanded or not). When GraphService publishes a version, the entries that read a
+    touched node are dropped. Everything else stays valid for the new version,
+    so repeated questions about the same entity skip graph traversal until
+    ingestion touches its neighbourhood.
+
+    A reader pinned to an older version than an entry's misses (it recomputes
+    without storing). A result computed on a version that has since been
+    superseded is stored only if the changes published in between did not
+    touch any node it read. GraphService runs `invalidate` before a version
+    becomes visible; should a reader still get ahead of it, an older entry is
+    not served to a version the cache has not been invalidated for yet.
+    """
+
+    def __init__(self, max_entries: int, history: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, _Entry]" = OrderedDict()
+        self._by_node: Dict[Hashable, Set[Tuple]] = {}
+        # (version, touched nodes) of recent publishes, to validate late puts
+        self._changes: Deque[Tuple[int, FrozenSet[Hashable]]] = deque(maxlen=history)
+        self._version = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple, version: int) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            # Computed on a newer version than the reader's
+            newer = entry is not None and entry.version > version
+            # The reader's version was published but not yet invalidated here: an older entry may be stale
+            uninvalidated = entry is not None and entry.version < version and version > self._version
+            if entry is None or newer or uninvalidated:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.context
+
+    def put(self, key: Tuple, version: int, nodes: Iterable[Hashable], context: str):
+        nodes = frozenset(nodes)
+        with self._lock:
+            if version < self._version and not self._unchanged_since(version, nodes):
+                return
+            current = self._entries.get(key)
+            if current is not None:
+                if current.version > version:
+                    return
+                self._remove(key)
+            self._entries[key] = _Entry(version, nodes, context)
+            for node in nodes:
+                self._by_node.setdefault(node, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def _unchanged_since(self, version: int, nodes: FrozenSet[Hashable]) -> bool:
+        """True if no publish after `version` touched `nodes` (lock held)"""
+        if not self._changes or self._changes[0][0] > version + 1:
+            # History does not reach back far enough to tell
+            return False
+        return all(v <= version or touched.isdisjoint(nodes) for v, touched in self._changes)
+
+    def _remove(self, key: Tuple):
+        entry = self._entries.pop(key)
+        for node in entry.nodes:
+            keys = self._by_node.get(node)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_node[node]
+
+    def invalidate(self, version: int, touched: Iterable[Hashable]):
+        """Called when graph `version` is published with the nodes touched since the previous one"""
+        touched = frozenset(touched)
+        with self._lock:
+            self._version = version
+            self._changes.append((version, touched))
+            for node in touched:
+                for key in list(self._by_node.get(node, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_node.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries = len(self._entries)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
@@ -1,39 +1,40 @@
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Iterable, Set, Optional, Tuple
 import networkx as nx
-from backend.app.services.graph_service import graph_service
+from backend.app.core.config import settings
+from backend.app.services.graph_service import graph_service, GraphSnapshot
+from backend.app.services.path_search import connecting_paths, multi_source_top_paths, top_k_paths
+from backend.app.services.reasoning_cache import ReasoningContextCache
+
+# Thresholds and limits used to render reasoning contexts (part of the cache key)
+_RELATION_THRESHOLD = 0.3
+_TOP_RELATIONS = 10
+_PATH_THRESHOLD = 0.3
+_TOP_PATHS = 5
+_TOP_CONNECTIONS = 3
 
 class ReasoningService:
     def __init__(self):
-        pass
+        self.context_cache = ReasoningContextCache(settings.REASONING_CACHE_SIZE)
+        graph_service.add_publish_listener(self.context_cache.invalidate)
 
     @property
     def graph(self):
-        return graph_service.graph
-
-    def get_connected_nodes(self, node_name: str, confidence_threshold: float = 0.5) -> List[Dict]:
-        """Get connected nodes with confidence filtering (MultiDiGraph compatible)"""
-        connected = []
-        if self.graph.has_node(node_name):
-            # Outgoing edges
-            if hasattr(self.graph, "out_edges"):
-                edges = self.graph.out_edges(node_name, keys=True, data=True)
-            else:
-                edges = self.graph.edges(node_name, keys=True, data=True)
-                
-            for _, neighbor, key, data in edges:
-                conf = data.get("confidence", 0)
-                if conf >= confidence_threshold:
-                    connected.append({
-                        "node": neighbor, 
-                        "relation": data.get("relation"),
-                        "confidence": conf, 
-                        "evidence": data.get("evidence", ""), 
-                        "key": key
-                    })
-        return connected
-
-    def explore_path(self, start_node: str, max_depth: int = 2, confidence_threshold: float = 0.5) -> List[Dict]:
+        return graph_service.snapshot().graph
+
+    @staticmethod
+    def _pin(snapshot: Optional[GraphSnapshot]) -> GraphSnapshot:
+        """Use the caller's graph version, or pin the latest published one"""
+        return graph_service.snapshot() if snapshot is None else snapshot
+
+    def get_connected_nodes(self, node_name: str, confidence_threshold: float = 0.5,
+                            snapshot: Optional[GraphSnapshot] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Get connected nodes with confidence filtering, most confident first (prefix of the sorted adjacency)"""
+        return self._pin(snapshot).adjacency.connections(node_name, confidence_threshold, limit)
+
+    def explore_path(self, start_node: str, max_depth: int = 2, confidence_threshold: float = 0.5,
+                     snapshot: Optional[GraphSnapshot] = None) -> List[Dict]:
         """Find paths from start_node up to max_depth"""
+        snapshot = self._pin(snapshot)
         paths = []
         visited = set()
 
@@ -50,7 +51,7 @@ class ReasoningService:
                     'final_node': node
                 })
             
-            for neighbor_data in self.get_connected_nodes(node, confidence_threshold):
+            for neighbor_data in self.get_connected_nodes(node, confidence_threshold, snapshot):
                 neighbor = neighbor_data['node']
                 if neighbor in visited: continue
                 
@@ -64,29 +65,180 @@ class ReasoningService:
         dfs(start_node, [], 1.0, 0)
         return paths
 
-    def reason_about_entity(self, entity_name: str, context_depth: int = 2) -> str:
-        """Generate reasoning context for a specific entity"""
-        if not self.graph.has_node(entity_name): 
+    def top_paths(self, start_node: str, k: int = 5, max_depth: int = 2, confidence_threshold: float = 0.5,
+                  snapshot: Optional[GraphSnapshot] = None, expanded: Optional[Set[str]] = None) -> List[Dict]:
+        """The k most confident paths from start_node (best-first, bounded expansion).
+
+        Nodes whose neighbours were read are added to `expanded` when given.
+        """
+        adjacency = self._pin(snapshot).adjacency
+
+        def neighbors(node):
+            if expanded is not None:
+                expanded.add(node)
+            return adjacency.neighbors(node, confidence_threshold)
+
+        return top_k_paths(
+            start_node, neighbors, k=k, max_depth=max_depth, confidence_threshold=confidence_threshold,
+            max_expansions=settings.GRAPH_PATH_MAX_EXPANSIONS
+        )
+
+    def multi_source_paths(self, start_nodes: Iterable[str], k: int = 5, max_depth: int = 2,
+                           confidence_threshold: float = 0.5, snapshot: Optional[GraphSnapshot] = None,
+                           accessed: Optional[Dict[str, Set[str]]] = None) -> Dict[str, List[Dict]]:
+        """top_paths for several start nodes in one traversal sharing neighbour lookups.
+
+        accessed[start] collects the nodes that start node's search reached, expanded or not.
+        """
+        adjacency = self._pin(snapshot).adjacency
+        return multi_source_top_paths(
+            list(start_nodes), lambda node: adjacency.neighbors(node, confidence_threshold), k=k,
+            max_depth=max_depth, confidence_threshold=confidence_threshold,
+            max_expansions=settings.GRAPH_PATH_MAX_EXPANSIONS, accessed=accessed
+        )
+
+    def connecting_paths(self, source: str, target: str, k: int = 3, max_depth: int = 3,
+                         confidence_threshold: float = 0.3, snapshot: Optional[GraphSnapshot] = None) -> List[Dict]:
+        """The k most confident paths source -> target (bidirectional search over out/in edges)"""
+        adjacency = self._pin(snapshot).adjacency
+        return connecting_paths(
+            source, target,
+            lambda node: adjacency.neighbors(node, confidence_threshold),
+            lambda node: adjacency.predecessors(node, confidence_threshold),
+            k=k, max_depth=max_depth, confidence_threshold=confidence_threshold,
+            max_expansions=settings.GRAPH_PATH_MAX_EXPANSIONS
+        )
+
+    @staticmethod
+    def _context_key(entity_name: str, context_depth: int):
+        return (entity_name, context_depth, _RELATION_THRESHOLD, _TOP_RELATIONS, _PATH_THRESHOLD, _TOP_PATHS)
+
+    def reason_about_entity(self, entity_name: str, context_depth: int = 2,
+                            snapshot: Optional[GraphSnapshot] = None) -> str:
+        """Generate reasoning context for a specific entity (memoized until its neighbourhood changes)"""
+        snapshot = self._pin(snapshot)
+        key = self._context_key(entity_name, context_depth)
+        context = self.context_cache.get(key, snapshot.version)
+        if context is None:
+            read_nodes = {entity_name}
+            context = self._render_entity_context(entity_name, context_depth, snapshot, read_nodes)
+            self.context_cache.put(key, snapshot.version, read_nodes, context)
+        return context
+
+    def reason_about_entities(self, entity_names: Iterable[str], context_depth: int = 2,
+                              snapshot: Optional[GraphSnapshot] = None) -> str:
+        """Reasoning context for every entity of a question, plus the paths connecting them.
+
+        Entities without a cached context are explored together in one
+        multi-source traversal instead of one search each.
+        """
+        snapshot = self._pin(snapshot)
+        entity_names = list(dict.fromkeys(entity_names))
+        contexts = {}
+        for entity in entity_names:
+            contexts[entity] = self.context_cache.get(self._context_key(entity, context_depth), snapshot.version)
+
+        missing = [entity for entity, context in contexts.items() if context is None]
+        if missing:
+            accessed: Dict[str, Set[str]] = {}
+            paths = {}
+            if context_depth > 1:
+                paths = self.multi_source_paths(
+                    [e for e in missing if snapshot.graph.has_node(e)], _TOP_PATHS, context_depth,
+                    _PATH_THRESHOLD, snapshot, accessed
+                )
+            for entity in missing:
+                read_nodes = {entity} | accessed.get(entity, set())
+                contexts[entity] = self._render_entity_context(
+                    entity, context_depth, snapshot, read_nodes, paths.get(entity, [])
+                )
+                self.context_cache.put(self._context_key(entity, context_depth), snapshot.version, read_nodes,
+                                       contexts[entity])
+
+        result = "".join(f"{contexts[entity]}\n" for entity in entity_names)
+        return result + self._render_connections(entity_names, snapshot)
+
+    def personalized_pagerank(self, entity_names: Iterable[str], snapshot: Optional[GraphSnapshot] = None,
+                              limit: Optional[int] = None) -> Tuple[List[Tuple[str, float]], List[Tuple[str, float]]]:
+        """Nodes and chunk document ids ranked by PageRank personalized on the given entities"""
+        return self._pin(snapshot).ppr.rank(
+            dict.fromkeys(entity_names, 1.0), damping=settings.GRAPH_PPR_DAMPING, tol=settings.GRAPH_PPR_TOL,
+            max_iter=settings.GRAPH_PPR_MAX_ITER, limit=limit
+        )
+
+    def reason_with_ppr(self, entity_names: Iterable[str],
+                        snapshot: Optional[GraphSnapshot] = None) -> Tuple[str, List[Tuple[str, float]]]:
+        """Reasoning context from the top PageRank-ranked entities and the relations among them.
+
+        Also returns the source chunks ranked by the same PageRank run, as
+        (document id, score) pairs, best first.
+        """
+        snapshot = self._pin(snapshot)
+        graph = snapshot.graph
+        entity_names = [e for e in dict.fromkeys(entity_names) if graph.has_node(e)]
+        ranked, chunks = self.personalized_pagerank(entity_names, snapshot, limit=settings.GRAPH_PPR_TOP_NODES)
+        if not ranked:
+            return "", chunks
+
+        context = f"## Entities Ranked by Relevance (seeds: {', '.join(entity_names)})\n"
+        for node, score in ranked:
+            node_data = graph.nodes[node]
+            context += f"- {node} ({node_data.get('type')}, score: {score:.4f})"
+            if node_data.get('description'):
+                context += f": {node_data.get('description')}"
+            context += "\n"
+
+        ranked_names = {node for node, _ in ranked}
+        relations = [
+            (conf, node, rel, neighbor)
+            for node, _ in ranked
+            for neighbor, rel, conf in snapshot.adjacency.neighbors(node, _RELATION_THRESHOLD)
+            if neighbor in ranked_names and neighbor != node
+        ]
+        relations.sort(key=lambda r: r[0], reverse=True)
+        if relations:
+            context += "\n### Relations Among Ranked Entities:\n"
+            for conf, node, rel, neighbor in relations[:2 * settings.GRAPH_PPR_TOP_NODES]:
+                context += f"- {node} [{rel}] -> {neighbor} (conf: {conf:.2f})\n"
+        return context, chunks
+
+    def _render_connections(self, entity_names: List[str], snapshot: GraphSnapshot) -> str:
+        graph = snapshot.graph
+        seeds = [entity for entity in entity_names if graph.has_node(entity)]
+        lines = []
+        for source in seeds:
+            for target in seeds:
+                if source == target:
+                    continue
+                for p in self.connecting_paths(source, target, _TOP_CONNECTIONS, settings.GRAPH_CONNECTION_MAX_DEPTH,
+                                               _PATH_THRESHOLD, snapshot):
+                    path_str = " -> ".join([f"[{step[2]}] -> {step[1]}" for step in p['path']])
+                    lines.append(f"- {source} {path_str} (conf: {p['confidence']:.2f})\n")
+        if not lines:
+            return ""
+        return "### Connections Between Question Entities:\n" + "".join(lines)
+
+    def _render_entity_context(self, entity_name: str, context_depth: int, snapshot: GraphSnapshot,
+                               read_nodes: Set[str], paths: Optional[List[Dict]] = None) -> str:
+        graph = snapshot.graph
+        if not graph.has_node(entity_name): 
             return ""
         
-        node_data = self.graph.nodes[entity_name]
+        node_data = graph.nodes[entity_name]
         context = f"## Entity: {entity_name}\nType: {node_data.get('type')}\nConfidence: {node_data.get('confidence', 0):.2f}\n"
         if node_data.get('description'):
             context += f"Description: {node_data.get('description')}\n"
             
         context += "\n### Direct Relations:\n"
-        connections = self.get_connected_nodes(entity_name, 0.3)
-        # Sort by confidence
-        connections.sort(key=lambda x: x['confidence'], reverse=True)
-        
-        for conn in connections[:10]:
+        # Already sorted by confidence: the top 10 are a prefix slice
+        for conn in self.get_connected_nodes(entity_name, _RELATION_THRESHOLD, snapshot, limit=_TOP_RELATIONS):
             context += f"- {conn['relation']} -> {conn['node']} (conf: {conn['confidence']:.2f})\n"
             
         if context_depth > 1:
             context += "\n### Reasoning Paths (Multi-hop):\n"
-            paths = self.explore_path(entity_name, context_depth, 0.3)
-            # Sort by confidence
-            top_paths = sorted(paths, key=lambda x: x['confidence'], reverse=True)[:5]
+            top_paths = paths if paths is not None else self.top_paths(
+                entity_name, _TOP_PATHS, context_depth, _PATH_THRESHOLD, snapshot, read_nodes
+            )
             
             for p in top_paths:
                 path_str = " -> ".join([f"[{step[2]}] -> {step[1]}" for step in p['path']])
@@ -0,0 +1,67 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple
+
+from backend.app.core.config import settings
+
+
+@dataclass
+class RetrievalBranch:
+    """A blocking retrieval step with its own timeout and fallback value."""
+    name: str
+    func: Callable[[], Any]
+    timeout: float
+    default: Any = None
+
+
+class RetrievalPlanner:
+    """Runs independent retrieval branches concurrently.
+
+    Blocking branches (PubMed HTTP, Chroma, graph traversal) are pushed to a
+    bounded thread pool so they never run on the event loop. Each branch has
+    its own timeout: a late or failing branch degrades to its default value
+    instead of delaying the answer, so latency is max(branches) rather than
+    sum(branches).
+
+    Note that a timed-out branch keeps its worker thread until the underlying
+    call returns; the pool size bounds how many such stragglers can pile up.
+    """
+
+    def __init__(self, max_workers: int):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="retrieval")
+
+    async def _run_branch(self, branch: RetrievalBranch) -> Any:
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(
+                loop.run_in_executor(self.executor, branch.func),
+                timeout=branch.timeout
+            )
+        except asyncio.TimeoutError:
+            print(f"[Retrieval] {branch.name} timed out after {branch.timeout:.1f}s, using fallback")
+            return branch.default
+        except Exception as e:
+            print(f"[Retrieval] {branch.name} failed: {e}")
+            return branch.default
+
+        print(f"[Retrieval] {branch.name} finished in {time.perf_counter() - start:.2f}s")
+        return result
+
+    async def run(self, branches: List[RetrievalBranch]) -> Dict[str, Any]:
+        """Run all branches concurrently and return {branch name: result}."""
+        results = await asyncio.gather(*(self._run_branch(b) for b in branches))
+        return {branch.name: result for branch, result in zip(branches, results)}
+
+    async def iter_completed(self, branches: List[RetrievalBranch]) -> AsyncIterator[Tuple[str, Any]]:
+        """Run all branches concurrently and yield (branch name, result) as each one finishes."""
+        async def named(branch: RetrievalBranch) -> Tuple[str, Any]:
+            return branch.name, await self._run_branch(branch)
+
+        for next_done in asyncio.as_completed([named(b) for b in branches]):
+            yield await next_done
+
+
+retrieval_planner = RetrievalPlanner(max_workers=settings.RETRIEVAL_MAX_WORKERS)
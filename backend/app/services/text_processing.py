@@ -1,6 +1,7 @@
 import re
 import unicodedata
-from typing import List, Dict
+from functools import lru_cache
+from typing import Iterable, List, Dict
 
 # ==============================================================================
 # DATA CONSTANTS
@@ -67,6 +68,99 @@ MEDICAL_STOPWORDS = {
     "chẩn đoán", "phương pháp", "kỹ thuật", "quy trình"
 }
 
+# ==============================================================================
+# NORMALIZER ENGINE
+# ==============================================================================
+
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+_NOISE_PATTERN = re.compile('|'.join([
+    r'\([^)]*\)',  # Remove parenthetical notes
+    r'\[[^\]]*\]',  # Remove bracketed notes
+    r'\d+\.\d+',    # Remove version numbers
+    r'trang \d+',   # Remove page references
+]))
+
+NORMALIZE_CACHE_SIZE = 65536
+_MAX_SYNONYM_PASSES = 3
+
+
+def _alternation(terms) -> str:
+    # Longest first so that e.g. "đtđ type 2" wins over "đtđ"
+    return '|'.join(re.escape(t) for t in sorted(terms, key=len, reverse=True))
+
+
+class MedicalTextNormalizer:
+    """Compiled, memoized implementation of normalize_medical_text.
+
+    Abbreviations and synonyms are each compiled into a single regex
+    alternation and replaced in one pass with word-boundary guards, so
+    "tha" no longer rewrites "thai" and canonical names are not expanded
+    twice ("thuốc lợi tiểu" stays as is). Results are kept in a bounded
+    LRU memo since the same entity names recur across chunks.
+    """
+
+    def __init__(self, abbreviations: Dict[str, str], synonyms: Dict[str, List[str]],
+                 cache_size: int = NORMALIZE_CACHE_SIZE):
+        self.abbreviations = abbreviations
+        # A whitespace-delimited token whose word characters spell an abbreviation
+        self._abbrev_pattern = re.compile(
+            r'(?<!\S)[^\w\s]*(' + _alternation(abbreviations) + r')[^\w\s]*(?!\S)'
+        )
+
+        # Canonical names map to themselves so the longest match protects them
+        self.synonym_map = {canonical: canonical for canonical in synonyms}
+        for canonical, variants in synonyms.items():
+            for variant in variants:
+                self.synonym_map.setdefault(variant, canonical)
+        self._synonym_pattern = re.compile(r'(?<!\w)(?:' + _alternation(self.synonym_map) + r')(?!\w)')
+
+        self._cached = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, text: str, expand_abbrev: bool, use_synonyms: bool) -> str:
+        # Step 1: Unicode normalization
+        text = unicodedata.normalize("NFC", text)
+        
+        # Step 2-3: Lowercase, remove extra whitespace
+        text = _WHITESPACE_PATTERN.sub(' ', text.strip().lower())
+        
+        # Step 4: Expand abbreviations
+        if expand_abbrev:
+            text = self._abbrev_pattern.sub(lambda m: self.abbreviations[m.group(1)], text)
+        
+        # Step 5: Normalize synonyms (a replacement can form a longer variant,
+        # e.g. "suy thận mạn tính" -> "bệnh thận mạn tính", so repeat until stable)
+        if use_synonyms:
+            for _ in range(_MAX_SYNONYM_PASSES):
+                replaced = self._synonym_pattern.sub(lambda m: self.synonym_map[m.group(0)], text)
+                if replaced == text:
+                    break
+                text = replaced
+        
+        # Step 6: Remove common noise patterns
+        text = _NOISE_PATTERN.sub('', text)
+        
+        # Step 7: Final cleanup
+        text = _WHITESPACE_PATTERN.sub(' ', text).strip()
+        
+        # Step 8: Title case (giữ nguyên tiếng Việt)
+        return text.title()
+
+    def normalize(self, text: str, expand_abbrev: bool = True, use_synonyms: bool = True) -> str:
+        if not text:
+            return "Unknown"
+        return self._cached(text, expand_abbrev, use_synonyms)
+
+    def normalize_many(self, texts: Iterable[str], expand_abbrev: bool = True,
+                       use_synonyms: bool = True) -> List[str]:
+        """Normalize a batch of texts (repeated names are computed once)."""
+        return [self.normalize(t, expand_abbrev, use_synonyms) for t in texts]
+
+    def cache_info(self):
+        return self._cached.cache_info()
+
+
+_normalizer = MedicalTextNormalizer(MEDICAL_ABBREVIATIONS, MEDICAL_SYNONYMS)
+
 # ==============================================================================
 # FUNCTIONS
 # ==============================================================================
@@ -74,52 +168,12 @@ MEDICAL_STOPWORDS = {
 def normalize_medical_text(text: str, expand_abbrev: bool = True, 
                            use_synonyms: bool = True) -> str:
     """Normalize text cho domain y tế."""
-    if not text:
-        return "Unknown"
-    
-    # Step 1: Unicode normalization
-    text = unicodedata.normalize("NFC", text)
-    
-    # Step 2: Lowercase
-    text = text.strip().lower()
-    
-    # Step 3: Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
-    
-    # Step 4: Expand abbreviations
-    if expand_abbrev:
-        words = text.split()
-        expanded = []
-        for word in words:
-            clean_word = re.sub(r'[^\w]', '', word)
-            if clean_word in MEDICAL_ABBREVIATIONS:
-                expanded.append(MEDICAL_ABBREVIATIONS[clean_word])
-            else:
-                expanded.append(word)
-        text = ' '.join(expanded)
-    
-    # Step 5: Normalize synonyms
-    if use_synonyms:
-        for canonical, variants in MEDICAL_SYNONYMS.items():
-            for variant in variants:
-                if variant in text:
-                    text = text.replace(variant, canonical)
-    
-    # Step 6: Remove common noise patterns
-    noise_patterns = [
-        r'\([^)]*\)',  # Remove parenthetical notes
-        r'\[[^\]]*\]',  # Remove bracketed notes
-        r'\d+\.\d+',    # Remove version numbers
-        r'trang \d+',   # Remove page references
-    ]
-    for pattern in noise_patterns:
-        text = re.sub(pattern, '', text)
-    
-    # Step 7: Final cleanup
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    # Step 8: Title case (giữ nguyên tiếng Việt)
-    return text.title()
+    return _normalizer.normalize(text, expand_abbrev, use_synonyms)
+
+def normalize_many(texts: Iterable[str], expand_abbrev: bool = True,
+                   use_synonyms: bool = True) -> List[str]:
+    """Normalize a batch of texts cho domain y tế."""
+    return _normalizer.normalize_many(texts, expand_abbrev, use_synonyms)
 
 def validate_entity(entity_name: str, entity_type: str) -> bool:
     """Validate if entity is valid medical entity."""
@@ -146,8 +200,8 @@ def validate_entity(entity_name: str, entity_type: str) -> bool:
 def deduplicate_entities(entities: List[Dict]) -> List[Dict]:
     """Remove duplicate entities based on normalized name."""
     seen = {}
-    for ent in entities:
-        norm_name = normalize_medical_text(ent.get('name', ''))
+    norm_names = normalize_many(ent.get('name', '') for ent in entities)
+    for ent, norm_name in zip(entities, norm_names):
         if norm_name not in seen:
             seen[norm_name] = ent
         else:
@@ -214,6 +268,7 @@ def validate_relation(relation) -> bool:
     
     if len(src) < 2 or len(tgt) < 2:
         return False
-    if normalize_medical_text(src) == normalize_medical_text(tgt):
+    norm_src, norm_tgt = normalize_many([src, tgt])
+    if norm_src == norm_tgt:
         return False
     return True
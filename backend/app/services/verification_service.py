@@ -1,21 +1,22 @@
 
-from typing import List
+import os
+from typing import Callable, List, Optional
 
 import torch
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
 from backend.app.core.config import settings
+from backend.app.services.nli_cache import NLIScoreCache
+from backend.app.services.nli_prefilter import bm25_scores, embedding_scores, select_passages
+from backend.app.services.nli_scorer import NLIScorer
 from backend.app.models.schemas import (
     StatementVerification,
     VerificationRequest,
     VerificationResponse,
 )
 
-# Label indices for roberta-large-mnli output logits.
-# The model outputs logits in the order: contradiction, neutral, entailment.
-_LABEL_CONTRADICTION = 0
-_LABEL_NEUTRAL = 1
-_LABEL_ENTAILMENT = 2
+# Tiers reported in StatementVerification.tier when the cascade is enabled.
+_TIER_FAST = 1
+_TIER_FULL = 2
 
 
 class SelfReflectiveCritic:
@@ -26,36 +27,52 @@ class SelfReflectiveCritic:
     of context passages and decides whether the overall reasoning is
     sufficiently supported.
 
+    With a cascade model configured, every statement is first scored by
+    the small tier-1 model; only statements whose best tier-1 score lies
+    within ``cascade_band`` of ``tau`` are re-scored by the full model.
+
     Attributes:
-        device: The torch device used for inference (cuda or cpu).
         tau: Per-statement entailment threshold (default 0.5).
         theta: Overall passage-level pass/fail threshold (default 0.7).
+        prefilter: Cheap passage scorer run before NLI ("none", "bm25"
+            or "embedding").
+        prefilter_top_m: Passages kept per statement by the prefilter.
+        prefilter_margin: Recall-safety margin (normalized score) for
+            keeping near-ties of the m-th passage.
+        scorer: The full NLI model (tier 2 of the cascade).
+        fast_scorer: The small tier-1 NLI model, or None when the
+            cascade is disabled.
+        cascade_band: Half-width of the uncertainty band around tau in
+            which tier-1 decisions escalate to the full model.
     """
 
     def __init__(self) -> None:
-        """Load the NLI model and tokenizer.
+        """Load the NLI model(s) and tokenizer(s).
 
-        The model is placed on a CUDA device when available, otherwise
-        it falls back to CPU.  Thresholds are read from the central
-        application settings so they can be adjusted without code
-        changes.
+        With the torch backend the models are placed on a CUDA device
+        when available, otherwise they fall back to CPU.  Thresholds are
+        read from the central application settings so they can be
+        adjusted without code changes.
         """
-        self.device = torch.device(
-            "cuda" if torch.cuda.is_available() else "cpu"
-        )
-        model_name: str = settings.NLI_MODEL_NAME
         self.tau: float = settings.NLI_SENTENCE_THRESHOLD
         self.theta: float = settings.NLI_PASSAGE_THRESHOLD
-
-        print(f"[SelfReflectiveCritic] Loading NLI model: {model_name}")
-        print(f"[SelfReflectiveCritic] Device: {self.device}")
-
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForSequenceClassification.from_pretrained(
-            model_name
-        )
-        self.model.to(self.device)
-        self.model.eval()
+        self.prefilter: str = settings.NLI_PREFILTER
+        self.prefilter_top_m: int = settings.NLI_PREFILTER_TOP_M
+        self.prefilter_margin: float = settings.NLI_PREFILTER_MARGIN
+        self.cascade_band: float = settings.NLI_CASCADE_BAND
+        self._embed: Optional[Callable[[List[str]], List[List[float]]]] = None
+
+        print(f"[SelfReflectiveCritic] Loading NLI model: {settings.NLI_MODEL_NAME}")
+        print(f"[SelfReflectiveCritic] Backend: {settings.NLI_BACKEND}")
+        self.scorer = self._make_scorer(settings.NLI_MODEL_NAME, settings.NLI_CACHE_PATH)
+        print(f"[SelfReflectiveCritic] Device: {self.scorer.device}")
+
+        self.fast_scorer: Optional[NLIScorer] = None
+        if settings.NLI_CASCADE_MODEL_NAME:
+            print(f"[SelfReflectiveCritic] Loading tier-1 NLI model: {settings.NLI_CASCADE_MODEL_NAME}")
+            # Separate file: each cache drops the rows of other models on open
+            root, ext = os.path.splitext(settings.NLI_CACHE_PATH)
+            self.fast_scorer = self._make_scorer(settings.NLI_CASCADE_MODEL_NAME, f"{root}.tier1{ext}")
 
         print("[SelfReflectiveCritic] Model loaded successfully.")
 
@@ -63,17 +80,86 @@ class SelfReflectiveCritic:
     # Private helpers
     # ------------------------------------------------------------------
 
+    @staticmethod
+    def _make_scorer(model_name: str, cache_path: str) -> NLIScorer:
+        """Build an NLI scorer with the batching, backend and cache settings.
+
+        Args:
+            model_name: Hugging Face id of the NLI model.
+            cache_path: SQLite file of the disk score cache, used when
+                ``NLI_CACHE_DISK`` is enabled.
+
+        Returns:
+            The loaded NLIScorer.
+        """
+        backend = settings.NLI_BACKEND
+        score_cache: Optional[NLIScoreCache] = None
+        if settings.NLI_CACHE_SIZE > 0 or settings.NLI_CACHE_DISK:
+            # Quantized scores differ from fp32 ones, so they are cached
+            # under their own key.
+            score_cache = NLIScoreCache(
+                model_name if backend == "torch" else f"{model_name}@{backend}",
+                settings.NLI_CACHE_SIZE,
+                cache_path if settings.NLI_CACHE_DISK else None,
+            )
+        return NLIScorer(
+            model_name,
+            backend=backend,
+            batch_token_budget=settings.NLI_BATCH_TOKEN_BUDGET,
+            max_batch_size=settings.NLI_MAX_BATCH_SIZE,
+            score_cache=score_cache,
+            onnx_dir=settings.NLI_ONNX_DIR,
+            onnx_threads=settings.NLI_ONNX_THREADS,
+        )
+
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts with the e5 model already loaded by the RAG service."""
+        if self._embed is None:
+            from backend.app.services.rag_service import rag_service
+            self._embed = rag_service.embeddings.embed_documents
+        return self._embed(texts)
+
+    def _candidate_passages(
+        self, hypotheses: List[str], passages: List[str]
+    ) -> List[List[int]]:
+        """Select the passages each statement is cross-encoded against.
+
+        With the prefilter disabled (or when there are no more passages
+        than ``prefilter_top_m``) every passage is a candidate.
+        Otherwise a cheap scorer (BM25 or e5 bi-encoder cosine) keeps
+        the top m passages per statement plus near-ties within the
+        safety margin, reducing NLI cost from O(S x P) to about
+        O(S x m).
+
+        Args:
+            hypotheses: The rationale statements to verify.
+            passages: All available context passages.
+
+        Returns:
+            Per statement, candidate passage indices in passage order.
+        """
+        all_passages = list(range(len(passages)))
+        if (
+            self.prefilter == "none"
+            or self.prefilter_top_m <= 0
+            or len(passages) <= self.prefilter_top_m
+        ):
+            return [all_passages for _ in hypotheses]
+
+        if self.prefilter == "bm25":
+            scores = bm25_scores(hypotheses, passages)
+        elif self.prefilter == "embedding":
+            scores = embedding_scores(hypotheses, passages, self._embed_texts,
+                                      settings.EMBEDDING_QUERY_PREFIX, settings.EMBEDDING_PASSAGE_PREFIX)
+        else:
+            raise ValueError(f"Unknown NLI_PREFILTER: {self.prefilter}")
+        return select_passages(scores, self.prefilter_top_m, self.prefilter_margin)
+
     def _compute_entailment_score(
         self, premise: str, hypothesis: str
     ) -> float:
         """Compute the entailment probability for a (premise, hypothesis) pair.
 
-        Steps:
-            1. Tokenize the pair with truncation to the model max length.
-            2. Run a forward pass with gradients disabled.
-            3. Apply softmax to the output logits.
-            4. Return the probability assigned to the 'entailment' class.
-
         Args:
             premise: The context passage (evidence text).
             hypothesis: The rationale statement to verify.
@@ -81,36 +167,114 @@ class SelfReflectiveCritic:
         Returns:
             A float in [0, 1] representing entailment confidence.
         """
-        inputs = self.tokenizer(
-            premise,
-            hypothesis,
-            return_tensors="pt",
-            truncation=True,
-            max_length=512,
-            padding=True,
-        )
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        return self.scorer.score_pairs([(premise, hypothesis)])[0].item()
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            logits = outputs.logits
+    def _score_candidates(
+        self,
+        scorer: NLIScorer,
+        hypotheses: List[str],
+        passages: List[str],
+        candidates: List[List[int]],
+    ) -> torch.Tensor:
+        """Score the candidate (passage, statement) pairs with one model.
 
-        probabilities = torch.softmax(logits, dim=-1)
-        entailment_prob: float = probabilities[0, _LABEL_ENTAILMENT].item()
+        Args:
+            scorer: The NLI model to run.
+            hypotheses: The rationale statements.
+            passages: All available context passages.
+            candidates: Passage indices to score for each statement.
 
-        return entailment_prob
+        Returns:
+            An S x P tensor of entailment probabilities, with -1.0 for
+            passages that were not candidates (so they can never be the
+            best one).
+        """
+        rows = [row for row, chosen in enumerate(candidates) for _ in chosen]
+        cols = [col for chosen in candidates for col in chosen]
+        scores = torch.full((len(hypotheses), len(passages)), -1.0)
+        scores[rows, cols] = scorer.score_pairs(
+            [(passages[col], hypotheses[row]) for row, col in zip(rows, cols)]
+        )
+        return scores
+
+    def _verify_statements(
+        self, hypotheses: List[str], passages: List[str]
+    ) -> List[StatementVerification]:
+        """Verify every rationale statement against all passages at once.
+
+        The candidate (passage, statement) pairs chosen by the prefilter
+        (all S x P pairs when it is disabled) are scored in batched
+        forward passes, then reduced per statement with a row-wise max.
+        Ties keep the first passage with the highest score, and a best
+        score of 0.0 keeps an empty ``best_passage``, as a sequential
+        scan with a strict ``>`` comparison would.  A statement is
+        labelled 'Supported' when its best score meets or exceeds the
+        sentence threshold (tau), otherwise 'Unsupported'.
+
+        With the cascade enabled, the pairs are scored by the tier-1
+        model first.  Statements whose best tier-1 score is closer to tau
+        than ``cascade_band`` have all their candidate pairs re-scored by
+        the full model, whose scores then decide them; the others keep
+        their tier-1 result.
+
+        Args:
+            hypotheses: The rationale statements to verify.
+            passages: All available context passages.
+
+        Returns:
+            One StatementVerification per statement, in input order,
+            with the deciding tier set when the cascade is enabled.
+        """
+        tiers: List[Optional[int]] = [None] * len(hypotheses)
+        if not passages:
+            best_scores = [0.0] * len(hypotheses)
+            best_indices = [0] * len(hypotheses)
+        else:
+            candidates = self._candidate_passages(hypotheses, passages)
+            if self.fast_scorer is None:
+                scores = self._score_candidates(self.scorer, hypotheses, passages, candidates)
+            else:
+                scores = self._score_candidates(self.fast_scorer, hypotheses, passages, candidates)
+                tiers = [_TIER_FAST] * len(hypotheses)
+                uncertain = [
+                    row for row, score in enumerate(scores.max(dim=1).values.tolist())
+                    if abs(score - self.tau) < self.cascade_band
+                ]
+                if uncertain:
+                    scores[uncertain] = self._score_candidates(
+                        self.scorer,
+                        [hypotheses[row] for row in uncertain],
+                        passages,
+                        [candidates[row] for row in uncertain],
+                    )
+                    for row in uncertain:
+                        tiers[row] = _TIER_FULL
+            best, indices = scores.max(dim=1)
+            best_scores, best_indices = best.tolist(), indices.tolist()
+
+        results: List[StatementVerification] = []
+        for hypothesis, best_score, index, tier in zip(hypotheses, best_scores, best_indices, tiers):
+            if best_score <= 0.0:
+                best_score, best_passage = 0.0, ""
+            else:
+                best_passage = passages[index]
+            label = "Supported" if best_score >= self.tau else "Unsupported"
+            results.append(
+                StatementVerification(
+                    statement=hypothesis,
+                    label=label,
+                    confidence_score=round(best_score, 4),
+                    best_passage=best_passage,
+                    tier=tier,
+                )
+            )
+        return results
 
     def _verify_statement(
         self, hypothesis: str, passages: List[str]
     ) -> StatementVerification:
         """Verify a single rationale statement against all passages.
 
-        For each passage the entailment score is computed.  The passage
-        with the highest score is selected as the best supporting
-        evidence.  The statement is labelled 'Supported' when the best
-        score meets or exceeds the sentence threshold (tau), otherwise
-        it is labelled 'Unsupported'.
-
         Args:
             hypothesis: The rationale statement to verify.
             passages: All available context passages.
@@ -118,25 +282,7 @@ class SelfReflectiveCritic:
         Returns:
             A StatementVerification instance with the scoring result.
         """
-        best_score: float = 0.0
-        best_passage: str = ""
-
-        for passage in passages:
-            score = self._compute_entailment_score(
-                premise=passage, hypothesis=hypothesis
-            )
-            if score > best_score:
-                best_score = score
-                best_passage = passage
-
-        label = "Supported" if best_score >= self.tau else "Unsupported"
-
-        return StatementVerification(
-            statement=hypothesis,
-            label=label,
-            confidence_score=round(best_score, 4),
-            best_passage=best_passage,
-        )
+        return self._verify_statements([hypothesis], passages)[0]
 
     # ------------------------------------------------------------------
     # Public API
@@ -146,8 +292,8 @@ class SelfReflectiveCritic:
         """Run the full Self-MedRAG verification pipeline.
 
         Algorithm:
-            1. For each rationale statement, cross-reference it with
-               every context passage using NLI entailment scoring.
+            1. Cross-reference every rationale statement with every
+               context passage using batched NLI entailment scoring.
             2. Label each statement as Supported or Unsupported based
                on the sentence threshold (tau).
             3. Compute the overall support score S_i as the ratio of
@@ -166,8 +312,7 @@ class SelfReflectiveCritic:
         supported: List[StatementVerification] = []
         unsupported: List[StatementVerification] = []
 
-        for statement in request.statements:
-            result = self._verify_statement(statement, request.passages)
+        for result in self._verify_statements(request.statements, request.passages):
             if result.label == "Supported":
                 supported.append(result)
             else:
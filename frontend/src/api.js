@@ -17,6 +17,58 @@ export async function searchQuery(query, topK = 5) {
     return res.json();
 }
 
+/**
+ * Stream a search query from the backend as server-sent events.
+ * POST /search/stream -> events: vector, graph, pubmed, token..., done (or error)
+ *
+ * `onEvent(event, data)` is called for every event as it arrives, so callers can
+ * render retrieval results first and then append answer tokens incrementally.
+ * Resolves with the full answer text once the stream ends.
+ */
+export async function searchQueryStream(query, onEvent, topK = 5) {
+    const res = await fetch(`${BASE_URL}/search/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ query, top_k: topK }),
+    });
+    if (!res.ok || !res.body) {
+        const err = await res.json().catch(() => ({}));
+        throw new Error(err.detail || `Search failed (${res.status})`);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+
+    const dispatch = (block) => {
+        let event = 'message';
+        const dataLines = [];
+        for (const line of block.split('\n')) {
+            if (line.startsWith('event:')) event = line.slice(6).trim();
+            else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+        }
+        if (dataLines.length === 0) return;
+        const data = JSON.parse(dataLines.join('\n'));
+        if (event === 'token') answer += data;
+        if (event === 'error') throw new Error(data);
+        onEvent?.(event, data);
+    };
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        let sep;
+        while ((sep = buffer.indexOf('\n\n')) !== -1) {
+            dispatch(buffer.slice(0, sep));
+            buffer = buffer.slice(sep + 2);
+        }
+    }
+    if (buffer.trim()) dispatch(buffer);
+    return answer;
+}
+
 /**
  * Upload PDF files for ingestion.
  * POST /ingest/ -> { message, files }
@@ -1,11 +1,12 @@
 import { useState, useRef, useEffect } from 'react'
-import { searchQuery } from '../api'
+import { searchQueryStream } from '../api'
 import MessageBubble, { TypingIndicator } from './MessageBubble'
 
 export default function ChatPanel() {
     const [messages, setMessages] = useState([])
     const [input, setInput] = useState('')
     const [loading, setLoading] = useState(false)
+    const [streaming, setStreaming] = useState(false)
     const messagesEndRef = useRef(null)
     const inputRef = useRef(null)
 
@@ -34,14 +35,30 @@ export default function ChatPanel() {
         setLoading(true)
 
         try {
-            const data = await searchQuery(query)
-            const answer =
-                data.results && data.results.length > 0
-                    ? data.results.join('\n\n')
-                    : 'No results found for your query.'
+            let started = false
+            const answer = await searchQueryStream(query, (event, data) => {
+                if (event !== 'token') return
+                if (!started) {
+                    // First token: replace the typing indicator with a live message
+                    started = true
+                    setStreaming(true)
+                    setMessages((prev) => [...prev, { role: 'ai', content: data, time: getTimeString() }])
+                    return
+                }
+                setMessages((prev) => {
+                    const last = prev[prev.length - 1]
+                    return [...prev.slice(0, -1), { ...last, content: last.content + data }]
+                })
+            })
 
-            const aiMsg = { role: 'ai', content: answer, time: getTimeString() }
-            setMessages((prev) => [...prev, aiMsg])
+            if (!started) {
+                const aiMsg = {
+                    role: 'ai',
+                    content: answer || 'No results found for your query.',
+                    time: getTimeString(),
+                }
+                setMessages((prev) => [...prev, aiMsg])
+            }
         } catch (err) {
             const errMsg = {
                 role: 'ai',
@@ -51,6 +68,7 @@ export default function ChatPanel() {
             setMessages((prev) => [...prev, errMsg])
         } finally {
             setLoading(false)
+            setStreaming(false)
             inputRef.current?.focus()
         }
     }
@@ -90,7 +108,7 @@ export default function ChatPanel() {
                                 time={msg.time}
                             />
                         ))}
-                        {loading && <TypingIndicator />}
+                        {loading && !streaming && <TypingIndicator />}
                         <div ref={messagesEndRef} />
                     </>
                 )}
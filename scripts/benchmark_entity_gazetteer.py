@@ -0,0 +1,86 @@
+"""
+Benchmark: per-query graph entity detection, linear node scan vs. EntityGazetteer.
+
+Builds synthetic Vietnamese medical node names (already normalized, as GraphService
+stores them) and times matching a set of clinical questions against them.
+
+Usage (from the repository root):
+    python scripts/benchmark_entity_gazetteer.py --sizes 10000 100000 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app.services.entity_gazetteer import EntityGazetteer
+from backend.app.services.text_processing import normalize_medical_text
+
+HEADS = ["bệnh", "hội chứng", "viêm", "suy", "ung thư", "nhiễm", "thuốc", "xét nghiệm", "rối loạn", "tổn thương"]
+SYLLABLES = [
+    "thận", "tim", "gan", "phổi", "não", "máu", "mạch", "xương", "khớp", "da", "dạ", "dày", "ruột", "tụy",
+    "mật", "tuyến", "giáp", "cầu", "tiểu", "đường", "huyết", "áp", "mạn", "cấp", "tính", "nặng", "nhẹ",
+    "trái", "phải", "trên", "dưới", "sau", "trước", "nội", "ngoại", "vi", "khuẩn", "nấm", "virus", "độc",
+]
+QUESTIONS = [
+    "Bệnh nhân tăng huyết áp kèm đái tháo đường type 2 nên dùng thuốc ức chế men chuyển không?",
+    "Biến chứng của bệnh thận mạn giai đoạn cuối là gì?",
+    "Xét nghiệm nào dùng để chẩn đoán suy tim cấp ở người cao tuổi?",
+    "Triệu chứng của viêm cầu thận cấp và cách điều trị?",
+    "Metformin có chống chỉ định ở bệnh nhân suy thận nặng không?",
+]
+
+
+def make_names(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    names = set(normalize_medical_text(q) for q in ["Tăng huyết áp", "Đái tháo đường", "Suy tim", "Bệnh thận mạn"])
+    while len(names) < n:
+        words = [rng.choice(HEADS)] + [rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))]
+        names.add(" ".join(words).title())
+    return list(names)
+
+
+def linear_scan(names: list, question: str) -> list:
+    """The previous RAGService detection: normalize every node on every query."""
+    norm_question = normalize_medical_text(question)
+    return [node for node in names if normalize_medical_text(node) in norm_question]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--linear-max", type=int, default=100_000,
+                        help="Skip the linear scan above this graph size (it takes seconds per query)")
+    args = parser.parse_args()
+
+    print(f"{'nodes':>10} | {'build (s)':>10} | {'gazetteer / query':>18} | {'linear scan / query':>20}")
+    print("-" * 68)
+    for size in args.sizes:
+        names = make_names(size)
+
+        start = time.perf_counter()
+        gazetteer = EntityGazetteer(names)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for question in QUESTIONS:
+                gazetteer.match(question)
+        per_query = (time.perf_counter() - start) / (args.repeat * len(QUESTIONS))
+
+        linear = "skipped"
+        if size <= args.linear_max:
+            start = time.perf_counter()
+            for question in QUESTIONS:
+                linear_scan(names, question)
+            linear = f"{(time.perf_counter() - start) / len(QUESTIONS) * 1000:.1f} ms"
+
+        print(f"{size:>10} | {build:>10.1f} | {per_query * 1e6:>15.1f} us | {linear:>20}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark: per-question fuzzy entity linking latency (EntityEmbeddingIndex.link).
+
+Fills the index with synthetic Vietnamese medical node names and times linking a set of
+clinical questions: how many spans are encoded, the span encoding time and the total
+link time, for the numpy backend and for faiss HNSW when faiss is installed.
+
+By default spans and names are encoded with a hashed character-trigram stand-in, which
+isolates span generation and search. Pass --model (e.g. intfloat/multilingual-e5-small,
+needs langchain_huggingface) to include the real encoder. Above --encode-max names the
+index is filled with random unit vectors instead of encoded names (search cost does not
+depend on what the vectors mean).
+
+Usage (from the repository root):
+    python scripts/benchmark_entity_link.py --sizes 10000 100000
+    python scripts/benchmark_entity_link.py --sizes 100000 --model intfloat/multilingual-e5-small
+"""
+
+import argparse
+import os
+import sys
+import time
+import zlib
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app.core.config import settings
+from backend.app.services import entity_index as entity_index_module
+from backend.app.services.entity_index import EntityEmbeddingIndex
+from scripts.benchmark_entity_gazetteer import QUESTIONS, make_names
+
+
+def trigram_embed(texts, dim: int = 384):
+    """Deterministic stand-in for the sentence encoder: hashed character trigrams."""
+    vectors = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        padded = f"  {text.lower()}  "
+        for i in range(len(padded) - 2):
+            vectors[row, zlib.crc32(padded[i:i + 3].encode()) % dim] += 1.0
+    return vectors
+
+
+def all_ngrams(text: str, max_ngram: int) -> int:
+    """Number of spans the unfiltered 1..max_ngram enumeration would encode."""
+    tokens = entity_index_module._TOKEN_PATTERN.findall(entity_index_module.normalize_medical_text(text))
+    return len({" ".join(tokens[s:e]) for s in range(len(tokens)) for e in range(s + 1, min(s + max_ngram, len(tokens)) + 1)})
+
+
+def build_index(embed, model_name: str, names: list, backend: str, encode_max: int, prefixes) -> EntityEmbeddingIndex:
+    index = EntityEmbeddingIndex(embed, model_name, backend=backend, query_prefix=prefixes[0], passage_prefix=prefixes[1])
+    if len(names) <= encode_max:
+        index.add_many(names)
+        index.flush()
+        return index
+    dim = index._encode(["probe"], index.passage_prefix).shape[1]
+    rng = np.random.default_rng(0)
+    for start in range(0, len(names), 50_000):
+        batch = names[start:start + 50_000]
+        vectors = rng.standard_normal((len(batch), dim)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        with index._lock:
+            index._append(batch, vectors)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--model", default=None, help="HuggingFace embedding model (default: trigram stand-in)")
+    parser.add_argument("--encode-max", type=int, default=20_000,
+                        help="Encode node names up to this graph size, use random vectors above it")
+    parser.add_argument("--max-ngram", type=int, default=settings.ENTITY_LINK_MAX_NGRAM)
+    parser.add_argument("--max-spans", type=int, default=settings.ENTITY_LINK_MAX_SPANS)
+    args = parser.parse_args()
+
+    if args.model:
+        from langchain_huggingface import HuggingFaceEmbeddings
+        embed, model_name = HuggingFaceEmbeddings(model_name=args.model).embed_documents, args.model
+        prefixes = (settings.EMBEDDING_QUERY_PREFIX, settings.EMBEDDING_PASSAGE_PREFIX)
+    else:
+        embed, model_name, prefixes = trigram_embed, "trigram", ("", "")
+
+    spans = [len(EntityEmbeddingIndex.spans(q, args.max_ngram, args.max_spans)) for q in QUESTIONS]
+    unfiltered = [all_ngrams(q, args.max_ngram) for q in QUESTIONS]
+    print(f"spans / question: {np.mean(spans):.1f} encoded (all 1..{args.max_ngram}-grams: {np.mean(unfiltered):.1f})")
+
+    backends = ["numpy"] + (["faiss"] if entity_index_module.faiss is not None else [])
+    print(f"{'nodes':>10} | {'backend':>7} | {'build (s)':>10} | {'encode / query':>15} | {'link / query':>13}")
+    print("-" * 68)
+    for size in args.sizes:
+        names = make_names(size)
+        for backend in backends:
+            start = time.perf_counter()
+            index = build_index(embed, model_name, names, backend, args.encode_max, prefixes)
+            build = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for question in QUESTIONS:
+                    index._encode(EntityEmbeddingIndex.spans(question, args.max_ngram, args.max_spans), index.query_prefix)
+            encode = (time.perf_counter() - start) / (args.repeat * len(QUESTIONS))
+
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for question in QUESTIONS:
+                    index.link(question, top_k=settings.ENTITY_LINK_TOP_K, threshold=settings.ENTITY_LINK_THRESHOLD,
+                               max_ngram=args.max_ngram, max_spans=args.max_spans)
+            link = (time.perf_counter() - start) / (args.repeat * len(QUESTIONS))
+
+            print(f"{size:>10} | {backend:>7} | {build:>10.1f} | {encode * 1000:>12.2f} ms | {link * 1000:>10.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: networkx MultiDiGraph vs. CompactGraph (array-backed CSR store).
+
+Builds the same synthetic medical graph (nodes with GraphService attributes,
+edges with relation/confidence/evidence/page/chunk) in both stores and reports
+build time, memory (tracemalloc) and lookup latency for the calls
+ReasoningService and GraphService make: out_edges(data=True) and the
+(src, tgt, relation, chunk) duplicate probe.
+
+SQLiteGraph can be included with `--stores networkx compact sqlite`; its
+memory column only covers the Python side (the data lives in the database file).
+
+Usage (from the repository root):
+    python scripts/benchmark_graph_store.py --edges 100000 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+
+from backend.app.services.graph_store import CompactGraph, SQLiteGraph
+
+TYPES = ["DISEASE", "DRUG", "SYMPTOM", "TEST", "ANATOMY", "TREATMENT", "PROCEDURE", "RISK_FACTOR", "UNKNOWN"]
+RELATIONS = ["TREATS", "CAUSES", "DIAGNOSES", "PREVENTS", "CONTRAINDICATES", "SYMPTOM_OF", "RISK_OF", "INTERACTS_WITH"]
+EVIDENCE_WORDS = "bệnh nhân điều trị thuốc liều dùng chỉ định theo dõi huyết áp đường máu thận tim gan".split()
+
+
+def build(store_cls, n_edges: int, seed: int = 0):
+    rng = random.Random(seed)
+    n_nodes = max(10, n_edges // 5)
+    G = store_cls()
+    for i in range(n_nodes):
+        G.add_node(
+            f"Entity {i}", label=f"entity {i}", type=rng.choice(TYPES), description="Mô tả thực thể y khoa",
+            confidence=rng.choice([0.5, 0.7, 0.9]), relevance_score=rng.randint(1, 10),
+            pages=[rng.randint(1, 300)], chunks=[rng.randint(0, 5000)]
+        )
+    for _ in range(n_edges):
+        G.add_edge(
+            f"Entity {rng.randrange(n_nodes)}", f"Entity {rng.randrange(n_nodes)}",
+            relation=rng.choice(RELATIONS), confidence=rng.randint(1, 10) / 10.0,
+            evidence=" ".join(rng.choice(EVIDENCE_WORDS) for _ in range(rng.randint(8, 20))),
+            page=rng.randint(1, 300), chunk=rng.randint(0, 5000)
+        )
+    return G, n_nodes
+
+
+def measure(store_cls, n_edges: int, queries: int):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    G, n_nodes = build(store_cls, n_edges)
+    build_s = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    rng = random.Random(1)
+    names = [f"Entity {rng.randrange(n_nodes)}" for _ in range(queries)]
+
+    start = time.perf_counter()
+    for name in names:
+        for _, _, _, data in G.out_edges(name, keys=True, data=True):
+            data.get("confidence")
+    out_edges_us = (time.perf_counter() - start) / queries * 1e6
+
+    start = time.perf_counter()
+    for i, name in enumerate(names):
+        tgt = names[-i - 1]
+        if hasattr(G, "has_relation"):
+            G.has_relation(name, tgt, "TREATS", 7)
+        elif G.has_edge(name, tgt):
+            any(d.get("relation") == "TREATS" and d.get("chunk") == 7 for d in G.get_edge_data(name, tgt).values())
+    probe_us = (time.perf_counter() - start) / queries * 1e6
+    return build_s, memory, out_edges_us, probe_us
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--edges", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--stores", nargs="+", default=["networkx", "compact"], choices=["networkx", "compact", "sqlite"])
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp()
+    stores = {
+        "networkx": nx.MultiDiGraph,
+        "compact": CompactGraph,
+        "sqlite": lambda: SQLiteGraph(os.path.join(tmp_dir, f"graph_{time.time_ns()}.sqlite3")),
+    }
+
+    print(f"{'edges':>9} | {'store':>12} | {'build (s)':>9} | {'memory (MB)':>11} | {'bytes/edge':>10} | "
+          f"{'out_edges (us)':>14} | {'dup probe (us)':>14}")
+    for n_edges in args.edges:
+        for store in args.stores:
+            build_s, memory, out_edges_us, probe_us = measure(stores[store], n_edges, args.queries)
+            print(f"{n_edges:>9} | {store:>12} | {build_s:>9.1f} | {memory / 2**20:>11.1f} | "
+                  f"{memory / n_edges:>10.0f} | {out_edges_us:>14.1f} | {probe_us:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: NLI inference backends (NLI_BACKEND) on CPU - PyTorch fp32 vs. ONNX
+Runtime fp32 vs. ONNX Runtime with dynamic int8 quantization
+(services/nli_onnx.py).
+
+For every backend it reports throughput in (premise, hypothesis) pairs/sec and
+the accuracy delta against the PyTorch fp32 entailment probabilities: max / mean
+absolute difference and the fraction of pairs whose label at
+NLI_SENTENCE_THRESHOLD flips. The score cache is disabled so every pair is scored.
+
+Usage (from the repository root; exports and quantizes NLI_MODEL_NAME on first run):
+    python scripts/benchmark_nli_backends.py --statements 10 --passages 20 --threads 0 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The module-level critic is the fp32 PyTorch reference; ONNX runners are swapped in below.
+os.environ["NLI_BACKEND"] = "torch"
+os.environ["NLI_CACHE_SIZE"] = "0"
+os.environ["NLI_CACHE_DISK"] = "false"
+os.environ["NLI_CASCADE_MODEL_NAME"] = ""
+
+import torch
+
+from benchmark_nli_batching import make_request
+from backend.app.core.config import settings
+from backend.app.services.nli_onnx import OnnxNLIRunner
+from backend.app.services.verification_service import verification_service
+
+
+def timed_scores(scorer, pairs, repeats: int):
+    scorer.run_model(pairs[:8])  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        scores = scorer.run_model(pairs)
+    return scores, len(pairs) * repeats / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statements", type=int, default=10)
+    parser.add_argument("--passages", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--threads", type=int, nargs="+", default=[0], help="ONNX intra-op threads (0 = all cores)")
+    args = parser.parse_args()
+
+    critic = verification_service
+    scorer = critic.scorer
+    scorer.model.to("cpu")
+    scorer.device = torch.device("cpu")
+    request = make_request(args.statements, args.passages)
+    pairs = [(p, s) for s in request.statements for p in request.passages]
+    cache_dir = os.path.join(settings.NLI_ONNX_DIR, settings.NLI_MODEL_NAME.replace("/", "__"))
+    print(f"{len(pairs)} pairs, torch threads {torch.get_num_threads()}")
+
+    reference, throughput = timed_scores(scorer, pairs, args.repeats)
+    reference_labels = reference >= critic.tau
+    print(f"{'backend':>10} | {'threads':>7} | {'pairs/s':>8} | {'max |d|':>8} | {'mean |d|':>8} | {'label flips':>11}")
+    print(f"{'torch':>10} | {torch.get_num_threads():>7} | {throughput:>8.1f} | {0:>8.4f} | {0:>8.4f} | {0:>11.1%}")
+
+    for backend in ("onnx", "onnx-int8"):
+        for threads in args.threads:
+            scorer.onnx_runner = OnnxNLIRunner(
+                lambda: scorer.model, scorer.tokenizer, cache_dir, quantize=backend == "onnx-int8", threads=threads
+            )
+            scores, throughput = timed_scores(scorer, pairs, args.repeats)
+            delta = (scores - reference).abs()
+            flips = ((scores >= critic.tau) != reference_labels).float().mean().item()
+            print(f"{backend:>10} | {threads or os.cpu_count():>7} | {throughput:>8.1f} | "
+                  f"{delta.max().item():>8.4f} | {delta.mean().item():>8.4f} | {flips:>11.1%}")
+    scorer.onnx_runner = None
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark: per-pair NLI scoring (previous SelfReflectiveCritic._verify_statement,
+one roberta-large-mnli forward pass per (passage, statement) pair) vs. batched
+scoring (SelfReflectiveCritic.verify: length-sorted, token-budgeted micro-batches).
+
+Reports wall-clock for S statements x P passages and checks that labels, best
+passages and rounded scores are unchanged.
+
+Usage (from the repository root; downloads NLI_MODEL_NAME on first run):
+    python scripts/benchmark_nli_batching.py --statements 10 --passages 10
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from backend.app.models.schemas import VerificationRequest
+from backend.app.services.verification_service import verification_service
+
+FACTS = [
+    "Metformin is the first-line drug treatment for type 2 diabetes",
+    "Amlodipine lowers blood pressure by blocking calcium channels",
+    "ACE inhibitors are contraindicated during pregnancy",
+    "Chronic kidney disease increases the risk of cardiovascular events",
+    "Insulin therapy is required in type 1 diabetes",
+    "Beta blockers reduce heart rate and myocardial oxygen demand",
+    "Statins lower LDL cholesterol and reduce the risk of stroke",
+    "Hypertension is a major risk factor for heart failure",
+    "Aspirin inhibits platelet aggregation",
+    "Loop diuretics relieve edema in heart failure",
+]
+FILLER = ("Patients were followed for twelve months and outcomes were recorded by the treating physician. "
+          "Adverse events were rare and mostly mild. ")
+
+
+def make_request(n_statements: int, n_passages: int, seed: int = 0) -> VerificationRequest:
+    rng = random.Random(seed)
+    statements = [rng.choice(FACTS) + "." for _ in range(n_statements)]
+    passages = [
+        FILLER * rng.randint(0, 6) + rng.choice(FACTS) + ". " + FILLER * rng.randint(0, 6)
+        for _ in range(n_passages)
+    ]
+    return VerificationRequest(statements=statements, passages=passages)
+
+
+def score_one(critic, premise: str, hypothesis: str) -> float:
+    """The previous implementation: batch size 1, one forward pass per pair."""
+    scorer = critic.scorer
+    inputs = scorer.tokenizer(premise, hypothesis, return_tensors="pt", truncation=True, max_length=512, padding=True)
+    inputs = {k: v.to(scorer.device) for k, v in inputs.items()}
+    with torch.no_grad():
+        logits = scorer.model(**inputs).logits
+    return torch.softmax(logits, dim=-1)[0, scorer.entailment_index].item()
+
+
+def verify_sequential(critic, request: VerificationRequest):
+    results = []
+    for statement in request.statements:
+        best_score, best_passage = 0.0, ""
+        for passage in request.passages:
+            score = score_one(critic, passage, statement)
+            if score > best_score:
+                best_score, best_passage = score, passage
+        results.append((statement, "Supported" if best_score >= critic.tau else "Unsupported",
+                        round(best_score, 4), best_passage))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--statements", type=int, default=10)
+    parser.add_argument("--passages", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    critic = verification_service
+    request = make_request(args.statements, args.passages)
+    print(f"{args.statements} statements x {args.passages} passages on {critic.scorer.device} "
+          f"(token budget {critic.scorer.batch_token_budget}, max batch {critic.scorer.max_batch_size})")
+
+    timings = {"per-pair": [], "batched": []}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        expected = verify_sequential(critic, request)
+        timings["per-pair"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = critic.verify(request)
+        timings["batched"].append(time.perf_counter() - start)
+
+    by_statement = {}
+    for result in response.supported_statements + response.unsupported_statements:
+        by_statement.setdefault(result.statement, result)
+    found = [(s, by_statement[s].label, by_statement[s].confidence_score, by_statement[s].best_passage)
+             for s, *_ in expected]
+    mismatches = sum(a != b for a, b in zip(expected, found))
+
+    for name, values in timings.items():
+        print(f"{name:>9}: best {min(values):.2f}s, mean {sum(values) / len(values):.2f}s")
+    print(f"speedup: {min(timings['per-pair']) / min(timings['batched']):.1f}x; "
+          f"statements with a different result: {mismatches}/{len(expected)}")
+
+
+if __name__ == "__main__":
+    main()
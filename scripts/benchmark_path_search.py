@@ -0,0 +1,109 @@
+"""
+Benchmark: exhaustive DFS path enumeration (previous ReasoningService.explore_path
++ sort + top 5) vs. best-first top-k search (services/path_search.py).
+
+Builds a scale-free-ish synthetic MultiDiGraph with a few hub nodes (like
+"Tăng Huyết Áp") and times top-5 path queries from the hubs at depth 2-4.
+
+Usage (from the repository root):
+    python scripts/benchmark_path_search.py --nodes 20000 --edges 200000 --depths 2 3 4
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import networkx as nx
+
+from backend.app.services.path_search import top_k_paths
+
+
+def make_graph(n_nodes: int, n_edges: int, seed: int = 0) -> nx.MultiDiGraph:
+    rng = random.Random(seed)
+    G = nx.MultiDiGraph()
+    G.add_nodes_from(range(n_nodes))
+    # Preferential attachment on both ends gives a handful of very high-degree hubs
+    ends = list(range(n_nodes))
+    for _ in range(n_edges):
+        u, v = rng.choice(ends), rng.choice(ends)
+        G.add_edge(u, v, relation=rng.choice(["TREATS", "CAUSES", "RISK_OF"]), confidence=rng.randint(3, 10) / 10.0)
+        ends.extend((u, v))
+    return G
+
+
+def connected(G, node, threshold):
+    """Previous get_connected_nodes: scan out-edges and build dicts on every call."""
+    return [
+        {"node": v, "relation": d.get("relation"), "confidence": d.get("confidence", 0), "key": k}
+        for _, v, k, d in G.out_edges(node, keys=True, data=True)
+        if d.get("confidence", 0) >= threshold
+    ]
+
+
+def dfs_top_k(G, start, max_depth, threshold, k):
+    paths, visited = [], set()
+
+    def dfs(node, path, confidence, depth):
+        if depth > max_depth or node in visited:
+            return
+        visited.add(node)
+        if path:
+            paths.append({"path": path.copy(), "confidence": confidence, "final_node": node})
+        for conn in connected(G, node, threshold):
+            neighbor = conn["node"]
+            if neighbor in visited:
+                continue
+            new_confidence = confidence * conn["confidence"]
+            if new_confidence >= threshold:
+                dfs(neighbor, path + [(node, neighbor, conn["relation"])], new_confidence, depth + 1)
+        visited.remove(node)
+
+    dfs(start, [], 1.0, 0)
+    return sorted(paths, key=lambda p: p["confidence"], reverse=True)[:k], len(paths)
+
+
+def best_first_top_k(G, start, max_depth, threshold, k):
+    def neighbors(node):
+        return ((c["node"], c["relation"], c["confidence"]) for c in connected(G, node, threshold))
+    return top_k_paths(start, neighbors, k=k, max_depth=max_depth, confidence_threshold=threshold)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--nodes", type=int, default=20_000)
+    parser.add_argument("--edges", type=int, default=200_000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 3, 4])
+    parser.add_argument("--hubs", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=0.3)
+    parser.add_argument("--dfs-max-depth", type=int, default=3,
+                        help="Skip exhaustive DFS above this depth (it does not finish on hubs)")
+    args = parser.parse_args()
+
+    G = make_graph(args.nodes, args.edges)
+    hubs = sorted(G.nodes(), key=G.out_degree, reverse=True)[:args.hubs]
+    print(f"Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges; "
+          f"hub out-degrees {[G.out_degree(h) for h in hubs]}")
+    print(f"{'depth':>5} | {'hub':>6} | {'DFS paths':>10} | {'DFS (ms)':>10} | {'best-first (ms)':>15} | {'same top-5':>10}")
+
+    for depth in args.depths:
+        for hub in hubs:
+            start = time.perf_counter()
+            best = best_first_top_k(G, hub, depth, args.threshold, 5)
+            best_ms = (time.perf_counter() - start) * 1000
+
+            if depth <= args.dfs_max_depth:
+                start = time.perf_counter()
+                expected, n_paths = dfs_top_k(G, hub, depth, args.threshold, 5)
+                dfs_ms = (time.perf_counter() - start) * 1000
+                same = [p["confidence"] for p in best] == [p["confidence"] for p in expected]
+                print(f"{depth:>5} | {hub:>6} | {n_paths:>10} | {dfs_ms:>10.1f} | {best_ms:>15.2f} | {str(same):>10}")
+            else:
+                print(f"{depth:>5} | {hub:>6} | {'-':>10} | {'skipped':>10} | {best_ms:>15.2f} | {'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Validation: two-tier NLI cascade (NLI_CASCADE_MODEL_NAME / NLI_CASCADE_BAND) vs.
+scoring every statement with the full NLI_MODEL_NAME model.
+
+For every band it reports the fraction of statements escalated to tier 2, the
+wall-clock (against tier-1-only and full-model-only runs) and statement-label /
+overall pass-fail changes against the full-model run. The score caches are
+disabled so every run does its own NLI work.
+
+Input is the same JSONL as scripts/validate_nli_prefilter.py (synthetic by default).
+
+Usage (from the repository root; downloads both models on first run):
+    python scripts/validate_nli_cascade.py --model MoritzLaurer/multilingual-MiniLMv2-L6-mnli-xnli --bands 0.1 0.2 0.3
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["NLI_CACHE_SIZE"] = "0"
+os.environ["NLI_CACHE_DISK"] = "false"
+
+from validate_nli_prefilter import labels, load, synthetic
+from backend.app.core.config import settings
+from backend.app.services.verification_service import verification_service
+
+
+def run(critic, requests):
+    start = time.perf_counter()
+    responses = [critic.verify(r) for r in requests]
+    return responses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", help="JSONL of verification requests (default: synthetic)")
+    parser.add_argument("--requests", type=int, default=30, help="Synthetic requests when --data is not given")
+    parser.add_argument("--model", default=settings.NLI_CASCADE_MODEL_NAME or "MoritzLaurer/multilingual-MiniLMv2-L6-mnli-xnli")
+    parser.add_argument("--bands", type=float, nargs="+", default=[0.1, 0.2, 0.3])
+    args = parser.parse_args()
+
+    requests = list(load(args.data) if args.data else synthetic(args.requests))
+    critic = verification_service
+    if critic.fast_scorer is None or critic.fast_scorer.model_name != args.model:
+        critic.fast_scorer = critic._make_scorer(args.model, "")
+    fast_scorer, n_statements = critic.fast_scorer, sum(len(r.statements) for r in requests)
+
+    critic.fast_scorer = None
+    reference, full_s = run(critic, requests)
+    critic.fast_scorer, critic.cascade_band = fast_scorer, 0.0
+    _, fast_s = run(critic, requests)
+    print(f"{len(requests)} requests, {n_statements} statements; "
+          f"{settings.NLI_MODEL_NAME} only {full_s:.1f}s, {args.model} only {fast_s:.1f}s")
+    print(f"{'band':>5} | {'escalated':>9} | {'time (s)':>8} | {'label changes':>13} | {'verdict changes':>15}")
+
+    for band in args.bands:
+        critic.cascade_band = band
+        responses, elapsed = run(critic, requests)
+        escalated = label_changes = verdict_changes = 0
+        for expected, found in zip(reference, responses):
+            escalated += sum(r.tier == 2 for r in found.supported_statements + found.unsupported_statements)
+            expected_labels, found_labels = labels(expected), labels(found)
+            label_changes += sum(expected_labels[s] != found_labels.get(s) for s in expected_labels)
+            verdict_changes += expected.is_passed != found.is_passed
+        print(f"{band:>5.2f} | {escalated / max(n_statements, 1):>9.1%} | {elapsed:>8.1f} | "
+              f"{label_changes:>6} ({label_changes / max(n_statements, 1):>4.1%}) | "
+              f"{verdict_changes:>7} ({verdict_changes / max(len(requests), 1):>4.1%})")
+
+
+if __name__ == "__main__":
+    main()
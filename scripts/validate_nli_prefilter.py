@@ -0,0 +1,109 @@
+"""
+Validation: how often does the NLI prefilter cascade (BM25 / e5 bi-encoder top-m
+passages per statement, see services/nli_prefilter.py) change a verdict compared
+with cross-encoding every passage?
+
+Input is a JSONL file with one verification request per line:
+    {"statements": ["..."], "passages": ["..."]}
+Without --data a synthetic set is generated (facts embedded in filler passages).
+
+For every prefilter setting it reports statement-label and overall pass/fail
+changes against the full S x P run, the fraction of NLI pairs scored and the
+wall-clock.
+
+Usage (from the repository root; downloads NLI_MODEL_NAME on first run):
+    python scripts/validate_nli_prefilter.py --data val.jsonl --top-m 2 3 5 --margins 0 0.1 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.app.models.schemas import VerificationRequest
+from backend.app.services.verification_service import verification_service
+
+FACTS = [
+    "Metformin is the first-line drug treatment for type 2 diabetes",
+    "Amlodipine lowers blood pressure by blocking calcium channels",
+    "ACE inhibitors are contraindicated during pregnancy",
+    "Chronic kidney disease increases the risk of cardiovascular events",
+    "Insulin therapy is required in type 1 diabetes",
+    "Beta blockers reduce heart rate and myocardial oxygen demand",
+    "Statins lower LDL cholesterol and reduce the risk of stroke",
+    "Hypertension is a major risk factor for heart failure",
+]
+FILLER = "Patients were followed for twelve months and outcomes were recorded. "
+
+
+def synthetic(n_requests: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n_requests):
+        passages = [FILLER * rng.randint(0, 4) + rng.choice(FACTS) + ". " + FILLER * rng.randint(0, 4)
+                    for _ in range(rng.randint(5, 15))]
+        statements = [rng.choice(FACTS) + "." for _ in range(rng.randint(2, 8))]
+        yield VerificationRequest(statements=statements, passages=passages)
+
+
+def load(path: str):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield VerificationRequest(**json.loads(line))
+
+
+def labels(response):
+    return {r.statement: r.label for r in response.supported_statements + response.unsupported_statements}
+
+
+def count_pairs(critic, request) -> int:
+    return sum(len(c) for c in critic._candidate_passages(request.statements, request.passages))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", help="JSONL of verification requests (default: synthetic)")
+    parser.add_argument("--requests", type=int, default=30, help="Synthetic requests when --data is not given")
+    parser.add_argument("--prefilters", nargs="+", default=["bm25", "embedding"], choices=["bm25", "embedding"])
+    parser.add_argument("--top-m", type=int, nargs="+", default=[3])
+    parser.add_argument("--margins", type=float, nargs="+", default=[0.0, 0.1])
+    args = parser.parse_args()
+
+    requests = list(load(args.data) if args.data else synthetic(args.requests))
+    critic = verification_service
+
+    critic.prefilter = "none"
+    start = time.perf_counter()
+    reference = [critic.verify(r) for r in requests]
+    full_s = time.perf_counter() - start
+    full_pairs = sum(len(r.statements) * len(r.passages) for r in requests)
+    n_statements = sum(len(r.statements) for r in requests)
+    print(f"{len(requests)} requests, {n_statements} statements, {full_pairs} pairs; full NLI {full_s:.1f}s")
+    print(f"{'prefilter':>9} | {'m':>2} | {'margin':>6} | {'pairs':>6} | {'time (s)':>8} | "
+          f"{'label changes':>13} | {'verdict changes':>15}")
+
+    for prefilter in args.prefilters:
+        for top_m in args.top_m:
+            for margin in args.margins:
+                critic.prefilter, critic.prefilter_top_m, critic.prefilter_margin = prefilter, top_m, margin
+                pairs = sum(count_pairs(critic, r) for r in requests)
+                start = time.perf_counter()
+                responses = [critic.verify(r) for r in requests]
+                elapsed = time.perf_counter() - start
+
+                label_changes = verdict_changes = 0
+                for expected, found in zip(reference, responses):
+                    expected_labels, found_labels = labels(expected), labels(found)
+                    label_changes += sum(expected_labels[s] != found_labels.get(s) for s in expected_labels)
+                    verdict_changes += expected.is_passed != found.is_passed
+                print(f"{prefilter:>9} | {top_m:>2} | {margin:>6.2f} | {pairs / full_pairs:>6.1%} | {elapsed:>8.1f} | "
+                      f"{label_changes:>6} ({label_changes / max(n_statements, 1):>4.1%}) | "
+                      f"{verdict_changes:>7} ({verdict_changes / max(len(requests), 1):>4.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+import pytest
+
+# Service modules create their singletons (and data files) at import time: keep them out of the repo
+_DATA_DIR = tempfile.mkdtemp(prefix="vimed-test-data-")
+for _name, _path in {
+    "DATA_DIR": _DATA_DIR,
+    "CHROMA_PERSIST_DIRECTORY": os.path.join(_DATA_DIR, "chroma"),
+    "GRAPH_SQLITE_PATH": os.path.join(_DATA_DIR, "amg_data", "graph.sqlite3"),
+    "GRAPH_PROVENANCE_PATH": os.path.join(_DATA_DIR, "amg_data", "provenance.sqlite3"),
+    "ENTITY_INDEX_PATH": os.path.join(_DATA_DIR, "amg_data", "entity_embeddings.npz"),
+    "LLM_CACHE_PATH": os.path.join(_DATA_DIR, "llm_cache.sqlite3"),
+    "INGEST_JOBS_DB": os.path.join(_DATA_DIR, "ingest_jobs.sqlite3"),
+    "NLI_CACHE_PATH": os.path.join(_DATA_DIR, "nli_cache.sqlite3"),
+    "NLI_ONNX_DIR": os.path.join(_DATA_DIR, "onnx"),
+}.items():
+    os.environ[_name] = _path
+
+
+@pytest.fixture
+def make_graph_service(tmp_path, monkeypatch):
+    """Build GraphService instances on a per-test data directory; call again to simulate a restart."""
+    from backend.app.core.config import settings
+    from backend.app.services.graph_service import GraphService
+
+    def make(store: str = "networkx", name: str = "graph") -> GraphService:
+        """`name` selects the data directory, so independent services can coexist in a test"""
+        data_dir = tmp_path / name
+        monkeypatch.setattr(settings, "DATA_DIR", str(data_dir))
+        monkeypatch.setattr(settings, "GRAPH_SQLITE_PATH", str(data_dir / "graph.sqlite3"))
+        monkeypatch.setattr(settings, "GRAPH_PROVENANCE_PATH", str(data_dir / "provenance.sqlite3"))
+        monkeypatch.setattr(settings, "GRAPH_STORE", store)
+        return GraphService()
+
+    return make
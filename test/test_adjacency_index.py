@@ -0,0 +1,32 @@
+import networkx as nx
+
+from backend.app.services.adjacency_index import AdjacencyIndex
+
+
+def _graph() -> nx.MultiDiGraph:
+    G = nx.MultiDiGraph()
+    for target, confidence in [("B", 0.4), ("C", 0.9), ("D", 0.2), ("E", 0.9), ("F", 0.6)]:
+        G.add_edge("A", target, relation="TREATS", confidence=confidence, evidence=f"A-{target}")
+    return G
+
+
+def test_threshold_query_is_sorted_prefix() -> None:
+    index = AdjacencyIndex(_graph())
+    assert [c["node"] for c in index.connections("A", 0.4)] == ["C", "E", "F", "B"]
+    assert index.neighbors("A", 0.5, limit=2) == [("C", "TREATS", 0.9), ("E", "TREATS", 0.9)]
+    assert index.connections("missing") == []
+
+
+def test_derive_invalidates_only_touched_nodes() -> None:
+    G = _graph()
+    index = AdjacencyIndex(G)
+    index.connections("A")
+    index.connections("B")
+
+    G2 = G.copy()
+    G2.add_edge("A", "G", relation="CAUSES", confidence=0.95)
+    derived = index.derive(G2, touched=["A", "G"])
+
+    assert len(derived) == 1  # "B" carried over, "A" rebuilt on demand
+    assert derived.neighbors("A", 0.9)[0] == ("G", "CAUSES", 0.95)
+    assert [n for n, _, _ in index.neighbors("A", 0.9)] == ["C", "E"]
@@ -0,0 +1,25 @@
+from backend.app.services.entity_gazetteer import EntityGazetteer
+
+
+def test_gazetteer_matches_multiword_and_overlapping_names() -> None:
+    gazetteer = EntityGazetteer(["Tăng Huyết Áp", "Đái Tháo Đường", "Đái Tháo Đường Type 2", "Thận"])
+    found = gazetteer.match("Bệnh nhân THA kèm đái tháo đường type 2 và bệnh thận?")
+    assert set(found) == {"Tăng Huyết Áp", "Đái Tháo Đường", "Đái Tháo Đường Type 2", "Thận"}
+
+
+def test_gazetteer_respects_word_boundaries_and_incremental_add() -> None:
+    gazetteer = EntityGazetteer(["Ho"])
+    assert gazetteer.match("Hoa hồng") == []
+    assert gazetteer.match("Ho kéo dài") == ["Ho"]
+
+    gazetteer.add("Suy Tim")
+    gazetteer.add("Suy Tim")
+    assert len(gazetteer) == 2
+    assert gazetteer.match("dấu hiệu suy tim") == ["Suy Tim"]
+
+
+def test_gazetteer_matches_a_node_by_its_alias() -> None:
+    gazetteer = EntityGazetteer(["Tăng Huyết Ápi Kỳ"])
+    gazetteer.add("Tăng Huyết Ápi Kỳ", alias="Thai Kỳ")
+    assert gazetteer.match("khám thai kỳ") == ["Tăng Huyết Ápi Kỳ"]
+    assert gazetteer.match("tăng huyết áp") == []
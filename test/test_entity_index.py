@@ -0,0 +1,109 @@
+import zlib
+
+import numpy as np
+
+from backend.app.services.entity_index import EntityEmbeddingIndex
+
+
+def _trigram_embed(texts):
+    """Deterministic stand-in for the sentence encoder: hashed character trigrams."""
+    vectors = np.zeros((len(texts), 256), dtype=np.float32)
+    for row, text in enumerate(texts):
+        padded = f"  {text.lower()}  "
+        for i in range(len(padded) - 2):
+            vectors[row, zlib.crc32(padded[i:i + 3].encode()) % 256] += 1.0
+    return vectors.tolist()
+
+
+def _index(**kwargs) -> EntityEmbeddingIndex:
+    index = EntityEmbeddingIndex(_trigram_embed, "trigram", backend="numpy", **kwargs)
+    index.add_many(["Tăng Huyết Áp", "Đái Tháo Đường", "Metformin", "Suy Tim"])
+    assert index.flush() == 4
+    return index
+
+
+def test_link_matches_misspelled_span() -> None:
+    index = _index()
+    linked = index.link("bệnh nhân dùng metfromin có sao không", top_k=3, threshold=0.5)
+    assert [name for name, _ in linked] == ["Metformin"]
+    assert index.link("câu hỏi không liên quan", top_k=3, threshold=0.9) == []
+
+
+def test_incremental_add_and_persistence(tmp_path) -> None:
+    path = str(tmp_path / "entities.npz")
+    index = _index(path=path)
+    index.add_many(["Suy Tim", "Insulin"])
+    assert index.pending == 1
+    index.flush()
+    assert len(index) == 5
+    assert index.link("insulin", threshold=0.9)[0][0] == "Insulin"
+
+    index.save()
+    reloaded = EntityEmbeddingIndex(_trigram_embed, "trigram", path=path, backend="numpy")
+    assert len(reloaded) == 5
+    assert reloaded.link("insulin", threshold=0.9) == index.link("insulin", threshold=0.9)
+    # Vectors from another model are not reused
+    assert len(EntityEmbeddingIndex(_trigram_embed, "other-model", path=path, backend="numpy")) == 0
+
+
+def test_flush_async_encodes_in_background() -> None:
+    index = _index()
+    index.add_many(["Insulin"])
+    index.flush_async()
+    worker = index._worker
+    if worker is not None:
+        worker.join(timeout=5)
+    assert index.pending == 0
+    assert "Insulin" in [name for name, _ in index.link("insulin", threshold=0.9)]
+
+
+def test_spans_and_names_get_the_role_prefixes(tmp_path) -> None:
+    encoded = []
+
+    def embed(texts):
+        encoded.extend(texts)
+        return _trigram_embed([text.split(": ", 1)[1] for text in texts])
+
+    path = str(tmp_path / "entities.npz")
+    index = EntityEmbeddingIndex(embed, "trigram", path=path, backend="numpy",
+                                 query_prefix="query: ", passage_prefix="passage: ")
+    index.add_many(["Metformin"])
+    index.flush()
+    assert index.link("metformin", threshold=0.9)[0][0] == "Metformin"
+    assert encoded == ["passage: Metformin", "query: Metformin"]
+
+    index.save()
+    assert len(EntityEmbeddingIndex(embed, "trigram", path=path, backend="numpy",
+                                    query_prefix="query: ", passage_prefix="passage: ")) == 1
+    # Vectors encoded with other prefixes are not reused
+    assert len(EntityEmbeddingIndex(_trigram_embed, "trigram", path=path, backend="numpy")) == 0
+
+
+def test_unsaved_names_accumulate_across_flushes_until_persisted(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(EntityEmbeddingIndex, "_SAVE_EVERY", 5)
+    path = tmp_path / "entities.npz"
+    index = _index(path=str(path))
+    assert index.unsaved == 4 and not path.exists()
+
+    # One name per flush (as with per-publish flushes) still reaches the save threshold
+    index.add_many(["Insulin"])
+    index.flush()
+    assert index.unsaved == 0 and path.exists()
+    assert len(EntityEmbeddingIndex(_trigram_embed, "trigram", path=str(path), backend="numpy")) == 5
+
+    # Below the threshold, persist() (end of ingestion, shutdown) encodes and saves the rest
+    index.add_many(["Aspirin"])
+    index.persist()
+    assert index.unsaved == 0 and index.pending == 0
+    assert len(EntityEmbeddingIndex(_trigram_embed, "trigram", path=str(path), backend="numpy")) == 6
+
+
+def test_spans_skip_function_words_and_are_capped() -> None:
+    spans = EntityEmbeddingIndex.spans("Metformin có chống chỉ định ở bệnh nhân suy thận không?", max_ngram=3)
+    assert "Metformin" in spans and "Suy Thận" in spans and "Bệnh Nhân Suy" in spans
+    assert not any(word in span.split() for span in spans for word in ("Có", "Ở", "Không"))
+    assert all(len(span.split()) <= 3 for span in spans)
+
+    capped = EntityEmbeddingIndex.spans("Metformin có chống chỉ định ở bệnh nhân suy thận không?", max_ngram=3, max_spans=4)
+    assert capped == spans[:4]
+    assert EntityEmbeddingIndex.spans("có không là gì", max_ngram=4) == []
@@ -0,0 +1,246 @@
+import json
+import os
+
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.models.schemas import Entity, Relation
+
+CHUNKS = [
+    ([("Tăng Huyết Áp", "DISEASE", 8), ("Amlodipin", "DRUG", 9)], [("Amlodipin", "Tăng Huyết Áp", "TREATS", 9)]),
+    ([("Đái Tháo Đường", "DISEASE", 8), ("Metformin", "DRUG", 9)], [("Metformin", "Đái Tháo Đường", "TREATS", 8)]),
+    ([("Tăng Huyết Áp", "DISEASE", 10)], [("Đái Tháo Đường", "Suy Thận", "CAUSES", 7)]),
+    ([("Suy Thận", "DISEASE", 7)], [("Tăng Huyết Áp", "Suy Thận", "CAUSES", 6), ("Amlodipin", "Phù", "CAUSES", 5)]),
+]
+
+
+def _ingest(service, chunks, source="doc", offset=0):
+    for i, (entities, relations) in enumerate(chunks, start=offset):
+        service.add_entities([Entity(name=n, type=t, relevance_score=r) for n, t, r in entities], i // 2, i, source)
+        service.add_relations([Relation(source_name=s, target_name=t, relation=rel, confidence_score=c)
+                               for s, t, rel, c in relations], i // 2, i, source)
+        service.save_checkpoint(i, len(CHUNKS), source)
+        service.publish()
+
+
+def _contents(graph):
+    # Compact/SQLite stores do not keep description=None and return pages/chunks as arrays
+    nodes = {n: {k: list(v) if k in ("pages", "chunks") else v for k, v in d.items() if v is not None}
+             for n, d in graph.nodes(data=True)}
+    edges = sorted((u, v, sorted(d.items())) for u, v, d in graph.edges(data=True))
+    return nodes, edges
+
+
+def test_op_log_replay_and_compaction_rebuild_the_same_graph(make_graph_service, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "GRAPH_OPLOG_COMPACT_OPS", 8)
+    service = make_graph_service()
+    _ingest(service, CHUNKS[:3])
+    assert service.checkpoint_manager.snapshot_seq > 0  # compacted into a snapshot at least once
+    _ingest(service, CHUNKS[3:], offset=3)  # tail left in the op log
+    assert service._seq > service.checkpoint_manager.snapshot_seq
+
+    restarted = make_graph_service()
+    assert _contents(restarted.graph) == _contents(service.graph)
+    assert restarted.checkpointed_chunk("doc") == 3
+
+    restarted.compact()
+    assert _contents(make_graph_service().graph) == _contents(service.graph)
+
+
+def test_checkpoint_meta_is_written_in_batches(make_graph_service, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "GRAPH_CHECKPOINT_META_EVERY", 3)
+    monkeypatch.setattr(settings, "GRAPH_OPLOG_COMPACT_OPS", 10_000)
+    service = make_graph_service()
+    meta_path = service.checkpoint_manager.meta_path
+
+    def meta():
+        with open(meta_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    _ingest(service, CHUNKS[:2])
+    assert not os.path.exists(meta_path)
+    _ingest(service, CHUNKS[2:3], offset=2)
+    assert meta()["sources"]["doc"] == 2
+    service.save_checkpoint(4, 4, "doc", force=True)
+    assert meta()["sources"]["doc"] == 4
+    # Resume points between meta writes come back from the op log
+    assert make_graph_service().checkpointed_chunk("doc") == 4
+
+
+def _store_view(graph):
+    """What graph_service and the readers query, in a store-independent form"""
+    nodes = sorted(graph.nodes())
+    return {
+        "contents": _contents(graph),
+        "counts": (graph.number_of_nodes(), graph.number_of_edges()),
+        "has_node": [graph.has_node(n) for n in nodes + ["Không Có"]],
+        "degree": [graph.degree(n) for n in nodes],
+        "successors": [sorted(graph.successors(n)) for n in nodes],
+        "predecessors": [sorted(graph.predecessors(n)) for n in nodes],
+        "out_edges": [sorted((u, v, d["relation"]) for u, v, d in graph.out_edges(n, data=True)) for n in nodes],
+        "in_edges": [sorted((u, v, d["relation"]) for u, v, d in graph.in_edges(n, data=True)) for n in nodes],
+        "edge_data": sorted(
+            (u, v, sorted(d["relation"] for d in graph.get_edge_data(u, v).values()))
+            for u, v in {(u, v) for u, v, _ in graph.edges(data=True)}
+        ),
+    }
+
+
+@pytest.mark.parametrize("store", ["compact", "sqlite"])
+def test_stores_match_networkx(make_graph_service, store) -> None:
+    reference = make_graph_service("networkx", "reference")
+    _ingest(reference, CHUNKS[:2])
+    service = make_graph_service(store)
+    _ingest(service, CHUNKS[:2])
+    pinned = service.snapshot()
+    expected_pinned = _store_view(reference.snapshot().graph)
+
+    _ingest(reference, CHUNKS[2:], offset=2)
+    _ingest(service, CHUNKS[2:], offset=2)
+    # Re-adding a chunk's relation is a duplicate; the same relation from another chunk is not
+    for graph_service in (reference, service):
+        assert graph_service.edge_exists("Amlodipin", "Tăng Huyết Áp", "TREATS", 0)
+        assert not graph_service.edge_exists("Amlodipin", "Tăng Huyết Áp", "TREATS", 1)
+        graph_service.add_relations([Relation(source_name="Amlodipin", target_name="Tăng Huyết Áp", relation="TREATS",
+                                              confidence_score=9)], 0, 0, "doc")
+        graph_service.add_relations([Relation(source_name="Amlodipin", target_name="Tăng Huyết Áp", relation="TREATS",
+                                              confidence_score=9)], 2, 5, "doc")
+        graph_service.save_checkpoint(5, 6, "doc")
+        graph_service.publish()
+
+    assert _store_view(service.graph) == _store_view(reference.graph)
+    assert _store_view(service.snapshot().graph) == _store_view(reference.snapshot().graph)
+    assert _store_view(pinned.graph) == expected_pinned
+
+
+def test_pinned_snapshot_is_unaffected_by_later_publishes(make_graph_service) -> None:
+    service = make_graph_service()
+    _ingest(service, CHUNKS[:2])
+    pinned = service.snapshot()
+    contents = _contents(pinned.graph)
+    neighbors = pinned.adjacency.neighbors("Amlodipin")
+    ranked, _ = pinned.ppr.rank({"Amlodipin": 1.0})
+
+    _ingest(service, CHUNKS[2:], offset=2)
+    service.add_entities([Entity(name="Amlodipin", type="DRUG", relevance_score=10, description="CCB")], 3, 6, "doc")
+    latest = service.publish()
+
+    assert latest.version > pinned.version
+    assert _contents(latest.graph) != contents
+    assert _contents(pinned.graph) == contents
+    assert pinned.adjacency.neighbors("Amlodipin") == neighbors
+    assert pinned.ppr.rank({"Amlodipin": 1.0})[0] == ranked
+    assert not pinned.graph.has_node("Phù")
+
+
+class _FakeVectorStore:
+    """Chroma's get-by-id over the chunks of the given documents, stored as RAGService does"""
+
+    def __init__(self, documents):
+        self.texts = {f"{source}:{i}": f"chunk {i} of {source}" for source, n in documents.items() for i in range(n)}
+
+    def get(self, ids, include=()):
+        found = [doc_id for doc_id in ids if doc_id in self.texts]
+        return {"ids": found, "documents": [self.texts[d] for d in found], "metadatas": [{} for _ in found]}
+
+
+def _legacy_ingest(service, chunks):
+    """Ingestion before documents had source ids: no provenance, no per-source checkpoint"""
+    for i, (entities, relations) in enumerate(chunks):
+        service.add_entities([Entity(name=n, type=t, relevance_score=r) for n, t, r in entities], 0, i)
+        service.add_relations([Relation(source_name=s, target_name=t, relation=rel, confidence_score=c)
+                               for s, t, rel, c in relations], 0, i)
+        service.save_checkpoint(i, len(chunks))
+
+
+def test_legacy_graph_provenance_is_not_backfilled(make_graph_service) -> None:
+    service = make_graph_service()
+    _legacy_ingest(service, CHUNKS[:2])
+    assert len(service.provenance) == 0 and not service.checkpoint_manager.sources
+
+    # Legacy chunks have generated vector-store ids: no provenance ids that cannot be fetched
+    restarted = make_graph_service()
+    assert len(restarted.provenance) == 0
+    assert restarted.provenance.rank_chunks(["Amlodipin", "Tăng Huyết Áp"]) == []
+    _, chunks = restarted.snapshot().ppr.rank({"Amlodipin": 1.0})
+    assert chunks == []
+
+
+def test_single_source_provenance_backfill_resolves_in_the_vector_store(make_graph_service) -> None:
+    service = make_graph_service()
+    _ingest(service, CHUNKS[:2])
+    service.provenance._conn.execute("DELETE FROM entity_chunks")
+    service.provenance._conn.execute("DELETE FROM chunks")
+    service.provenance._conn.commit()
+
+    restarted = make_graph_service()
+    store = _FakeVectorStore({"doc": len(CHUNKS)})
+    ranked = restarted.provenance.rank_chunks(["Amlodipin", "Tăng Huyết Áp"])
+    assert ranked == [("doc:0", 2)]
+    _, ppr_chunks = restarted.snapshot().ppr.rank({"Metformin": 1.0})
+    doc_ids = [doc_id for doc_id, _ in ranked + ppr_chunks]
+    assert store.get(ids=doc_ids)["ids"] == doc_ids
+
+
+def test_networkx_snapshot_stacks_only_the_touched_nodes(make_graph_service) -> None:
+    service = make_graph_service()
+    for i in range(64):
+        service.add_entities([Entity(name=f"Thuốc {i}", type="DRUG", relevance_score=8)], 0, i, "doc")
+        service.add_relations([Relation(source_name=f"Thuốc {i}", target_name="Tăng Huyết Áp", relation="TREATS",
+                                        confidence_score=8)], 0, i, "doc")
+        published = service.publish()
+        # Each layer is more than twice the size of the one above it: O(log n) layers
+        sizes = [len(layer) for layer in published.graph._node._layers]
+        assert all(below > 2 * above for above, below in zip(sizes, sizes[1:]))
+    assert _contents(published.graph) == _contents(service.graph)
+    assert list(published.graph.nodes()) == list(service.graph.nodes())
+    assert published.graph.number_of_nodes() == 65
+    assert published.graph.degree("Tăng Huyết Áp") == 64
+
+
+def test_maybe_publish_batches_versions(make_graph_service, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "GRAPH_PUBLISH_EVERY_CHUNKS", 3)
+    monkeypatch.setattr(settings, "GRAPH_PUBLISH_INTERVAL_SECONDS", 3600)
+    service = make_graph_service()
+    start = service.snapshot().version
+    for i, (entities, _) in enumerate(CHUNKS[:3]):
+        service.add_entities([Entity(name=n, type=t, relevance_score=r) for n, t, r in entities], 0, i, "doc")
+        published = service.maybe_publish()
+        assert (published is not None) == (i == 2)
+    assert service.snapshot().version == start + 1
+    assert service.snapshot().graph.has_node("Đái Tháo Đường")
+
+    monkeypatch.setattr(settings, "GRAPH_PUBLISH_INTERVAL_SECONDS", 0)
+    service.add_entities([Entity(name="Suy Thận", type="DISEASE", relevance_score=7)], 1, 3, "doc")
+    assert service.maybe_publish() is not None
+
+
+def _baseline_normalize(text: str) -> str:
+    """The pre-word-boundary normalizer's substring synonym replacement ("tha" -> "tăng huyết áp" inside "thai")"""
+    return " ".join(text.lower().split()).replace("tha", "tăng huyết áp").title()
+
+
+@pytest.mark.parametrize("store", ["networkx", "compact", "sqlite"])
+def test_nodes_named_by_the_old_normalizer_stay_reachable(make_graph_service, monkeypatch, store) -> None:
+    from backend.app.services import graph_service as graph_service_module
+
+    with monkeypatch.context() as legacy:
+        legacy.setattr(graph_service_module, "normalize_many", lambda texts: [_baseline_normalize(t) for t in texts])
+        service = make_graph_service(store)
+        _ingest(service, [([("Thai kỳ", "CONDITION", 8), ("Sắt", "DRUG", 7)], [("Sắt", "Thai kỳ", "TREATS", 6)])])
+    assert service.graph.has_node("Tăng Huyết Ápi Kỳ")
+
+    restarted = make_graph_service(store)
+    # The question is normalized the current way ("Thai Kỳ") and still finds the legacy node
+    assert restarted.gazetteer.match("Bổ sung sắt khi thai kỳ?") == ["Sắt", "Tăng Huyết Ápi Kỳ"]
+
+    # New mentions merge into the legacy node instead of creating "Thai Kỳ"
+    _ingest(restarted, [([("thai kỳ", "CONDITION", 9)], [("Axit Folic", "thai kỳ", "PREVENTS", 8)])], offset=1)
+    graph = restarted.snapshot().graph
+    assert not graph.has_node("Thai Kỳ")
+    assert list(graph.nodes["Tăng Huyết Ápi Kỳ"]["chunks"]) == [0, 1]
+    assert set(graph.predecessors("Tăng Huyết Ápi Kỳ")) == {"Sắt", "Axit Folic"}
+    assert restarted.provenance.rank_chunks(["Tăng Huyết Ápi Kỳ"]) == [("doc:0", 1), ("doc:1", 1)]
+
+    # Names the current normalizer produces are not aliased
+    assert make_graph_service(store)._aliases == {"Thai Kỳ": "Tăng Huyết Ápi Kỳ"}
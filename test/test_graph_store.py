@@ -0,0 +1,43 @@
+import sqlite3
+import weakref
+
+import pytest
+
+from backend.app.services.graph_store import SQLiteGraph
+
+
+def test_sqlite_snapshot_is_pinned_and_closed_when_dropped(tmp_path) -> None:
+    graph = SQLiteGraph(str(tmp_path / "graph.sqlite3"))
+    graph.add_node("A", type="DISEASE")
+    graph.commit()
+    snap = graph.snapshot()
+    graph.add_node("B", type="DRUG")
+    graph.commit()
+    assert list(snap.nodes()) == ["A"]
+    assert list(graph.snapshot().nodes()) == ["A", "B"]
+
+    conn, ref = snap._conn, weakref.ref(snap)
+    del snap
+    assert ref() is None
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+
+
+def test_superseded_sqlite_versions_release_their_connection(make_graph_service) -> None:
+    from backend.app.models.schemas import Entity
+
+    service = make_graph_service("sqlite")
+    conns = []
+    for i, name in enumerate(["Tăng Huyết Áp", "Amlodipin", "Metformin"]):
+        service.add_entities([Entity(name=name, type="DISEASE", relevance_score=8)], 0, i, "doc")
+        service.save_checkpoint(i, 3, "doc")
+        conns.append(service.publish().graph._conn)
+
+    pinned = service.snapshot()
+    for conn in conns[:-1]:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    assert pinned.graph.number_of_nodes() == 3
+    # Only the pinned (latest) version reads the WAL, so every frame can be checkpointed
+    _, logged, checkpointed = service.graph._conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchone()
+    assert logged == checkpointed
@@ -0,0 +1,189 @@
+import asyncio
+import sys
+import threading
+from types import SimpleNamespace
+
+from backend.app.models.schemas import Entity
+from backend.app.services.ingest_queue import (
+    COMPLETED, FAILED, QUEUED, RUNNING, IngestionQueue, IngestJobStore, extract_in_order, file_fingerprint,
+)
+
+
+def _run(indices, outcomes, concurrency=3, retries=1):
+    """`outcomes[i]` lists per-attempt results for chunk i; exceptions are raised."""
+    attempts = {i: 0 for i in indices}
+    committed = []
+
+    async def extract(i):
+        await asyncio.sleep(0.001 * (len(indices) - i))  # later chunks finish first
+        outcome = outcomes[i][min(attempts[i], len(outcomes[i]) - 1)]
+        attempts[i] += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def commit(i, result, error):
+        committed.append((i, result, type(error).__name__ if error else None))
+
+    failed = asyncio.run(extract_in_order(indices, extract, commit, concurrency, retries))
+    return failed, committed, attempts
+
+
+def test_commits_in_order_and_retries_failed_extractions() -> None:
+    outcomes = {0: ["a"], 1: [ValueError("429"), "b"], 2: ["c"], 3: ["d"]}
+    failed, committed, attempts = _run([0, 1, 2, 3], outcomes)
+    assert failed == []
+    assert committed == [(0, "a", None), (1, "b", None), (2, "c", None), (3, "d", None)]
+    assert attempts[1] == 2
+
+
+def test_exhausted_retries_are_reported_not_committed_as_done() -> None:
+    outcomes = {0: ["a"], 1: [ValueError("bad json")], 2: ["c"]}
+    failed, committed, attempts = _run([0, 1, 2], outcomes, retries=2)
+    assert failed == [1]
+    assert committed == [(0, "a", None), (1, None, "ValueError"), (2, "c", None)]
+    assert attempts[1] == 3
+
+
+def test_async_commit_runs_off_the_event_loop_in_order() -> None:
+    committed, ticks = [], []
+
+    async def extract(i):
+        return i
+
+    async def commit(i, result, error):
+        await asyncio.to_thread(committed.append, result)
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(len(committed))
+            await asyncio.sleep(0)
+
+    async def main():
+        return await asyncio.gather(extract_in_order(range(20), extract, commit, concurrency=4), ticker())
+
+    failed, _ = asyncio.run(main())
+    assert failed == [] and committed == list(range(20))
+    # The loop kept serving other tasks while commits ran on worker threads
+    assert ticks[-1] < 20
+
+
+def _ingest(service, source, total, outcomes):
+    """The commit path of RAGService.ingest_document over `service.pending_chunks`."""
+    failed = set(service.failed_chunks(source))
+    attempts = []
+
+    async def extract(i):
+        attempts.append(i)
+        outcome = outcomes[i]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def commit(i, result, error):
+        if error is None:
+            service.add_entities([Entity(name=result, type="DISEASE")], 0, i, source)
+            failed.discard(i)
+        else:
+            failed.add(i)
+        service.save_checkpoint(i, total, source, sorted(failed))
+
+    asyncio.run(extract_in_order(service.pending_chunks(source, total), extract, commit, concurrency=2))
+    service.save_checkpoint(total, total, source, sorted(failed))
+    return attempts
+
+
+def test_resume_retries_the_failed_chunk(make_graph_service) -> None:
+    service = make_graph_service()
+    names = ["Tăng Huyết Áp", "Đái Tháo Đường", "Suy Tim"]
+    attempts = _ingest(service, "doc", 3, {0: names[0], 1: ValueError("bad json"), 2: names[2]})
+    assert attempts == [0, 1, 2]
+    assert service.graph.number_of_nodes() == 2
+    assert service.failed_chunks("doc") == [1]
+
+    restarted = make_graph_service()
+    assert restarted.pending_chunks("doc", 3) == [1]
+    attempts = _ingest(restarted, "doc", 3, {1: names[1]})
+    assert attempts == [1]
+    assert restarted.graph.number_of_nodes() == 3
+    assert restarted.pending_chunks("doc", 3) == []
+    assert make_graph_service().failed_chunks("doc") == []
+
+
+def _write(path, content: bytes) -> str:
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_job_store_status_transitions(tmp_path) -> None:
+    store = IngestJobStore(str(tmp_path / "jobs.sqlite3"))
+    first = store.create(_write(tmp_path / "a.pdf", b"a"), "fp-a")
+    second = store.create(_write(tmp_path / "b.pdf", b"b"), "fp-b")
+    assert first["status"] == QUEUED and first["last_committed_chunk"] == -1
+
+    claimed = store.claim_next()
+    assert claimed["id"] == first["id"] and claimed["status"] == RUNNING and claimed["started_at"]
+    store.update(claimed["id"], processed_chunks=3, last_committed_chunk=2, unknown_field="ignored")
+    assert store.get(first["id"])["processed_chunks"] == 3
+
+    # A restart re-queues the job that was running; it is claimed again before newer jobs
+    assert store.requeue_interrupted() == 1
+    assert store.get(first["id"])["status"] == QUEUED
+    assert store.claim_next()["id"] == first["id"]
+    assert store.claim_next()["id"] == second["id"]
+    assert store.claim_next() is None
+    assert store.find_by_fingerprint("fp-b")["id"] == second["id"]
+
+
+def test_submit_deduplicates_by_content_fingerprint(tmp_path) -> None:
+    queue = IngestionQueue(IngestJobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+    job = asyncio.run(queue.submit(_write(tmp_path / "guide.pdf", b"same content")))
+    again = asyncio.run(queue.submit(_write(tmp_path / "guide-copy.pdf", b"same content")))
+    assert again["id"] == job["id"]
+    assert queue.store.list() == [queue.store.get(job["id"])]
+
+    queue.store.update(job["id"], status=FAILED, error="boom")
+    retried = asyncio.run(queue.submit(_write(tmp_path / "guide-copy.pdf", b"same content")))
+    assert retried["id"] == job["id"] and retried["status"] == QUEUED and retried["error"] is None
+
+
+def test_submit_hashes_off_the_event_loop(tmp_path, monkeypatch) -> None:
+    from backend.app.services import ingest_queue as ingest_queue_module
+    hashed_on = []
+
+    def fingerprint(file_path):
+        hashed_on.append(threading.get_ident())
+        return file_fingerprint(file_path)
+
+    monkeypatch.setattr(ingest_queue_module, "file_fingerprint", fingerprint)
+    queue = IngestionQueue(IngestJobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+
+    async def submit():
+        return threading.get_ident(), await queue.submit(_write(tmp_path / "large.pdf", b"x" * (3 << 20)))
+
+    loop_thread, job = asyncio.run(submit())
+    assert hashed_on and hashed_on[0] != loop_thread
+    assert job["fingerprint"] == file_fingerprint(str(tmp_path / "large.pdf"))
+
+
+def test_run_marks_completed_or_failed(tmp_path, monkeypatch) -> None:
+    calls = []
+
+    async def ingest_document(file_path, source_id, add_vectors, progress):
+        calls.append((source_id, add_vectors))
+        progress({"total_chunks": 2, "processed_chunks": 2, "last_committed_chunk": 1, "chunks_per_minute": 1.0})
+        if file_path.endswith("bad.pdf"):
+            raise RuntimeError("Extraction failed for 1 chunk(s)")
+
+    monkeypatch.setitem(sys.modules, "backend.app.services.rag_service",
+                        SimpleNamespace(rag_service=SimpleNamespace(ingest_document=ingest_document)))
+    queue = IngestionQueue(IngestJobStore(str(tmp_path / "jobs.sqlite3")), workers=1)
+    good = asyncio.run(queue.submit(_write(tmp_path / "good.pdf", b"good")))
+    bad = asyncio.run(queue.submit(_write(tmp_path / "bad.pdf", b"bad")))
+
+    asyncio.run(queue._run(queue.store.claim_next()))
+    asyncio.run(queue._run(queue.store.claim_next()))
+    good, bad = queue.store.get(good["id"]), queue.store.get(bad["id"])
+    assert good["status"] == COMPLETED and good["vectors_added"] == 1 and good["last_committed_chunk"] == 1
+    assert bad["status"] == FAILED and "Extraction failed" in bad["error"] and bad["finished_at"]
+    assert calls == [(good["fingerprint"], True), (bad["fingerprint"], True)]
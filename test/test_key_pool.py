@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services.key_pool import APIKeyPool, TokenBucket, _parse_reset
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float):
+        self.now += seconds
+
+
+def _pool(clock, keys=("k1", "k2"), **kwargs) -> APIKeyPool:
+    return APIKeyPool(list(keys), requests_per_minute=60, tokens_per_minute=6000, clock=clock,
+                      sleep=clock.sleep, async_sleep=clock.async_sleep, **kwargs)
+
+
+def test_token_bucket_refills_continuously() -> None:
+    bucket = TokenBucket(60, period=60.0, now=0.0)
+    bucket.consume(60, now=0.0)
+    assert bucket.wait_time(30, now=0.0) == pytest.approx(30.0)
+    assert bucket.wait_time(30, now=30.0) == 0.0
+    assert bucket.wait_time(500, now=30.0) == pytest.approx(30.0)  # oversized: waits for a full bucket
+
+
+def test_parse_reset_formats() -> None:
+    assert _parse_reset("12") == 12.0
+    assert _parse_reset("7.66s") == pytest.approx(7.66)
+    assert _parse_reset("2m59.56s") == pytest.approx(179.56)
+    assert _parse_reset("250ms") == pytest.approx(0.25)
+    assert _parse_reset(None) is None
+
+
+def test_acquire_spreads_calls_and_waits_for_budget() -> None:
+    clock = FakeClock()
+    pool = _pool(clock, max_in_flight_per_key=1)
+    first, second = pool.acquire(100), pool.acquire(100)
+    assert {first.api_key, second.api_key} == {"k1", "k2"}
+
+    pool.release(first, 100, used_tokens=40)
+    assert first.tokens.tokens == pytest.approx(6000 - 40)
+    assert pool.acquire(100) is first
+    assert clock.now == 1000.0
+
+
+def test_rate_limit_headers_update_both_buckets_and_cooldown() -> None:
+    clock = FakeClock()
+    pool = _pool(clock, keys=("k1",))
+    key = pool.acquire(100)
+    error = Exception("429 Too Many Requests")
+    error.response = SimpleNamespace(headers={
+        "retry-after": "2",
+        "x-ratelimit-limit-requests": "14400",
+        "x-ratelimit-remaining-requests": "14370",
+        "x-ratelimit-reset-requests": "2m59.56s",
+        "x-ratelimit-limit-tokens": "6000",
+        "x-ratelimit-remaining-tokens": "0",
+        "x-ratelimit-reset-tokens": "7.66s",
+    })
+    assert pool.report_rate_limit(key, error) == 2.0
+    assert key.requests.capacity == 14400 and key.requests.tokens == 14370
+    assert key.requests.period == pytest.approx(179.56 * 14400 / 30)  # a daily limit refills at its own rate
+    assert key.tokens.capacity == 6000 and key.tokens.tokens == 0
+    assert key.tokens.period == pytest.approx(7.66)
+    assert pool.status()[0]["cooldown_seconds"] == 2.0
+
+    # Waits out the cooldown, then the token bucket refill
+    assert pool.acquire(100) is key
+    assert clock.now - 1000.0 == pytest.approx(2.0, abs=0.2)
+
+
+def test_headers_of_successful_responses_are_learned() -> None:
+    pool = _pool(FakeClock(), keys=("k1",))
+    key = pool.keys[0]
+    pool.observe_headers(key, {"x-ratelimit-limit-requests": "1000", "x-ratelimit-remaining-requests": "999",
+                               "x-ratelimit-limit-tokens": "20000", "x-ratelimit-remaining-tokens": "19000"})
+    assert (key.requests.capacity, key.requests.tokens) == (1000, 999)
+    assert (key.tokens.capacity, key.tokens.tokens) == (20000, 19000)
+
+
+def test_acquire_gives_up_at_the_deadline() -> None:
+    clock = FakeClock()
+    pool = _pool(clock, keys=("k1",), acquire_timeout=10.0)
+    key = pool.acquire(100)
+    error = Exception("429")
+    error.response = SimpleNamespace(headers={"retry-after": "30"})
+    pool.report_rate_limit(key, error)
+
+    with pytest.raises(TimeoutError):
+        pool.acquire(100, pool.deadline())
+    assert pool.acquire(100, clock.now + 60.0) is key
+
+
+def test_aacquire_waits_with_async_sleep() -> None:
+    clock = FakeClock()
+    pool = _pool(clock, keys=("k1",), max_in_flight_per_key=1)
+    key = pool.acquire(100)
+    error = Exception("429")
+    error.response = SimpleNamespace(headers={"retry-after": "3"})
+    pool.report_rate_limit(key, error)
+
+    assert asyncio.run(pool.aacquire(100, pool.deadline())) is key
+    assert clock.now - 1000.0 == pytest.approx(3.0)
@@ -0,0 +1,43 @@
+import itertools
+
+from backend.app.services import llm_cache
+from backend.app.services.llm_cache import LLMResponseCache
+
+
+def test_key_depends_on_namespace_model_and_input_only() -> None:
+    key = LLMResponseCache.make_key("prompt v1", "llama", {"text": "Tăng huyết áp", "n": 1})
+    assert key == LLMResponseCache.make_key("prompt v1", "llama", {"n": 1, "text": "Tăng huyết áp"})
+    assert len({
+        key,
+        LLMResponseCache.make_key("prompt v2", "llama", {"text": "Tăng huyết áp", "n": 1}),
+        LLMResponseCache.make_key("prompt v1", "mixtral", {"text": "Tăng huyết áp", "n": 1}),
+        LLMResponseCache.make_key("prompt v1", "llama", {"text": "Đái tháo đường", "n": 1}),
+    }) == 4
+
+
+def test_lru_eviction_by_accessed_at_and_stats(tmp_path, monkeypatch) -> None:
+    clock = itertools.count(1.0)
+    monkeypatch.setattr(llm_cache.time, "time", lambda: next(clock))
+    value = {"entities": ["x" * 100]}
+    size = len(llm_cache.pickle.dumps(value))
+    cache = LLMResponseCache(str(tmp_path / "llm.sqlite3"), max_bytes=2 * size)
+
+    cache.put("a", value)
+    cache.put("b", value)
+    assert cache.get("a") == (True, value)  # "a" is now the most recently used
+    cache.put("c", value)  # over budget: evicts "b"
+
+    assert cache.get("b") == (False, None)
+    assert cache.get("a")[0] and cache.get("c")[0]
+    assert cache.stats() == {"hits": 3, "misses": 1, "hit_rate": 0.75, "entries": 2, "bytes": 2 * size}
+
+
+def test_survives_reopen_with_size_accounting(tmp_path) -> None:
+    path = str(tmp_path / "llm.sqlite3")
+    cache = LLMResponseCache(path, max_bytes=1 << 20)
+    cache.put("k", [1, 2, 3])
+    cache.put("k", [1, 2, 3, 4])  # replace keeps one entry's size
+
+    reopened = LLMResponseCache(path, max_bytes=1 << 20)
+    assert reopened.get("k") == (True, [1, 2, 3, 4])
+    assert reopened.stats()["bytes"] == len(llm_cache.pickle.dumps([1, 2, 3, 4]))
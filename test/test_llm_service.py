@@ -0,0 +1,180 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.app.services.key_pool import APIKeyPool
+from backend.app.services.llm_cache import LLMResponseCache
+from backend.app.services.llm_service import LLMService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+    async def async_sleep(self, seconds: float):
+        self.now += seconds
+
+
+class StubChain:
+    """Runnable stand-in: plays one scripted outcome per call (an exception to raise or a result)"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.keys = []
+
+    def bind(self, llm):
+        self.keys.append(llm)
+        return self
+
+    def _next(self):
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def ainvoke(self, input_data):
+        return self._next()
+
+
+@pytest.fixture
+def service(monkeypatch):
+    """LLMService over stub keys: the "LLM" handed to a chain factory is the key's api_key"""
+    clock = FakeClock()
+    service = LLMService.__new__(LLMService)
+    service.key_pool = APIKeyPool(["k1", "k2"], requests_per_minute=60, tokens_per_minute=60000,
+                                  base_cooldown=1.0, clock=clock, sleep=clock.sleep, async_sleep=clock.async_sleep)
+    service.cache = None
+    monkeypatch.setattr(service, "_init_llm", lambda key: key.api_key)
+    return service
+
+
+def test_rate_limits_are_retried_on_other_keys_up_to_max_retries(service) -> None:
+    chain = StubChain([Exception("429 Too Many Requests"), "answer"])
+    assert asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"})) == "answer"
+    assert len(set(chain.keys)) == 2
+
+    chain = StubChain([Exception("429 Too Many Requests")] * 5)
+    with pytest.raises(Exception, match="Max retries exceeded.*429") as raised:
+        asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"}, max_retries=3))
+    assert len(chain.keys) == 3
+    assert "429" in str(raised.value.__cause__)
+
+
+def test_default_retry_bound_comes_from_settings(service, monkeypatch) -> None:
+    from backend.app.core.config import settings
+    monkeypatch.setattr(settings, "GROQ_MAX_RETRIES", 2)
+    chain = StubChain([Exception("rate limit reached")] * 5)
+
+    with pytest.raises(Exception, match="Max retries exceeded"):
+        asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"}))
+    assert len(chain.keys) == 2
+    assert all(key.in_flight == 0 for key in service.key_pool.keys)
+
+
+def _rate_limited(retry_after: str) -> Exception:
+    error = Exception("429 Too Many Requests")
+    error.response = SimpleNamespace(headers={"retry-after": retry_after})
+    return error
+
+
+def test_async_calls_wait_out_cooldowns_with_async_sleep(service, monkeypatch) -> None:
+    clock = service.key_pool.clock
+    released = []
+    release = service.key_pool.release
+    monkeypatch.setattr(service.key_pool, "release",
+                        lambda key, est, used=None: released.append(used) or release(key, est, used))
+    answer = SimpleNamespace(content="answer", usage_metadata={"total_tokens": 100})
+    chain = StubChain([_rate_limited("4"), _rate_limited("2"), answer])
+
+    assert asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"})) is answer
+
+    # Both keys were put in cooldown; the third attempt waited (on the fake clock) for the shorter one
+    assert chain.keys[:2] in (["k1", "k2"], ["k2", "k1"]) and chain.keys[2] == chain.keys[1]
+    assert clock.now - 1000.0 == pytest.approx(2.0, abs=0.2)
+    assert [key.rate_limited for key in service.key_pool.keys] == [1, 1]
+    retried = service.key_pool.keys[0] if chain.keys[2] == "k1" else service.key_pool.keys[1]
+    assert retried.in_flight == 0 and retried.consecutive_failures == 0
+    # The token estimate is settled with the reported usage
+    assert released == [100]
+
+
+def test_cached_results_skip_the_key_pool(service, tmp_path) -> None:
+    service.cache = LLMResponseCache(str(tmp_path / "llm_cache.sqlite3"), max_bytes=1 << 20)
+    chain = StubChain([{"entities": ["Metformin"]}, {"entities": ["other"]}])
+
+    first = asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"}, cache_namespace="prompt v1"))
+    again = asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"}, cache_namespace="prompt v1"))
+
+    assert first == again == {"entities": ["Metformin"]}
+    assert len(chain.keys) == 1 and service.cache.hits == 1
+    # Another prompt (namespace) is a different entry
+    assert asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"}, cache_namespace="prompt v2")) == {"entities": ["other"]}
+
+
+def test_non_rate_limit_errors_release_the_key_and_are_raised(service) -> None:
+    chain = StubChain([ValueError("invalid_api_key")])
+
+    with pytest.raises(ValueError):
+        asyncio.run(service.aexecute_chain(chain.bind, {"text": "x"}))
+    assert len(chain.keys) == 1
+    assert sum(key.disabled for key in service.key_pool.keys) == 1
+    assert all(key.in_flight == 0 for key in service.key_pool.keys)
+
+
+class StubStream:
+    """Streaming runnable stand-in: one scripted list of chunks per call; an exception item is raised there"""
+
+    def __init__(self, attempts):
+        self.attempts = list(attempts)
+        self.keys = []
+
+    def bind(self, llm):
+        self.keys.append(llm)
+        return self
+
+    async def astream(self, input_data):
+        for chunk in self.attempts.pop(0):
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+def _collect(service, chain):
+    async def collect():
+        return [token async for token in service.astream_chain(chain.bind, {"question": "q"})]
+    return asyncio.run(collect())
+
+
+def test_stream_rotates_keys_mid_stream_without_repeating_output(service) -> None:
+    # The retry regenerates the same text with different chunk boundaries
+    chain = StubStream([
+        ["Met", "formin lo", Exception("429 Too Many Requests")],
+        ["Metformin", " lowers", "", " glucose."],
+    ])
+
+    tokens = _collect(service, chain)
+
+    assert "".join(tokens) == "Metformin lowers glucose."
+    assert tokens == ["Met", "formin lo", "wers", " glucose."]
+    assert len(set(chain.keys)) == 2
+    assert all(key.in_flight == 0 for key in service.key_pool.keys)
+
+
+def test_stream_surfaces_other_errors_after_partial_output(service) -> None:
+    chain = StubStream([["Partial", ValueError("bad request")]])
+
+    async def collect(tokens):
+        async for token in service.astream_chain(chain.bind, {"question": "q"}):
+            tokens.append(token)
+
+    tokens = []
+    with pytest.raises(ValueError):
+        asyncio.run(collect(tokens))
+    assert tokens == ["Partial"] and len(chain.keys) == 1
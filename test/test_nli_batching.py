@@ -0,0 +1,34 @@
+import random
+
+from backend.app.services.nli_batching import plan_micro_batches
+
+
+def test_batches_respect_token_budget_and_size() -> None:
+    rng = random.Random(0)
+    lengths = [rng.randint(5, 200) for _ in range(300)]
+    batches = plan_micro_batches(lengths, token_budget=1024, max_batch_size=16)
+    for batch in batches:
+        assert len(batch) <= 16
+        assert len(batch) * max(lengths[i] for i in batch) <= 1024
+    # Length-sorted: each batch starts no shorter than the previous one ended
+    for previous, batch in zip(batches, batches[1:]):
+        assert lengths[batch[0]] >= lengths[previous[-1]]
+
+
+def test_every_pair_is_planned_exactly_once_and_scatters_back_in_order() -> None:
+    lengths = [30, 7, 512, 7, 120, 64, 9, 300]
+    batches = plan_micro_batches(lengths, token_budget=256, max_batch_size=3)
+    planned = [i for batch in batches for i in batch]
+    assert sorted(planned) == list(range(len(lengths)))
+
+    # Scoring per batch and scattering by index restores the input order
+    scores = [None] * len(lengths)
+    for batch in batches:
+        for i in batch:
+            scores[i] = f"score of pair {i}"
+    assert scores == [f"score of pair {i}" for i in range(len(lengths))]
+
+
+def test_oversized_pair_gets_its_own_batch() -> None:
+    assert plan_micro_batches([10, 1000, 20], token_budget=100, max_batch_size=8) == [[0, 2], [1]]
+    assert plan_micro_batches([], token_budget=100, max_batch_size=8) == []
@@ -0,0 +1,32 @@
+from backend.app.services.nli_cache import NLIScoreCache
+
+
+def test_memory_lru_and_counters() -> None:
+    cache = NLIScoreCache("roberta-large-mnli", max_entries=2)
+    keys = cache.keys([("p1", "h1"), ("p2", "h1"), ("p1", "h1")])
+    assert keys[0] == keys[2] and keys[0] != keys[1]
+    assert cache.get_many(keys) == [None, None, None]
+
+    cache.put_many(keys[:2], [0.9, 0.1])
+    assert cache.get_many(keys) == [0.9, 0.1, 0.9]
+    cache.put_many(cache.keys([("p3", "h1")]), [0.5])  # evicts the least recently used ("p2", "h1")
+    assert cache.get_many(keys[:2]) == [0.9, None]
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (4, 4, 2)
+
+
+def test_disk_tier_survives_restart_and_is_dropped_on_model_change(tmp_path) -> None:
+    path = str(tmp_path / "nli.sqlite3")
+    cache = NLIScoreCache("model-a", max_entries=10, db_path=path)
+    keys = cache.keys([("premise", "hypothesis")])
+    cache.put_many(keys, [0.75])
+
+    restarted = NLIScoreCache("model-a", max_entries=10, db_path=path)
+    assert restarted.get_many(keys) == [0.75]
+    assert restarted.stats()["disk_hits"] == 1
+    assert restarted.get_many(keys) == [0.75]
+    assert restarted.stats()["hits"] == 1  # promoted to memory
+
+    other = NLIScoreCache("model-b", max_entries=10, db_path=path)
+    assert other.get_many(other.keys([("premise", "hypothesis")])) == [None]
+    assert NLIScoreCache("model-a", max_entries=10, db_path=path).get_many(keys) == [None]
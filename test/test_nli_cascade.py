@@ -0,0 +1,93 @@
+import importlib
+import sys
+import types
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+PASSAGES = ["Metformin is the first-line treatment for type 2 diabetes.", "Amlodipine lowers blood pressure."]
+
+
+class StubScorer:
+    """NLIScorer stand-in: fixed entailment probability per (premise, hypothesis) pair"""
+
+    def __init__(self, model_name: str = "stub", scores=None, **kwargs):
+        self.model_name = model_name
+        self.device = torch.device("cpu")
+        self.scores = scores or {}
+        self.scored = []
+
+    def score_pairs(self, pairs):
+        self.scored.extend(pairs)
+        return torch.tensor([self.scores.get(pair, 0.0) for pair in pairs], dtype=torch.float32)
+
+
+@pytest.fixture
+def critic():
+    """A SelfReflectiveCritic whose module-level singleton was built with stub scorers (no model download)"""
+    name = "backend.app.services.verification_service"
+    stub_module = types.ModuleType("backend.app.services.nli_scorer")
+    stub_module.NLIScorer = StubScorer
+    saved = {key: sys.modules.pop(key, None) for key in (name, stub_module.__name__)}
+    sys.modules[stub_module.__name__] = stub_module
+    try:
+        critic = importlib.import_module(name).SelfReflectiveCritic()
+        critic.tau, critic.cascade_band, critic.prefilter = 0.5, 0.2, "none"
+        yield critic
+    finally:
+        for key, module in saved.items():
+            sys.modules.pop(key, None)
+            if module is not None:
+                sys.modules[key] = module
+
+
+def _scores(per_statement):
+    """(premise, hypothesis) -> score, with each statement's score on the first passage"""
+    return {(PASSAGES[0], statement): score for statement, score in per_statement.items()}
+
+
+def test_only_statements_near_tau_escalate_to_tier_2(critic) -> None:
+    fast = {"clearly supported": 0.9, "clearly unsupported": 0.1, "near tau, refuted": 0.6, "near tau, entailed": 0.45}
+    full = {"near tau, refuted": 0.2, "near tau, entailed": 0.8}
+    critic.fast_scorer = StubScorer("fast", _scores(fast))
+    critic.scorer = StubScorer("full", _scores(full))
+
+    results = critic._verify_statements(list(fast), PASSAGES)
+
+    by_statement = {r.statement: r for r in results}
+    assert [r.statement for r in results] == list(fast)
+    assert {s: r.tier for s, r in by_statement.items()} == {
+        "clearly supported": 1, "clearly unsupported": 1, "near tau, refuted": 2, "near tau, entailed": 2,
+    }
+    # Tier-1 decisions keep the tier-1 score; escalated ones take the full model's
+    assert {s: r.confidence_score for s, r in by_statement.items()} == pytest.approx({
+        "clearly supported": 0.9, "clearly unsupported": 0.1, "near tau, refuted": 0.2, "near tau, entailed": 0.8,
+    })
+    assert by_statement["near tau, refuted"].label == "Unsupported"
+    assert by_statement["near tau, entailed"].label == "Supported"
+    # The full model only sees the escalated statements' pairs (all their candidates)
+    assert {hypothesis for _, hypothesis in critic.scorer.scored} == {"near tau, refuted", "near tau, entailed"}
+    assert len(critic.scorer.scored) == 2 * len(PASSAGES)
+
+
+def test_nothing_escalates_outside_the_band(critic) -> None:
+    fast = {"supported": 0.71, "unsupported": 0.29}
+    critic.fast_scorer = StubScorer("fast", _scores(fast))
+    critic.scorer = StubScorer("full")
+
+    results = critic._verify_statements(list(fast), PASSAGES)
+
+    assert [r.tier for r in results] == [1, 1]
+    assert [r.label for r in results] == ["Supported", "Unsupported"]
+    assert critic.scorer.scored == []
+
+
+def test_without_cascade_the_full_model_decides_everything(critic) -> None:
+    critic.fast_scorer = None
+    critic.scorer = StubScorer("full", _scores({"statement": 0.55}))
+
+    [result] = critic._verify_statements(["statement"], PASSAGES)
+
+    assert result.tier is None and result.label == "Supported"
+    assert result.confidence_score == pytest.approx(0.55)
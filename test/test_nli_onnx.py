@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("onnxruntime")
+
+from backend.app.services.nli_onnx import OnnxNLIRunner
+from backend.app.services.nli_scorer import entailment_index
+
+# Label order of the tiny model, as in a HF config (the entailment logit is not the last one)
+LABEL2ID = {"ENTAILMENT": 0, "NEUTRAL": 1, "CONTRADICTION": 2}
+
+
+class TinyNLI(torch.nn.Module):
+    """Sequence-classification stand-in: masked mean of token embeddings -> 3 logits"""
+
+    def __init__(self):
+        super().__init__()
+        torch.manual_seed(0)
+        self.embed = torch.nn.Embedding(100, 16)
+        self.head = torch.nn.Linear(16, len(LABEL2ID))
+        self.config = SimpleNamespace(label2id=LABEL2ID)
+
+    def forward(self, input_ids, attention_mask):
+        mask = attention_mask.unsqueeze(-1).float()
+        pooled = (self.embed(input_ids) * mask).sum(1) / mask.sum(1).clamp(min=1.0)
+        return SimpleNamespace(logits=self.head(pooled))
+
+
+class TinyTokenizer:
+    model_input_names = ["input_ids", "attention_mask"]
+
+    def __call__(self, premises, hypotheses, return_tensors="pt", padding=True):
+        if isinstance(premises, str):
+            premises, hypotheses = [premises], [hypotheses]
+        rows = [[1 + sum(map(ord, word)) % 98 for word in f"{p} {h}".split()] for p, h in zip(premises, hypotheses)]
+        width = max(len(row) for row in rows)
+        return {
+            "input_ids": torch.tensor([row + [0] * (width - len(row)) for row in rows]),
+            "attention_mask": torch.tensor([[1] * len(row) + [0] * (width - len(row)) for row in rows]),
+        }
+
+
+PAIRS = [("Metformin is first-line for diabetes.", "Metformin treats diabetes."),
+         ("Amlodipine lowers blood pressure.", "Amlodipine causes hypertension in most patients.")]
+
+
+def _features():
+    return TinyTokenizer()([p for p, _ in PAIRS], [h for _, h in PAIRS])
+
+
+def test_onnx_logits_match_torch_with_the_same_label_order(tmp_path) -> None:
+    model = TinyNLI().eval()
+    runner = OnnxNLIRunner(lambda: model, TinyTokenizer(), str(tmp_path))
+
+    features = _features()
+    onnx_logits = runner(features)
+    with torch.no_grad():
+        torch_logits = model(**features).logits
+
+    assert onnx_logits.shape == torch_logits.shape
+    assert torch.allclose(onnx_logits, torch_logits, atol=1e-5)
+    # The scorer reads the entailment column by label2id; it is the same column on both backends
+    index = entailment_index(model.config)
+    assert index == 0
+    assert torch.allclose(onnx_logits.softmax(-1)[:, index], torch_logits.softmax(-1)[:, index], atol=1e-5)
+
+
+def test_export_is_cached_and_int8_stays_close_to_torch(tmp_path) -> None:
+    pytest.importorskip("onnxruntime.quantization")
+    model = TinyNLI().eval()
+    OnnxNLIRunner(lambda: model, TinyTokenizer(), str(tmp_path))
+
+    def no_reload():
+        raise AssertionError("cached export should be reused")
+
+    quantized = OnnxNLIRunner(no_reload, TinyTokenizer(), str(tmp_path), quantize=True, threads=1)
+
+    assert quantized.path.endswith("model.int8.onnx")
+    features = _features()
+    with torch.no_grad():
+        torch_logits = model(**features).logits
+    assert torch.allclose(quantized(features), torch_logits, atol=0.05)
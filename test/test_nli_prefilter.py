@@ -0,0 +1,39 @@
+import numpy as np
+
+from backend.app.services.nli_prefilter import bm25_scores, embedding_scores, select_passages
+
+PASSAGES = [
+    "Metformin is the first-line treatment for type 2 diabetes.",
+    "Amlodipine lowers blood pressure.",
+    "Patients were followed for twelve months.",
+    "ACE inhibitors are contraindicated in pregnancy.",
+]
+
+
+def test_bm25_ranks_lexically_overlapping_passage_first() -> None:
+    scores = bm25_scores(["Metformin treats type 2 diabetes", "ACE inhibitors in pregnancy"], PASSAGES)
+    assert scores.shape == (2, 4)
+    assert scores[0].argmax() == 0
+    assert scores[1].argmax() == 3
+    assert scores[0, 2] == 0.0
+
+
+def test_embedding_scores_use_one_batch() -> None:
+    calls = []
+
+    def embed(texts):
+        calls.append(texts)
+        return [[1.0, 0.0] if "Metformin" in t else [0.0, 1.0] for t in texts]
+
+    scores = embedding_scores(["Metformin dose"], PASSAGES, embed)
+    assert len(calls) == 1 and calls[0][0].startswith("query: ")
+    assert np.allclose(scores, [[1.0, 0.0, 0.0, 0.0]])
+
+
+def test_select_passages_top_m_with_margin() -> None:
+    scores = np.array([[0.0, 10.0, 9.5, 2.0, 8.0]])
+    assert select_passages(scores, top_m=1, margin=0.0) == [[1]]
+    assert select_passages(scores, top_m=1, margin=0.1) == [[1, 2]]
+    assert select_passages(scores, top_m=2, margin=0.2) == [[1, 2, 4]]
+    assert select_passages(scores, top_m=1, margin=1.0) == [[0, 1, 2, 3, 4]]
+    assert select_passages(scores, top_m=5, margin=0.0) == [[0, 1, 2, 3, 4]]
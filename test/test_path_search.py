@@ -0,0 +1,112 @@
+import random
+
+import pytest
+
+from backend.app.services.path_search import connecting_paths, multi_source_top_paths, top_k_paths
+
+
+def _random_graph(seed: int, n_nodes: int = 40, n_edges: int = 300):
+    rng = random.Random(seed)
+    adjacency = {n: [] for n in range(n_nodes)}
+    for _ in range(n_edges):
+        u, v = rng.randrange(n_nodes), rng.randrange(n_nodes)
+        adjacency[u].append((v, rng.choice(["TREATS", "CAUSES"]), rng.uniform(0.2, 1.0)))
+    return adjacency
+
+
+def _dfs_paths(adjacency, start, max_depth, threshold):
+    """Exhaustive enumeration as done by ReasoningService.explore_path."""
+    paths = []
+
+    def dfs(node, path, confidence, visited):
+        if path:
+            paths.append({"path": list(path), "confidence": confidence, "final_node": node})
+        if len(path) == max_depth:
+            return
+        for neighbor, relation, edge_confidence in adjacency[node]:
+            if edge_confidence < threshold or neighbor in visited:
+                continue
+            new_confidence = confidence * edge_confidence
+            if new_confidence >= threshold:
+                dfs(neighbor, path + [(node, neighbor, relation)], new_confidence, visited | {neighbor})
+
+    dfs(start, [], 1.0, {start})
+    return sorted(paths, key=lambda p: p["confidence"], reverse=True)
+
+
+def test_top_k_paths_matches_exhaustive_dfs() -> None:
+    for seed in range(5):
+        adjacency = _random_graph(seed)
+        for depth in (1, 2, 3):
+            for start in (0, 1, 2):
+                expected = _dfs_paths(adjacency, start, depth, 0.3)[:5]
+                found = top_k_paths(start, adjacency.__getitem__, k=5, max_depth=depth, confidence_threshold=0.3)
+                assert found == expected
+
+
+def test_top_k_paths_respects_expansion_budget() -> None:
+    adjacency = _random_graph(0)
+    calls = []
+
+    def neighbors(node):
+        calls.append(node)
+        return adjacency[node]
+
+    found = top_k_paths(0, neighbors, k=50, max_depth=4, confidence_threshold=0.1, max_expansions=3)
+    assert len(calls) <= 3
+    assert [p["confidence"] for p in found] == sorted((p["confidence"] for p in found), reverse=True)
+
+
+def test_multi_source_matches_independent_searches() -> None:
+    for seed in range(3):
+        adjacency = _random_graph(seed)
+        accessed = {}
+        found = multi_source_top_paths([0, 1, 2, 1], adjacency.__getitem__, k=5, max_depth=3,
+                                       confidence_threshold=0.3, max_expansions=20, accessed=accessed)
+        assert list(found) == [0, 1, 2]
+        for start in (0, 1, 2):
+            assert found[start] == top_k_paths(start, adjacency.__getitem__, k=5, max_depth=3,
+                                               confidence_threshold=0.3, max_expansions=20)
+            assert start in accessed[start]
+
+
+def test_connecting_paths_finds_all_paths_between_seeds() -> None:
+    for seed in range(3):
+        adjacency = _random_graph(seed, n_nodes=25, n_edges=120)
+        reverse = {n: [] for n in adjacency}
+        for u, edges in adjacency.items():
+            for v, relation, confidence in edges:
+                reverse[v].append((u, relation, confidence))
+        for depth in (1, 2, 3):
+            expected = [p for p in _dfs_paths(adjacency, 0, depth, 0.3) if p["final_node"] == 1]
+            found = connecting_paths(0, 1, adjacency.__getitem__, reverse.__getitem__, k=1000,
+                                     max_depth=depth, confidence_threshold=0.3, frontier_size=10_000)
+            assert {tuple(p["path"]): p["confidence"] for p in found} == pytest.approx(
+                {tuple(p["path"]): p["confidence"] for p in expected})
+            assert [p["confidence"] for p in found] == sorted((p["confidence"] for p in found), reverse=True)
+
+
+def test_accessed_includes_nodes_left_unexpanded() -> None:
+    adjacency = {
+        "A": [("B", "R", 0.9), ("C", "R", 0.8)],
+        "B": [("D", "R", 0.9)],
+        "C": [("E", "R", 0.9)],
+        "D": [], "E": [],
+    }
+    # Depth limit: B and C are reached but not expanded
+    accessed = {}
+    multi_source_top_paths(["A"], adjacency.__getitem__, k=5, max_depth=1, confidence_threshold=0.3, accessed=accessed)
+    assert accessed["A"] == {"A", "B", "C"}
+
+    # Expansion budget spent on A: its neighbours are popped unexpanded
+    accessed = {}
+    multi_source_top_paths(["A"], adjacency.__getitem__, k=5, max_depth=3, confidence_threshold=0.3,
+                           max_expansions=1, accessed=accessed)
+    assert accessed["A"] == {"A", "B", "C"}
+
+    # k filled by the path to B: B ends the search unexpanded
+    accessed = {}
+    found = multi_source_top_paths(["A"], adjacency.__getitem__, k=1, max_depth=3, confidence_threshold=0.3,
+                                   accessed=accessed)
+    assert [p["final_node"] for p in found["A"]] == ["B"]
+    assert accessed["A"] == {"A", "B"}
@@ -0,0 +1,91 @@
+import random
+from typing import Tuple
+
+import networkx as nx
+import pytest
+
+from backend.app.services.ppr_index import PPRIndex
+from backend.app.services.provenance_index import ProvenanceIndex
+
+
+def _graph(seed: int, n_nodes: int = 30, n_edges: int = 80) -> Tuple[nx.MultiDiGraph, ProvenanceIndex]:
+    """Random graph whose nodes come from chunks of two documents with overlapping chunk numbers"""
+    rng = random.Random(seed)
+    G = nx.MultiDiGraph()
+    provenance = ProvenanceIndex()
+    for i in range(n_nodes + 3):  # a few isolated (dangling) nodes
+        G.add_node(f"n{i}")
+        provenance.add(f"n{i}", rng.choice(["doc-a", "doc-b"]), rng.randrange(10))
+    for _ in range(n_edges):
+        G.add_edge(f"n{rng.randrange(n_nodes)}", f"n{rng.randrange(n_nodes)}", relation="TREATS",
+                   confidence=rng.randint(1, 10) / 10.0)
+    return G, provenance
+
+
+def _expected(G: nx.MultiDiGraph, seeds, damping: float):
+    undirected = nx.Graph()
+    undirected.add_nodes_from(G.nodes())
+    for u, v, data in G.edges(data=True):
+        if u != v:
+            weight = undirected.get_edge_data(u, v, {"weight": 0.0})["weight"]
+            undirected.add_edge(u, v, weight=weight + data["confidence"])
+    return nx.pagerank(undirected, alpha=damping, personalization=dict.fromkeys(seeds, 1.0), weight="weight", tol=1e-12)
+
+
+def test_rank_matches_networkx_pagerank() -> None:
+    G, provenance = _graph(0)
+    nodes, chunks = PPRIndex(G, provenance).rank({"n0": 1.0, "n1": 1.0}, damping=0.5, tol=1e-12, max_iter=1000)
+    expected = _expected(G, ["n0", "n1"], 0.5)
+    assert dict(nodes) == pytest.approx({n: p for n, p in expected.items() if p > 0}, abs=1e-9)
+    assert [score for _, score in nodes] == sorted((score for _, score in nodes), reverse=True)
+
+    chunk_scores = {}
+    for node, score in nodes:
+        for chunk in provenance.chunks_of(node):
+            chunk_scores[chunk] = chunk_scores.get(chunk, 0.0) + score
+    assert dict(chunks) == pytest.approx(chunk_scores)
+
+
+def test_derived_index_matches_full_rebuild() -> None:
+    G, provenance = _graph(1)
+    index = PPRIndex(G, provenance)
+    index.rank({"n0": 1.0})  # build matrices for this version
+
+    G2 = G.copy()
+    G2.add_edge("n2", "new", relation="CAUSES", confidence=0.9)
+    provenance.add("new", "doc-b", 42)
+    provenance.add("n2", "doc-b", 42)
+    G2.add_edge("n3", "n4", relation="CAUSES", confidence=0.7)
+    derived = index.derive(G2, touched=["n2", "new", "n3", "n4"]).derive(G2, touched=[])
+
+    seeds = {"n2": 1.0, "n5": 1.0}
+    nodes, chunks = derived.rank(seeds, tol=1e-12, max_iter=1000)
+    full_nodes, full_chunks = PPRIndex(G2, provenance).rank(seeds, tol=1e-12, max_iter=1000)
+    assert dict(nodes) == pytest.approx(dict(full_nodes))
+    assert dict(chunks) == pytest.approx(dict(full_chunks))
+    assert "doc-b:42" in dict(chunks)
+    # The older version does not see chunks added after it was created
+    assert "doc-b:42" not in dict(index.rank(seeds)[1])
+
+
+def test_chunks_with_the_same_number_in_different_documents_stay_apart() -> None:
+    G = nx.MultiDiGraph()
+    G.add_edge("Amlodipin", "Tăng Huyết Áp", relation="TREATS", confidence=0.9)
+    G.add_edge("Metformin", "Đái Tháo Đường", relation="TREATS", confidence=0.9)
+    provenance = ProvenanceIndex()
+    provenance.add("Amlodipin", "doc-a", 3)
+    provenance.add("Tăng Huyết Áp", "doc-a", 3)
+    provenance.add("Metformin", "doc-b", 3)
+    provenance.add("Đái Tháo Đường", "doc-b", 3)
+
+    _, chunks = PPRIndex(G, provenance).rank({"Amlodipin": 1.0})
+    assert [doc_id for doc_id, _ in chunks] == ["doc-a:3"]
+    assert dict(chunks)["doc-a:3"] == pytest.approx(1.0)
+
+
+def test_rank_limit_keeps_top_entries() -> None:
+    G, provenance = _graph(2)
+    nodes, chunks = PPRIndex(G, provenance).rank({"n0": 1.0})
+    top_nodes, top_chunks = PPRIndex(G, provenance).rank({"n0": 1.0}, limit=5)
+    assert top_nodes == nodes[:5]
+    assert top_chunks == chunks[:5]
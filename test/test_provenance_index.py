@@ -0,0 +1,36 @@
+from backend.app.services.provenance_index import ProvenanceIndex
+
+
+def _index(path=None) -> ProvenanceIndex:
+    index = ProvenanceIndex(path)
+    for chunk, entities in enumerate([["Tăng Huyết Áp", "Amlodipin"], ["Tăng Huyết Áp"], ["Amlodipin", "Phù"]]):
+        for entity in entities:
+            index.add(entity, "doc-a", chunk)
+    index.add("Tăng Huyết Áp", "doc-b", 0)
+    return index
+
+
+def test_rank_chunks_by_entity_coverage() -> None:
+    index = _index()
+    assert index.rank_chunks(["Tăng Huyết Áp", "Amlodipin"]) == [
+        ("doc-a:0", 2), ("doc-a:1", 1), ("doc-a:2", 1), ("doc-b:0", 1)
+    ]
+    assert index.rank_chunks(["Tăng Huyết Áp", "Amlodipin"], limit=1) == [("doc-a:0", 2)]
+    assert index.rank_chunks(["unknown"]) == []
+    assert index.has_chunk("Phù", "doc-a", 2)
+    assert not index.has_chunk("Phù", "doc-a", 0)
+
+
+def test_out_of_order_adds_and_persistence(tmp_path) -> None:
+    path = str(tmp_path / "provenance.sqlite3")
+    index = _index(path)
+    index.add("Phù", "doc-a", 0)  # older chunk seen again (re-ingestion)
+    index.add("Phù", "doc-a", 0)
+    assert index.chunks_of("Phù") == ["doc-a:0", "doc-a:2"]
+    index.commit()
+
+    reloaded = ProvenanceIndex(path)
+    assert reloaded.chunks_of("Phù") == ["doc-a:0", "doc-a:2"]
+    assert reloaded.rank_chunks(["Tăng Huyết Áp", "Amlodipin"]) == index.rank_chunks(["Tăng Huyết Áp", "Amlodipin"])
+    reloaded.add("Phù", "doc-c", 5)
+    assert reloaded.chunks_of("Phù")[-1] == "doc-c:5"
@@ -0,0 +1,67 @@
+from backend.app.services.reasoning_cache import ReasoningContextCache
+
+
+def test_invalidation_drops_only_entries_that_read_touched_nodes() -> None:
+    cache = ReasoningContextCache(max_entries=10)
+    cache.put(("A", 2), version=1, nodes={"A", "B"}, context="ctx A")
+    cache.put(("C", 2), version=1, nodes={"C"}, context="ctx C")
+
+    cache.invalidate(version=2, touched={"B"})
+
+    assert cache.get(("A", 2), version=2) is None
+    assert cache.get(("C", 2), version=2) == "ctx C"
+    # A reader pinned to an older version than the entry must recompute
+    cache.put(("D", 2), version=2, nodes={"D"}, context="ctx D")
+    assert cache.get(("D", 2), version=1) is None
+
+
+def test_late_put_is_rejected_if_a_newer_version_touched_its_nodes() -> None:
+    cache = ReasoningContextCache(max_entries=10)
+    cache.invalidate(version=2, touched={"A"})
+    cache.invalidate(version=3, touched={"X"})
+
+    cache.put(("A", 2), version=1, nodes={"A"}, context="stale")
+    cache.put(("C", 2), version=2, nodes={"C"}, context="still valid")
+
+    assert cache.get(("A", 2), version=3) is None
+    assert cache.get(("C", 2), version=3) == "still valid"
+
+
+def test_lru_eviction_and_stats() -> None:
+    cache = ReasoningContextCache(max_entries=2)
+    for name in ("A", "B", "C"):
+        cache.put((name,), version=1, nodes={name}, context=name)
+    assert cache.get(("A",), version=1) is None
+    assert cache.get(("C",), version=1) == "C"
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_older_entry_is_not_served_before_the_version_is_invalidated() -> None:
+    cache = ReasoningContextCache(max_entries=10)
+    cache.put(("A", 2), version=1, nodes={"A"}, context="ctx v1")
+    # A reader already on version 2 while invalidate(2) is still pending
+    assert cache.get(("A", 2), version=2) is None
+    assert cache.get(("A", 2), version=1) == "ctx v1"
+    cache.invalidate(version=2, touched={"B"})
+    assert cache.get(("A", 2), version=2) == "ctx v1"
+
+
+def test_publish_invalidates_before_the_version_is_visible(make_graph_service) -> None:
+    from backend.app.models.schemas import Entity
+
+    service = make_graph_service()
+    cache = ReasoningContextCache(max_entries=10)
+    seen = []
+
+    def invalidate(version, touched):
+        seen.append((version, service.snapshot().version))
+        cache.invalidate(version, touched)
+
+    service.add_publish_listener(invalidate)
+    cache.put(("Amlodipin", 2), service.snapshot().version, {"Amlodipin"}, "stale")
+    service.add_entities([Entity(name="Amlodipin", type="DRUG", relevance_score=9)], 0, 0, "doc")
+    published = service.publish()
+
+    assert seen == [(published.version, published.version - 1)]
+    assert cache.get(("Amlodipin", 2), service.snapshot().version) is None
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.app.services.retrieval_planner import RetrievalBranch, RetrievalPlanner
+
+
+@pytest.fixture
+def planner():
+    planner = RetrievalPlanner(max_workers=4)
+    yield planner
+    planner.executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def release():
+    """Event that stuck branches wait on; set at teardown so their worker threads exit"""
+    event = threading.Event()
+    yield event
+    event.set()
+
+
+def _branches(release):
+    def stuck():
+        release.wait(5)
+        return ["late"]
+
+    def broken():
+        raise RuntimeError("PubMed is down")
+
+    return [
+        RetrievalBranch("vector", lambda: ["doc"], timeout=1.0, default=[]),
+        RetrievalBranch("graph", stuck, timeout=0.1, default={"context": ""}),
+        RetrievalBranch("pubmed", broken, timeout=1.0, default={"ids": []}),
+    ]
+
+
+def test_late_and_failing_branches_fall_back_without_losing_the_others(planner, release) -> None:
+    start = time.perf_counter()
+    results = asyncio.run(planner.run(_branches(release)))
+
+    assert results == {"vector": ["doc"], "graph": {"context": ""}, "pubmed": {"ids": []}}
+    # Bounded by the slow branch's timeout, not by how long it actually takes
+    assert time.perf_counter() - start < 2.0
+
+
+def test_iter_completed_yields_each_branch_as_it_finishes(planner, release) -> None:
+    async def collect():
+        return [item async for item in planner.iter_completed(_branches(release))]
+
+    completed = asyncio.run(collect())
+
+    assert dict(completed) == {"vector": ["doc"], "graph": {"context": ""}, "pubmed": {"ids": []}}
+    # The timed-out branch comes last; the branches that finished are not held back by it
+    assert completed[-1][0] == "graph"
@@ -0,0 +1,57 @@
+import importlib
+import json
+import sys
+import types
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+EVENTS = [
+    {"event": "vector", "data": [{"content": "Metformin là thuốc\nđầu tay", "page": 1, "source": "a.pdf"}]},
+    {"event": "token", "data": "Metformin"},
+    {"event": "token", "data": " hạ đường huyết.\n\n"},
+    {"event": "done", "data": {"graph_visual_url": "/api/v1/graph/visualize"}},
+]
+
+
+class StubRAGService:
+    async def stream_question(self, question: str):
+        for event in EVENTS:
+            yield event
+
+
+@pytest.fixture
+def client():
+    """The search router over a stub rag_service singleton (no vector store or models)"""
+    name = "backend.app.api.v1.endpoints.search"
+    stub_module = types.ModuleType("backend.app.services.rag_service")
+    stub_module.rag_service = StubRAGService()
+    saved = {key: sys.modules.pop(key, None) for key in (name, stub_module.__name__)}
+    sys.modules[stub_module.__name__] = stub_module
+    try:
+        app = FastAPI()
+        app.include_router(importlib.import_module(name).router, prefix="/search")
+        yield TestClient(app)
+    finally:
+        for key, module in saved.items():
+            sys.modules.pop(key, None)
+            if module is not None:
+                sys.modules[key] = module
+
+
+def test_stream_frames_one_sse_event_per_service_event(client) -> None:
+    response = client.post("/search/stream", json={"query": "Metformin?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    frames = response.text.split("\n\n")
+    assert frames.pop() == ""
+    parsed = []
+    for frame in frames:
+        # Newlines inside the data are JSON-escaped, so every frame is exactly one event and one data line
+        event_line, data_line = frame.split("\n")
+        assert event_line.startswith("event: ") and data_line.startswith("data: ")
+        parsed.append({"event": event_line[len("event: "):], "data": json.loads(data_line[len("data: "):])})
+    assert parsed == EVENTS
+    assert "đầu tay" in response.text  # non-ASCII is sent as is
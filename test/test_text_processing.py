@@ -0,0 +1,33 @@
+from backend.app.services.text_processing import (
+    deduplicate_entities,
+    normalize_many,
+    normalize_medical_text,
+)
+
+
+def test_normalize_expands_abbreviations_and_synonyms() -> None:
+    assert normalize_medical_text("THA, đtđ type 2 (ghi chú)") == "Tăng Huyết Áp Đái Tháo Đường Type 2"
+    assert normalize_medical_text("suy thận mạn tính trang 5") == "Bệnh Thận Mạn"
+    assert normalize_medical_text("lợi tiểu") == "Thuốc Lợi Tiểu"
+    assert normalize_medical_text("") == "Unknown"
+
+
+def test_normalize_only_replaces_whole_words() -> None:
+    assert normalize_medical_text("Thai phụ") == "Thai Phụ"
+    assert normalize_medical_text("Creatinine huyết thanh") == "Creatinine Huyết Thanh"
+    assert normalize_medical_text("Thuốc lợi tiểu") == "Thuốc Lợi Tiểu"
+
+
+def test_normalize_many_matches_single_calls() -> None:
+    texts = ["CKD", "tiểu đường", "CKD", "", "Suy tim sung huyết"]
+    assert normalize_many(texts) == [normalize_medical_text(t) for t in texts]
+
+
+def test_deduplicate_entities_keeps_most_relevant() -> None:
+    entities = [
+        {"name": "CKD", "relevance_score": 5},
+        {"name": "bệnh thận mạn", "relevance_score": 9},
+        {"name": "Suy tim", "relevance_score": 7},
+    ]
+    result = deduplicate_entities(entities)
+    assert [e["relevance_score"] for e in result] == [9, 7]